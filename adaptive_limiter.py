@@ -0,0 +1,269 @@
+import asyncio
+import threading
+import time
+
+from collections import deque
+from typing import *
+
+__all__: List[str] = ["AdaptiveConcurrencyLimiter"]
+
+
+class _HostLimit:
+    """
+    The concurrency limit and the requests in flight to a single host.
+
+    The lowest latency is tracked over two consecutive windows, the current and the previous
+    one, so an unusually fast response is forgotten after at most two windows.
+    """
+
+    __slots__ = (
+        "decreased_at",
+        "in_flight",
+        "limit",
+        "min_latency",
+        "previous_min",
+        "waiters",
+        "window_min",
+        "window_started",
+    )
+
+    def __init__(self, limit: float) -> None:
+        """
+        Initialises a new _HostLimit instance.
+
+        Args:
+            limit (float): The initial limit of the host.
+        """
+        self.decreased_at: float = 0.0
+        self.in_flight: int = 0
+        self.limit: float = limit
+        self.min_latency: float = float("inf")
+        self.previous_min: float = float("inf")
+        self.waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self.window_min: float = float("inf")
+        self.window_started: float = time.monotonic()
+
+    def observe(
+        self,
+        latency: float,
+        now: float,
+        window: float,
+    ) -> None:
+        """
+        Records a latency and updates the lowest latency of the current and the previous window.
+
+        Args:
+            latency (float): The latency of a request in seconds.
+            now (float): The current time.monotonic().
+            window (float): The length of a window in seconds.
+        """
+        # Check, if the current window is over and becomes the previous one
+        if now - self.window_started >= window:
+            # A window without any request leaves nothing to compare with
+            self.previous_min = self.window_min if now - self.window_started < 2 * window else float("inf")
+            self.window_min = float("inf")
+            self.window_started = now
+
+        self.window_min = min(self.window_min, latency)
+
+        self.min_latency = min(self.previous_min, self.window_min)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the requests in flight per host with an AIMD (additive increase, multiplicative decrease) limit.
+
+    The limit grows by about one request per round trip while responses come back quickly,
+    and shrinks by 'backoff_ratio' when the origin signals overload with a 429 or 503, a
+    request times out, or the latency exceeds 'tolerance' times the lowest recent latency.
+    The lowest latency is taken over the last one to two 'latency_window's, so a single
+    unusually fast response cannot hold the limit at its floor for good. The limit shrinks
+    at most once per observed latency, so a burst of errors from requests sent at the same
+    time counts as a single signal.
+
+    Attributes:
+        initial_limit (float): The limit of a host before any response was observed.
+        min_limit (float): The lowest limit of a host.
+        max_limit (float): The highest limit of a host.
+        backoff_ratio (float): The factor the limit is multiplied with on overload.
+        tolerance (Optional[float]): The latency, as a multiple of the lowest recent latency, treated as overload, or None to ignore latency.
+        overload_statuses (FrozenSet[int]): The response statuses treated as overload.
+        latency_window (float): The seconds per window over which the lowest latency is tracked.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 10.0,
+        min_limit: float = 1.0,
+        max_limit: float = 200.0,
+        backoff_ratio: float = 0.9,
+        tolerance: Optional[float] = 2.0,
+        overload_statuses: Iterable[int] = (429, 503),
+        latency_window: float = 30.0,
+    ) -> None:
+        """
+        Initialises a new AdaptiveConcurrencyLimiter instance.
+
+        Args:
+            initial_limit (float): The limit of a host before any response was observed. Defaults to 10.0.
+            min_limit (float): The lowest limit of a host. Defaults to 1.0.
+            max_limit (float): The highest limit of a host. Defaults to 200.0.
+            backoff_ratio (float): The factor the limit is multiplied with on overload. Defaults to 0.9.
+            tolerance (Optional[float]): The latency multiple treated as overload, or None to ignore latency. Defaults to 2.0.
+            overload_statuses (Iterable[int]): The response statuses treated as overload. Defaults to 429 and 503.
+            latency_window (float): The seconds per window over which the lowest latency is tracked. Defaults to 30.0.
+        """
+        self.initial_limit: float = initial_limit
+        self.min_limit: float = min_limit
+        self.max_limit: float = max_limit
+        self.backoff_ratio: float = backoff_ratio
+        self.tolerance: Optional[float] = tolerance
+        self.overload_statuses: FrozenSet[int] = frozenset(overload_statuses)
+        self.latency_window: float = latency_window
+
+        self._hosts_: Dict[str, _HostLimit] = {}
+        self._lock_: threading.Lock = threading.Lock()
+
+    def _host_(self, host: str) -> _HostLimit:
+        """
+        Returns the limit of the given host, creating it on first use. Must be called with the lock held.
+
+        Args:
+            host (str): The host of the limit.
+
+        Returns:
+            _HostLimit: The limit of the host.
+        """
+        state: Optional[_HostLimit] = self._hosts_.get(host)
+
+        if state is None:
+            state = self._hosts_[host] = _HostLimit(self.initial_limit)
+
+        return state
+
+    def _grant_(
+        self,
+        host: str,
+        future: asyncio.Future,
+    ) -> None:
+        """
+        Hands a slot to a waiting caller, or gives it back if the caller was cancelled in the meantime.
+
+        Args:
+            host (str): The host of the slot.
+            future (asyncio.Future): The future the caller is waiting on.
+        """
+        if future.done():
+            self.release(host)
+        else:
+            future.set_result(None)
+
+    def _wake_(
+        self,
+        host: str,
+        state: _HostLimit,
+    ) -> None:
+        """
+        Hands free slots to waiting callers. Must be called with the lock held.
+
+        Args:
+            host (str): The host of the limit.
+            state (_HostLimit): The limit of the host.
+        """
+        while state.waiters and state.in_flight < max(1, int(state.limit)):
+            loop, future = state.waiters.popleft()
+
+            if future.done():
+                continue
+
+            state.in_flight += 1
+
+            loop.call_soon_threadsafe(self._grant_, host, future)
+
+    async def acquire(self, host: str) -> None:
+        """
+        Waits until a request to the given host fits within its limit and takes a slot.
+
+        Args:
+            host (str): The host the request is sent to.
+        """
+        with self._lock_:
+            state: _HostLimit = self._host_(host)
+
+            if not state.waiters and state.in_flight < max(1, int(state.limit)):
+                state.in_flight += 1
+
+                return
+
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+            future: asyncio.Future = loop.create_future()
+
+            state.waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock_:
+                # Check, if the caller was cancelled before a slot was handed to it
+                if (loop, future) in state.waiters:
+                    state.waiters.remove((loop, future))
+
+                    raise
+
+            # A slot was handed over, but the caller will never use it
+            if not future.cancelled():
+                self.release(host)
+
+            raise
+
+    def limit(self, host: str) -> float:
+        """
+        Returns the current limit of the given host.
+
+        Args:
+            host (str): The host of the limit.
+
+        Returns:
+            float: The number of requests allowed in flight.
+        """
+        with self._lock_:
+            return self._host_(host).limit
+
+    def release(
+        self,
+        host: str,
+        latency: Optional[float] = None,
+        overloaded: bool = False,
+    ) -> None:
+        """
+        Gives back the slot of a finished request and adapts the limit of its host.
+
+        Args:
+            host (str): The host the request was sent to.
+            latency (Optional[float]): The latency of the request in seconds, or None if it did not complete. Defaults to None.
+            overloaded (bool): Whether the origin signalled overload. Defaults to False.
+        """
+        with self._lock_:
+            state: _HostLimit = self._host_(host)
+
+            state.in_flight -= 1
+
+            now: float = time.monotonic()
+
+            if latency is not None:
+                state.observe(latency, now, self.latency_window)
+
+                # Check, if the latency signals a queue building up at the origin
+                if self.tolerance is not None and latency > state.min_latency * self.tolerance:
+                    overloaded = True
+
+            if overloaded:
+                if now - state.decreased_at >= (latency or 0.0):
+                    state.limit = max(self.min_limit, state.limit * self.backoff_ratio)
+                    state.decreased_at = now
+            elif latency is not None and state.in_flight + 1 >= int(state.limit):
+                # Grow the limit only while it is actually the bottleneck
+                state.limit = min(self.max_limit, state.limit + 1.0 / state.limit)
+
+            self._wake_(host, state)
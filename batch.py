@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from typing import *
+
+__all__: List[str] = ["BatchResult", "RequestSpec"]
+
+
+@dataclass
+class RequestSpec:
+    """
+    A description of a single request sent as part of a batch.
+
+    Attributes:
+        url (str): The URL to send the request to.
+        method (str): The HTTP method of the request. Defaults to "GET".
+        kwargs (Dict[str, Any]): Additional keyword arguments for the request. Defaults to an empty dictionary.
+        log (bool): A flag indicating whether to log the response status. Defaults to False.
+    """
+
+    url: str
+    method: str = "GET"
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    log: bool = False
+
+    @classmethod
+    def coerce(cls, request: Union[str, "RequestSpec"]) -> "RequestSpec":
+        """
+        Converts a plain URL into a GET RequestSpec and returns RequestSpec instances unchanged.
+
+        Args:
+            request (Union[str, RequestSpec]): The URL or RequestSpec to convert.
+
+        Returns:
+            RequestSpec: The converted RequestSpec.
+        """
+        if isinstance(request, RequestSpec):
+            return request
+
+        return cls(url=request)
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of a single request sent as part of a batch.
+
+    Attributes:
+        index (int): The position of the request in the input iterable.
+        request (RequestSpec): The request that was sent.
+        result (Any): The decoded response, or None if the request failed.
+        error (Optional[BaseException]): The exception raised by the request, or None if it succeeded.
+    """
+
+    index: int
+    request: RequestSpec
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns whether the request completed without raising an exception.
+
+        Returns:
+            bool: True if the request succeeded, False otherwise.
+        """
+        return self.error is None
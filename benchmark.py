@@ -0,0 +1,608 @@
+"""
+Benchmarks WebService against a local stand-in server and compares the results with a stored baseline.
+
+Usage:
+    python benchmark.py                           Runs every scenario and compares with benchmark_baseline.json
+    python benchmark.py --update-baseline         Runs every scenario and stores the results as the new baseline
+    python benchmark.py -s get_json -c 1 64       Runs a single scenario at two concurrency levels
+    python benchmark.py -s -i 50                  Only measures the import time, over 50 fresh interpreters
+
+The process exits with status 1 if a scenario or import regressed beyond the tolerance, if requests failed,
+or if importing loaded aiohttp, httpx, pydantic or yarl or wrote any output.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+from datetime import datetime
+from typing import *
+
+import aiohttp
+
+from benchmark_server import BenchmarkServer
+from histogram import LatencyHistogram
+from web_service import WebService
+
+__all__: List[str] = ["IMPORTS", "SCENARIOS", "Scenario", "compare", "main", "measure_import", "run"]
+
+
+class Scenario:
+    """
+    A kind of request the benchmark sends repeatedly.
+
+    Every request goes to a distinct URL, so neither the response cache nor request
+    coalescing can answer it without a round trip.
+
+    Attributes:
+        method (str): The HTTP method of the requests.
+        path (str): The path of the requests, with an "{index}" placeholder for the request number.
+        share (float): The share of the requested number of requests to send, for scenarios too slow or too large to send in full.
+        kwargs (Dict[str, Any]): Additional keyword arguments for every request, e.g. json.
+    """
+
+    __slots__ = ("kwargs", "method", "path", "share")
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        share: float = 1.0,
+        **kwargs,
+    ) -> None:
+        """
+        Initialises a new Scenario instance.
+
+        Args:
+            method (str): The HTTP method of the requests.
+            path (str): The path of the requests, with an "{index}" placeholder for the request number.
+            share (float): The share of the requested number of requests to send. Defaults to 1.0.
+            **kwargs: Additional keyword arguments for every request.
+        """
+        self.method: str = method
+        self.path: str = path
+        self.share: float = share
+        self.kwargs: Dict[str, Any] = kwargs
+
+
+# The payload of the POST and PUT scenarios
+_PAYLOAD: Dict[str, Any] = {
+    "name": "benchmark",
+    "values": list(range(50)),
+    "nested": {"flag": True, "ratio": 0.25, "label": "x" * 64},
+}
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "get_json": Scenario("GET", "/json?i={index}"),
+    "get_text": Scenario("GET", "/text?i={index}"),
+    "get_binary": Scenario("GET", "/binary?i={index}"),
+    "get_large": Scenario("GET", "/large?i={index}", share=0.05),
+    "get_slow": Scenario("GET", "/slow?i={index}", share=0.05),
+    "post_json": Scenario("POST", "/echo?i={index}", json=_PAYLOAD),
+    "put_json": Scenario("PUT", "/echo?i={index}", json=_PAYLOAD),
+    "delete": Scenario("DELETE", "/items/{index}"),
+}
+
+
+# The verbs of WebService measured by the scenarios
+_VERBS: Dict[str, Callable[..., Awaitable[Any]]] = {
+    "GET": WebService.aget,
+    "POST": WebService.apost,
+    "PUT": WebService.aput,
+    "DELETE": WebService.adelete,
+}
+
+
+# The modules whose import time is measured
+IMPORTS: Tuple[str, ...] = ("web_service", "headers", "url_builder", "logger")
+
+
+# The dependencies an import should not load, as they are only needed once requests are sent
+_HEAVY: Tuple[str, ...] = ("aiohttp", "httpx", "pydantic", "yarl")
+
+
+# Imports a module in a fresh interpreter and reports the time taken and the heavy modules loaded
+_IMPORT_SCRIPT: str = """
+import json, sys, time
+started = time.perf_counter_ns()
+import {module}
+elapsed = time.perf_counter_ns() - started
+print(json.dumps({{"ns": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+# The metrics compared with the baseline, and whether a higher value is better
+_CHECKS: Tuple[Tuple[str, bool], ...] = (
+    ("import_ms", False),
+    ("rps", True),
+    ("p99_ms", False),
+    ("peak_rss_mib", False),
+    ("alloc_peak_kib", False),
+)
+
+
+class _PeakRSS:
+    """
+    Samples the resident set size of the process on a thread of its own and keeps the peak.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Initialises a new _PeakRSS instance.
+
+        Args:
+            interval (float): Seconds between samples. Defaults to 0.005.
+        """
+        self.interval: float = interval
+        self.peak: int = 0
+
+        self._stop_: threading.Event = threading.Event()
+        self._thread_: threading.Thread = threading.Thread(daemon=True, target=self._run_)
+
+    def __enter__(self) -> "_PeakRSS":
+        """
+        Starts sampling.
+
+        Returns:
+            _PeakRSS: The sampler.
+        """
+        self.peak = self.sample()
+
+        self._thread_.start()
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        """
+        Stops sampling and takes a last sample.
+        """
+        self._stop_.set()
+        self._thread_.join()
+
+        self.peak = max(self.peak, self.sample())
+
+    def _run_(self) -> None:
+        """
+        Samples until stopped.
+        """
+        while not self._stop_.wait(self.interval):
+            self.peak = max(self.peak, self.sample())
+
+    @staticmethod
+    def sample() -> int:
+        """
+        Returns the current resident set size of the process.
+
+        Returns:
+            int: The resident set size in bytes, or the lifetime peak where the current size is not available.
+        """
+        try:
+            with open("/proc/self/statm", "rb") as file:
+                return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            import resource
+
+            peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+            # Linux reports kilobytes, macOS bytes
+            return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def _send_(
+    scenario: Scenario,
+    base_url: str,
+    count: int,
+    concurrency: int,
+    histogram: Optional[LatencyHistogram] = None,
+) -> int:
+    """
+    Sends a number of requests of a scenario with a fixed number of requests in flight.
+
+    Args:
+        scenario (Scenario): The scenario to send.
+        base_url (str): The URL of the stand-in server.
+        count (int): The number of requests to send.
+        concurrency (int): The number of requests in flight.
+        histogram (Optional[LatencyHistogram]): Records the latency of every request in nanoseconds. Defaults to None.
+
+    Returns:
+        int: The number of requests that failed.
+    """
+    verb: Callable[..., Awaitable[Any]] = _VERBS[scenario.method]
+
+    template: str = base_url + scenario.path
+
+    indices: Iterator[int] = iter(range(count))
+
+    failed: int = 0
+
+    async def __worker__() -> None:
+        """
+        Sends the next request until every request has been sent.
+        """
+        nonlocal failed
+
+        for index in indices:
+            started: int = time.perf_counter_ns()
+
+            try:
+                await verb(template.format(index=index), **scenario.kwargs)
+            except Exception:
+                failed += 1
+
+            if histogram is not None:
+                histogram.record(time.perf_counter_ns() - started)
+
+    await asyncio.gather(*(__worker__() for _ in range(concurrency)))
+
+    return failed
+
+
+def measure_import(module: str, runs: int = 20) -> Dict[str, Any]:
+    """
+    Measures the time importing a module takes, each run in a fresh interpreter.
+
+    Only the import statement is timed, not the start of the interpreter. A run counts as
+    failed if it loads one of the heavy dependencies or writes anything besides its report,
+    e.g. a log line, as importing must be free of side effects.
+
+    Args:
+        module (str): The name of the module to import.
+        runs (int): The number of interpreters to import the module in. Defaults to 20.
+
+    Returns:
+        Dict[str, Any]: The median and minimum import time, the heavy modules loaded and the unexpected output.
+    """
+    script: str = _IMPORT_SCRIPT.format(heavy=_HEAVY, module=module)
+
+    times: List[float] = []
+
+    loaded: Set[str] = set()
+
+    output: List[str] = []
+
+    failed: int = 0
+
+    for _ in range(runs):
+        completed: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            text=True,
+        )
+
+        *lines, report = completed.stdout.strip().splitlines()
+
+        measured: Dict[str, Any] = json.loads(report)
+
+        times.append(measured["ns"] / 1e6)
+
+        loaded.update(measured["loaded"])
+
+        output.extend(lines + completed.stderr.splitlines())
+
+        failed += bool(measured["loaded"] or lines or completed.stderr)
+
+    return {
+        "runs": runs,
+        "failed": failed,
+        "import_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "loaded": sorted(loaded),
+        "output": sorted(set(output)),
+    }
+
+
+async def _measure_(
+    scenario: Scenario,
+    base_url: str,
+    requests: int,
+    concurrency: int,
+    allocations: bool,
+) -> Dict[str, Any]:
+    """
+    Measures a scenario at one concurrency level.
+
+    The throughput and latency run is followed by a shorter run under tracemalloc, as
+    tracing allocations slows every request down considerably.
+
+    Args:
+        scenario (Scenario): The scenario to measure.
+        base_url (str): The URL of the stand-in server.
+        requests (int): The number of requests to send, before applying the share of the scenario.
+        concurrency (int): The number of requests in flight.
+        allocations (bool): Whether to measure the allocations.
+
+    Returns:
+        Dict[str, Any]: The throughput, latency percentiles, peak RSS and allocations of the scenario.
+    """
+    count: int = max(concurrency, int(requests * scenario.share))
+
+    # Open the connections first, so the run measures warm keep-alive connections
+    await _send_(scenario, base_url, concurrency, concurrency)
+
+    histogram: LatencyHistogram = LatencyHistogram()
+
+    with _PeakRSS() as rss:
+        started: float = time.perf_counter()
+
+        failed: int = await _send_(scenario, base_url, count, concurrency, histogram)
+
+        elapsed: float = time.perf_counter() - started
+
+    result: Dict[str, Any] = {
+        "requests": count,
+        "failed": failed,
+        "seconds": round(elapsed, 4),
+        "rps": round(count / elapsed, 1),
+        "mean_ms": round(histogram.mean / 1e6, 3),
+        "p50_ms": round(histogram.percentile(50) / 1e6, 3),
+        "p95_ms": round(histogram.percentile(95) / 1e6, 3),
+        "p99_ms": round(histogram.percentile(99) / 1e6, 3),
+        "max_ms": round(histogram.max / 1e6, 3),
+        "peak_rss_mib": round(rss.peak / 2**20, 1),
+    }
+
+    if allocations:
+        tracemalloc.start()
+
+        before: int = tracemalloc.get_traced_memory()[0]
+
+        await _send_(scenario, base_url, max(concurrency, count // 10), concurrency)
+
+        current, peak = tracemalloc.get_traced_memory()
+
+        tracemalloc.stop()
+
+        result["alloc_peak_kib"] = round((peak - before) / 1024, 1)
+        result["alloc_retained_kib"] = round((current - before) / 1024, 1)
+
+    return result
+
+
+def _environment_(requests: int) -> Dict[str, Any]:
+    """
+    Describes the environment of a run, to tell apart results from different machines and versions.
+
+    Args:
+        requests (int): The number of requests per run.
+
+    Returns:
+        Dict[str, Any]: The time of the run, the Python and aiohttp versions, the platform and the requests per run.
+    """
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "aiohttp": aiohttp.__version__,
+        "platform": platform.platform(),
+        "requests": requests,
+    }
+
+
+async def run(
+    scenarios: Iterable[str],
+    concurrency: Iterable[int],
+    requests: int,
+    allocations: bool = True,
+    base_url: Optional[str] = None,
+    import_runs: int = 20,
+) -> Dict[str, Any]:
+    """
+    Measures the import time, then runs the given scenarios at every concurrency level against a stand-in server.
+
+    Args:
+        scenarios (Iterable[str]): The names of the scenarios to run.
+        concurrency (Iterable[int]): The numbers of requests in flight to run every scenario with.
+        requests (int): The number of requests per run, before applying the share of a scenario.
+        allocations (bool): Whether to measure the allocations. Defaults to True.
+        base_url (Optional[str]): The URL of a running stand-in server. Defaults to None, i.e. a server of its own.
+        import_runs (int): The number of fresh interpreters every module in IMPORTS is imported in, or 0 to skip. Defaults to 20.
+
+    Returns:
+        Dict[str, Any]: The environment of the run and the results keyed by "import:module" and "scenario@concurrency".
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for module in IMPORTS if import_runs > 0 else ():
+        result: Dict[str, Any] = measure_import(module, import_runs)
+
+        results[f"import:{module}"] = result
+
+        print(
+            f"{'import:' + module:<20} {result['import_ms']:>10.3f} ms"
+            f"  min {result['min_ms']:>8.3f} ms"
+            + (f"  LOADED {', '.join(result['loaded'])}" if result["loaded"] else "")
+            + (f"  OUTPUT {result['output'][0]!r}" if result["output"] else ""),
+            flush=True,
+        )
+
+    # Check, if there is no scenario to run
+    if not scenarios:
+        return {
+            "environment": _environment_(requests),
+            "results": results,
+        }
+
+    server: Optional[BenchmarkServer] = None
+
+    if base_url is None:
+        server = BenchmarkServer()
+
+        server.start()
+
+        base_url = server.url
+
+    try:
+        for name, level in itertools.product(scenarios, concurrency):
+            result = await _measure_(
+                allocations=allocations,
+                base_url=base_url,
+                concurrency=level,
+                requests=requests,
+                scenario=SCENARIOS[name],
+            )
+
+            results[f"{name}@{level}"] = result
+
+            print(
+                f"{name + '@' + str(level):<20} {result['rps']:>10.1f} req/s"
+                f"  p50 {result['p50_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms"
+                f"  rss {result['peak_rss_mib']:>7.1f} MiB"
+                + (f"  alloc {result['alloc_peak_kib']:>9.1f} KiB" if allocations else "")
+                + (f"  FAILED {result['failed']}" if result["failed"] else ""),
+                flush=True,
+            )
+    finally:
+        await WebService.aclose()
+
+        if server is not None:
+            server.stop()
+
+    return {
+        "environment": _environment_(requests),
+        "results": results,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """
+    Compares results with a baseline.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): The results keyed by "scenario@concurrency".
+        baseline (Dict[str, Dict[str, Any]]): The baseline results keyed by "scenario@concurrency".
+        tolerance (float): The relative change beyond which a metric counts as a regression, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: A description of every regression, or an empty list if there is none.
+    """
+    regressions: List[str] = []
+
+    for key, result in results.items():
+        # Check, if imports loaded heavy dependencies or wrote output
+        if result.get("failed") and "runs" in result:
+            regressions.append(
+                f"{key}: {result['failed']} of {result['runs']} imports had side effects,"
+                f" loaded: {', '.join(result['loaded']) or 'none'}, output: {result['output'][:1] or 'none'}"
+            )
+        elif result.get("failed"):
+            regressions.append(f"{key}: {result['failed']} of {result['requests']} requests failed")
+
+        expected: Optional[Dict[str, Any]] = baseline.get(key)
+
+        if not expected:
+            continue
+
+        for metric, higher_is_better in _CHECKS:
+            if metric not in result or not expected.get(metric):
+                continue
+
+            change: float = result[metric] / expected[metric] - 1.0
+
+            # Check, if the metric moved the wrong way by more than the tolerance
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{key}: {metric} {expected[metric]} -> {result[metric]} ({change:+.1%})")
+
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the benchmark from the command line.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments. Defaults to None, i.e. sys.argv.
+
+    Returns:
+        int: The exit status, 1 if a scenario regressed, requests failed or there was no baseline to compare with, 0 otherwise.
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmarks WebService against a local stand-in server.")
+
+    parser.add_argument("-s", "--scenarios", choices=sorted(SCENARIOS), default=list(SCENARIOS), nargs="*", help="The scenarios to run, none to only measure imports (default: all).")
+    parser.add_argument("-c", "--concurrency", default=[1, 16, 128], nargs="+", type=int, help="The requests in flight (default: 1 16 128).")
+    parser.add_argument("-n", "--requests", default=2000, type=int, help="The requests per run (default: 2000).")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="The file to save the results to (default: benchmark_results.json).")
+    parser.add_argument("-b", "--baseline", default="benchmark_baseline.json", help="The baseline to compare with (default: benchmark_baseline.json).")
+    parser.add_argument("-t", "--tolerance", default=0.2, type=float, help="The relative change counted as a regression (default: 0.2).")
+    parser.add_argument("--update-baseline", action="store_true", help="Stores the results as the new baseline instead of comparing.")
+    parser.add_argument("-i", "--import-runs", default=20, type=int, help="The fresh interpreters every module is imported in, 0 to skip (default: 20).")
+    parser.add_argument("--no-allocations", action="store_true", help="Skips measuring allocations.")
+    parser.add_argument("--url", default=None, help="The URL of an already running stand-in server.")
+
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    report: Dict[str, Any] = asyncio.run(
+        run(
+            allocations=not args.no_allocations,
+            base_url=args.url,
+            concurrency=args.concurrency,
+            import_runs=args.import_runs,
+            requests=args.requests,
+            scenarios=args.scenarios,
+        )
+    )
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"Saved the results to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+
+        print(f"Saved the results as the baseline {args.baseline}")
+
+        return 0
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    else:
+        print(f"No baseline at {args.baseline}, run with --update-baseline to store one", file=sys.stderr)
+
+    regressions: List[str] = compare(
+        baseline=baseline,
+        results=report["results"],
+        tolerance=args.tolerance,
+    )
+
+    if regressions:
+        print(f"\n{'=' * 72}\nPERFORMANCE REGRESSION: {len(regressions)} check(s) failed\n{'=' * 72}", file=sys.stderr)
+
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+
+        return 1
+
+    # Check, if nothing was compared, which must not pass as a run without regressions
+    if not baseline.keys() & report["results"].keys():
+        if baseline:
+            print("Nothing to compare, the baseline has none of the scenarios run", file=sys.stderr)
+
+        return 1
+
+    print("No regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
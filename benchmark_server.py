@@ -0,0 +1,236 @@
+import asyncio
+import json
+import multiprocessing
+import socket
+
+from typing import *
+
+from aiohttp import web
+
+__all__: List[str] = ["BenchmarkServer", "make_app"]
+
+
+# The bodies served by the stand-in server, built once
+_JSON: bytes = json.dumps(
+    {
+        "id": 1,
+        "name": "benchmark",
+        "tags": ["a", "b", "c"],
+        "items": [{"index": index, "value": f"item-{index}", "score": index * 0.5} for index in range(20)],
+    }
+).encode()
+_TEXT: bytes = ("The quick brown fox jumps over the lazy dog.\n" * 24).encode()
+_BINARY: bytes = bytes(range(256)) * 64
+_LARGE: bytes = bytes(range(256)) * 4096 * 4
+
+
+def make_app(slow_delay: float = 0.05) -> web.Application:
+    """
+    Creates the stand-in application the benchmarks send their requests to.
+
+    Endpoints:
+        GET /json: A small JSON document of about 1 KiB.
+        GET /text: About 1 KiB of plain text.
+        GET /binary: 16 KiB of binary data.
+        GET /large: 4 MiB of binary data.
+        GET /slow: A small JSON document, sent after slow_delay seconds.
+        POST, PUT /echo: The request body, echoed back with the content type of the request.
+        DELETE /items/{id}: An empty 204 response.
+
+    Args:
+        slow_delay (float): The seconds the slow endpoint waits before responding. Defaults to 0.05.
+
+    Returns:
+        web.Application: The application.
+    """
+
+    async def __json__(request: web.Request) -> web.Response:
+        """
+        Serves the small JSON document.
+        """
+        return web.Response(body=_JSON, content_type="application/json")
+
+    async def __text__(request: web.Request) -> web.Response:
+        """
+        Serves the plain text.
+        """
+        return web.Response(body=_TEXT, content_type="text/plain")
+
+    async def __binary__(request: web.Request) -> web.Response:
+        """
+        Serves the binary data.
+        """
+        return web.Response(body=_BINARY, content_type="application/octet-stream")
+
+    async def __large__(request: web.Request) -> web.Response:
+        """
+        Serves the large binary body.
+        """
+        return web.Response(body=_LARGE, content_type="application/octet-stream")
+
+    async def __slow__(request: web.Request) -> web.Response:
+        """
+        Serves the small JSON document after a delay.
+        """
+        await asyncio.sleep(slow_delay)
+
+        return web.Response(body=_JSON, content_type="application/json")
+
+    async def __echo__(request: web.Request) -> web.Response:
+        """
+        Echoes the request body.
+        """
+        return web.Response(body=await request.read(), content_type=request.content_type)
+
+    async def __delete__(request: web.Request) -> web.Response:
+        """
+        Answers a deletion without a body.
+        """
+        return web.Response(status=204)
+
+    app: web.Application = web.Application(client_max_size=64 * 1024 * 1024)
+
+    app.router.add_get("/json", __json__)
+    app.router.add_get("/text", __text__)
+    app.router.add_get("/binary", __binary__)
+    app.router.add_get("/large", __large__)
+    app.router.add_get("/slow", __slow__)
+    app.router.add_post("/echo", __echo__)
+    app.router.add_put("/echo", __echo__)
+    app.router.add_delete("/items/{id}", __delete__)
+
+    return app
+
+
+def _serve_(
+    sock: socket.socket,
+    slow_delay: float,
+    ready: Any,
+) -> None:
+    """
+    Serves the stand-in application on a listening socket until the process is terminated.
+
+    Args:
+        sock (socket.socket): The bound socket to accept connections on.
+        slow_delay (float): The seconds the slow endpoint waits before responding.
+        ready (Any): The event set once the server accepts connections.
+    """
+
+    async def __main__() -> None:
+        """
+        Starts the site and serves until the process is terminated.
+        """
+        runner: web.AppRunner = web.AppRunner(make_app(slow_delay), access_log=None)
+
+        await runner.setup()
+
+        await web.SockSite(runner, sock).start()
+
+        ready.set()
+
+        await asyncio.Event().wait()
+
+    asyncio.run(__main__())
+
+
+class BenchmarkServer:
+    """
+    Runs the stand-in application in a process of its own, so serving requests does not compete with the client measured.
+
+    Attributes:
+        host (str): The address the server listens on.
+        port (int): The port the server listens on, chosen by the system.
+        slow_delay (float): The seconds the slow endpoint waits before responding.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        slow_delay: float = 0.05,
+    ) -> None:
+        """
+        Initialises a new BenchmarkServer instance.
+
+        Args:
+            host (str): The address to listen on. Defaults to "127.0.0.1".
+            slow_delay (float): The seconds the slow endpoint waits before responding. Defaults to 0.05.
+        """
+        self.host: str = host
+        self.port: int = 0
+        self.slow_delay: float = slow_delay
+
+        self._process_: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "BenchmarkServer":
+        """
+        Starts the server.
+
+        Returns:
+            BenchmarkServer: The running server.
+        """
+        self.start()
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        """
+        Stops the server.
+        """
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """
+        Returns the base URL of the server.
+
+        Returns:
+            str: The URL without a trailing slash.
+        """
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> None:
+        """
+        Starts the server process and waits until it accepts connections.
+
+        Args:
+            timeout (float): Seconds to wait for the server. Defaults to 10.0.
+
+        Raises:
+            RuntimeError: If the server does not start in time.
+        """
+        # Bind here, so the port is known without a round trip to the server process
+        sock: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, 0))
+        sock.listen(1024)
+
+        self.port = sock.getsockname()[1]
+
+        context: Any = multiprocessing.get_context()
+
+        ready: Any = context.Event()
+
+        self._process_ = context.Process(
+            args=(sock, self.slow_delay, ready),
+            daemon=True,
+            name="BenchmarkServer",
+            target=_serve_,
+        )
+
+        self._process_.start()
+
+        sock.close()
+
+        if not ready.wait(timeout):
+            self.stop()
+
+            raise RuntimeError(f"The benchmark server did not start within {timeout}s.")
+
+    def stop(self) -> None:
+        """
+        Terminates the server process.
+        """
+        if self._process_ is not None:
+            self._process_.terminate()
+            self._process_.join()
+            self._process_ = None
@@ -0,0 +1,517 @@
+import hashlib
+import threading
+import time
+
+from collections import OrderedDict
+from multidict import CIMultiDict, CIMultiDictProxy
+from typing import *
+
+from response import Response
+
+__all__: List[str] = ["CachedResponse", "ResponseCache"]
+
+
+class CachedResponse:
+    """
+    A response stored in a cache together with the time it stops being fresh.
+
+    Attributes:
+        response (Response): The cached response.
+        stored_at (float): The UNIX time the response was stored or last revalidated at.
+        expires_at (float): The UNIX time the response stops being fresh.
+    """
+
+    __slots__ = ("expires_at", "response", "stored_at")
+
+    def __init__(
+        self,
+        response: Response,
+        stored_at: float,
+        expires_at: float,
+    ) -> None:
+        """
+        Initialises a new CachedResponse instance.
+
+        Args:
+            response (Response): The cached response.
+            stored_at (float): The UNIX time the response was stored or last revalidated at.
+            expires_at (float): The UNIX time the response stops being fresh.
+        """
+        self.response: Response = response
+        self.stored_at: float = stored_at
+        self.expires_at: float = expires_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        """
+        Returns the ETag validator of the cached response, if any.
+
+        Returns:
+            Optional[str]: The ETag header value, or None.
+        """
+        return self.response.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        """
+        Returns the Last-Modified validator of the cached response, if any.
+
+        Returns:
+            Optional[str]: The Last-Modified header value, or None.
+        """
+        return self.response.headers.get("Last-Modified")
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the approximate number of bytes the cached response occupies.
+
+        Returns:
+            int: The size of the body plus the size of the headers.
+        """
+        return len(self.response.body) + sum(
+            len(key) + len(value) for key, value in self.response.headers.items()
+        )
+
+    def is_fresh(
+        self,
+        now: Optional[float] = None,
+    ) -> bool:
+        """
+        Returns whether the cached response can be served without revalidation.
+
+        Args:
+            now (Optional[float]): The current UNIX time. Defaults to time.time().
+
+        Returns:
+            bool: True if the response is still fresh, False otherwise.
+        """
+        return (time.time() if now is None else now) < self.expires_at
+
+
+class ResponseCache:
+    """
+    An in-memory HTTP response cache with byte-bounded LRU eviction.
+
+    Freshness follows the Cache-Control and Expires headers of the response. Stale responses
+    carrying an ETag or Last-Modified validator are kept so they can be revalidated with a
+    conditional request, and a 304 answer reuses the cached body.
+
+    Attributes:
+        max_bytes (int): The maximum total size of all cached responses in bytes.
+        default_ttl (Optional[float]): Seconds a response without freshness information stays fresh, or None to not cache it.
+        key_headers (Tuple[str, ...]): The request headers that are part of the cache key.
+        cacheable_statuses (FrozenSet[int]): The status codes of responses that may be stored.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to go upstream.
+        revalidations (int): The number of stale responses revalidated by a 304 answer.
+        evictions (int): The number of responses evicted to stay within max_bytes.
+    """
+
+    DEFAULT_KEY_HEADERS: Tuple[str, ...] = (
+        "Accept",
+        "Accept-Encoding",
+        "Accept-Language",
+        "Authorization",
+    )
+
+    DEFAULT_CACHEABLE_STATUSES: FrozenSet[int] = frozenset({200, 203, 300, 301, 308, 404, 410})
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: Optional[float] = None,
+        key_headers: Iterable[str] = DEFAULT_KEY_HEADERS,
+        cacheable_statuses: Iterable[int] = DEFAULT_CACHEABLE_STATUSES,
+    ) -> None:
+        """
+        Initialises a new ResponseCache instance.
+
+        Args:
+            max_bytes (int): The maximum total size of all cached responses in bytes. Defaults to 64 MiB.
+            default_ttl (Optional[float]): Seconds a response without freshness information stays fresh. Defaults to None.
+            key_headers (Iterable[str]): The request headers that are part of the cache key. Defaults to DEFAULT_KEY_HEADERS.
+            cacheable_statuses (Iterable[int]): The status codes of responses that may be stored. Defaults to DEFAULT_CACHEABLE_STATUSES.
+        """
+        self.max_bytes: int = max_bytes
+        self.default_ttl: Optional[float] = default_ttl
+        self.key_headers: Tuple[str, ...] = tuple(key_headers)
+        self.cacheable_statuses: FrozenSet[int] = frozenset(cacheable_statuses)
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidations: int = 0
+        self.evictions: int = 0
+
+        self._entries_: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock_: threading.Lock = threading.Lock()
+        self._size_: int = 0
+
+    def _delete_(self, key: str) -> None:
+        """
+        Removes the entry stored under the given key, if any.
+
+        Args:
+            key (str): The cache key.
+        """
+        with self._lock_:
+            entry: Optional[CachedResponse] = self._entries_.pop(key, None)
+
+            if entry is not None:
+                self._size_ -= entry.size
+
+    def _expires_at_(
+        self,
+        headers: Mapping[str, str],
+        now: float,
+    ) -> Optional[float]:
+        """
+        Computes the time a response stops being fresh from its headers.
+
+        Args:
+            headers (Mapping[str, str]): The headers of the response.
+            now (float): The current UNIX time.
+
+        Returns:
+            Optional[float]: The UNIX time the response stops being fresh, or None if it must not be stored.
+        """
+        directives: Dict[str, str] = {}
+
+        for directive in headers.get("Cache-Control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+
+            directives[name.lower()] = value.strip('"')
+
+        if "no-store" in directives or headers.get("Vary", "").strip() == "*":
+            return None
+
+        has_validator: bool = "ETag" in headers or "Last-Modified" in headers
+
+        # Check, if the response must be revalidated before every use
+        if "no-cache" in directives:
+            return now if has_validator else None
+
+        if "max-age" in directives:
+            try:
+                age: float = float(headers.get("Age", 0))
+
+                return now + max(0.0, float(directives["max-age"]) - age)
+            except ValueError:
+                return now
+
+        if "Expires" in headers:
+            # Imported here, as the email package is slow to import and rarely needed
+            from email.utils import parsedate_to_datetime
+
+            try:
+                return parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return now
+
+        if self.default_ttl is not None:
+            return now + self.default_ttl
+
+        return now if has_validator else None
+
+    def _get_(self, key: str) -> Optional[CachedResponse]:
+        """
+        Returns the entry stored under the given key and marks it as most recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CachedResponse]: The stored entry, or None.
+        """
+        with self._lock_:
+            entry: Optional[CachedResponse] = self._entries_.get(key)
+
+            if entry is not None:
+                self._entries_.move_to_end(key)
+
+            return entry
+
+    def _set_(
+        self,
+        key: str,
+        entry: CachedResponse,
+    ) -> None:
+        """
+        Stores the given entry under the given key and evicts the least recently used entries beyond max_bytes.
+
+        Args:
+            key (str): The cache key.
+            entry (CachedResponse): The entry to store.
+        """
+        with self._lock_:
+            previous: Optional[CachedResponse] = self._entries_.pop(key, None)
+
+            if previous is not None:
+                self._size_ -= previous.size
+
+            self._entries_[key] = entry
+            self._size_ += entry.size
+
+            while self._size_ > self.max_bytes and self._entries_:
+                _, evicted = self._entries_.popitem(last=False)
+
+                self._size_ -= evicted.size
+                self.evictions += 1
+
+    async def alookup(self, key: str) -> Optional[CachedResponse]:
+        """
+        Asynchronously looks up the entry stored under the given key, like lookup.
+
+        The in-memory cache answers on the calling thread, as it never waits for anything.
+        Caches backed by storage override it to keep the event loop free.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CachedResponse]: The stored entry, or None.
+        """
+        return self.lookup(key)
+
+    async def arevalidate(
+        self,
+        key: str,
+        entry: CachedResponse,
+        headers: Mapping[str, str],
+    ) -> Response:
+        """
+        Asynchronously refreshes a stale entry after the origin answered its conditional request with 304, like revalidate.
+
+        Args:
+            key (str): The cache key.
+            entry (CachedResponse): The stale entry that was revalidated.
+            headers (Mapping[str, str]): The headers of the 304 response.
+
+        Returns:
+            Response: The cached response, with the headers of the 304 response merged in.
+        """
+        return self.revalidate(
+            entry=entry,
+            headers=headers,
+            key=key,
+        )
+
+    async def astore(
+        self,
+        key: str,
+        response: Response,
+    ) -> bool:
+        """
+        Asynchronously stores the given response under the given key if its status and headers allow it, like store.
+
+        Args:
+            key (str): The cache key.
+            response (Response): The response to store.
+
+        Returns:
+            bool: True if the response was stored, False otherwise.
+        """
+        return self.store(
+            key=key,
+            response=response,
+        )
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock_:
+            self._entries_.clear()
+            self._size_ = 0
+
+    def conditional_headers(self, entry: CachedResponse) -> Dict[str, str]:
+        """
+        Returns the headers that revalidate the given entry with a conditional request.
+
+        Args:
+            entry (CachedResponse): The stale entry to revalidate.
+
+        Returns:
+            Dict[str, str]: The If-None-Match and If-Modified-Since headers, where validators exist.
+        """
+        headers: Dict[str, str] = {}
+
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        return headers
+
+    def key(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        params: Optional[Any] = None,
+        authorization: Optional[str] = None,
+    ) -> str:
+        """
+        Builds the cache key of a request from its method, URL, query parameters, key headers and credentials.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+            headers (Optional[Mapping[str, str]]): The headers of the request. Defaults to None.
+            params (Optional[Any]): The query parameters passed separately from the URL. Defaults to None.
+            authorization (Optional[str]): The Authorization header a credential provider attaches to the request, which is part of the key even if it is not a key header. Defaults to None.
+
+        Returns:
+            str: A hex digest identifying the request.
+        """
+        lowered: Dict[str, str] = {key.lower(): value for key, value in (headers or {}).items()}
+
+        parts: List[str] = [method.upper(), url, repr(params)]
+
+        parts.extend(lowered.get(name.lower(), "") for name in self.key_headers)
+
+        # Check, if the request is sent with the credentials of a provider
+        if authorization is not None:
+            parts.append(authorization)
+
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        """
+        Returns the entry stored under the given key, counting a hit if it is fresh and a miss otherwise.
+
+        A stale entry is still returned, so it can be revalidated.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CachedResponse]: The stored entry, or None.
+        """
+        entry: Optional[CachedResponse] = self._get_(key)
+
+        if entry is not None and entry.is_fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return entry
+
+    def revalidate(
+        self,
+        key: str,
+        entry: CachedResponse,
+        headers: Mapping[str, str],
+    ) -> Response:
+        """
+        Refreshes a stale entry after the origin answered its conditional request with 304.
+
+        Args:
+            key (str): The cache key.
+            entry (CachedResponse): The stale entry that was revalidated.
+            headers (Mapping[str, str]): The headers of the 304 response.
+
+        Returns:
+            Response: The cached response, with the headers of the 304 response merged in.
+        """
+        self.revalidations += 1
+
+        merged: CIMultiDict = CIMultiDict(entry.response.headers)
+
+        for name in ("Cache-Control", "Date", "ETag", "Expires", "Last-Modified"):
+            if name in headers:
+                merged[name] = headers[name]
+
+        response: Response = Response(
+            body=entry.response.body,
+            headers=CIMultiDictProxy(merged),
+            status=entry.response.status,
+            url=entry.response.url,
+        )
+
+        now: float = time.time()
+
+        expires_at: Optional[float] = self._expires_at_(
+            headers=response.headers,
+            now=now,
+        )
+
+        if expires_at is None:
+            self._delete_(key)
+        else:
+            self._set_(
+                entry=CachedResponse(
+                    expires_at=expires_at,
+                    response=response,
+                    stored_at=now,
+                ),
+                key=key,
+            )
+
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counters and current size of the cache.
+
+        Returns:
+            Dict[str, int]: The hits, misses, revalidations, evictions, entries and bytes of the cache.
+        """
+        with self._lock_:
+            return {
+                "bytes": self._size_,
+                "entries": len(self._entries_),
+                "evictions": self.evictions,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+            }
+
+    def store(
+        self,
+        key: str,
+        response: Response,
+    ) -> bool:
+        """
+        Stores the given response under the given key if its status and headers allow it.
+
+        Args:
+            key (str): The cache key.
+            response (Response): The response to store.
+
+        Returns:
+            bool: True if the response was stored, False otherwise.
+        """
+        if response.status not in self.cacheable_statuses:
+            return False
+
+        now: float = time.time()
+
+        expires_at: Optional[float] = self._expires_at_(
+            headers=response.headers,
+            now=now,
+        )
+
+        if expires_at is None:
+            self._delete_(key)
+
+            return False
+
+        entry: CachedResponse = CachedResponse(
+            expires_at=expires_at,
+            response=response,
+            stored_at=now,
+        )
+
+        # Check, if the response could never fit into the cache
+        if entry.size > self.max_bytes:
+            return False
+
+        self._set_(
+            entry=entry,
+            key=key,
+        )
+
+        return True
+
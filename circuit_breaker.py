@@ -0,0 +1,197 @@
+import threading
+import time
+
+from typing import *
+
+__all__: List[str] = ["CircuitBreaker", "CircuitOpenError"]
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of sending a request to a host whose circuit is open.
+
+    Attributes:
+        host (str): The host whose circuit is open.
+        retry_in (float): Seconds until the circuit lets a probe request through.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        retry_in: float,
+    ) -> None:
+        """
+        Initialises a new CircuitOpenError instance.
+
+        Args:
+            host (str): The host whose circuit is open.
+            retry_in (float): Seconds until the circuit lets a probe request through.
+        """
+        super().__init__(f"Circuit for host '{host}' is open, retry in {retry_in:.1f}s.")
+
+        self.host: str = host
+        self.retry_in: float = retry_in
+
+
+class _Circuit:
+    """
+    The state of the circuit of a single host.
+    """
+
+    __slots__ = ("failures", "opened_at", "probes", "state")
+
+    def __init__(self) -> None:
+        """
+        Initialises a new _Circuit instance, closed and without failures.
+        """
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self.probes: int = 0
+        self.state: str = CircuitBreaker.CLOSED
+
+
+class CircuitBreaker:
+    """
+    A per-host circuit breaker that fails fast while a host is unhealthy.
+
+    A circuit opens after 'failure_threshold' consecutive failures. While it is open, requests
+    to the host raise CircuitOpenError without being sent. After 'recovery_timeout' seconds the
+    circuit is half-open and lets up to 'half_open_max_calls' probe requests through: a success
+    closes it again, a failure opens it for another 'recovery_timeout'.
+
+    Attributes:
+        failure_threshold (int): The number of consecutive failures that open a circuit.
+        recovery_timeout (float): Seconds a circuit stays open before it lets a probe through.
+        half_open_max_calls (int): The number of concurrent probe requests of a half-open circuit.
+        failure_statuses (FrozenSet[int]): The response statuses counted as failures.
+        rejected (int): The number of requests rejected by open circuits.
+    """
+
+    CLOSED: str = "closed"
+    HALF_OPEN: str = "half_open"
+    OPEN: str = "open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        failure_statuses: Iterable[int] = (500, 502, 503, 504),
+    ) -> None:
+        """
+        Initialises a new CircuitBreaker instance.
+
+        Args:
+            failure_threshold (int): The number of consecutive failures that open a circuit. Defaults to 5.
+            recovery_timeout (float): Seconds a circuit stays open before it lets a probe through. Defaults to 30.0.
+            half_open_max_calls (int): The number of concurrent probe requests of a half-open circuit. Defaults to 1.
+            failure_statuses (Iterable[int]): The response statuses counted as failures. Defaults to 500, 502, 503 and 504.
+        """
+        self.failure_threshold: int = failure_threshold
+        self.recovery_timeout: float = recovery_timeout
+        self.half_open_max_calls: int = half_open_max_calls
+        self.failure_statuses: FrozenSet[int] = frozenset(failure_statuses)
+
+        self.rejected: int = 0
+
+        self._circuits_: Dict[str, _Circuit] = {}
+        self._lock_: threading.Lock = threading.Lock()
+
+    def _circuit_(self, host: str) -> _Circuit:
+        """
+        Returns the circuit of the given host, creating it on first use.
+
+        Args:
+            host (str): The host of the circuit.
+
+        Returns:
+            _Circuit: The circuit of the host.
+        """
+        circuit: Optional[_Circuit] = self._circuits_.get(host)
+
+        if circuit is None:
+            circuit = self._circuits_[host] = _Circuit()
+
+        return circuit
+
+    def before_request(self, host: str) -> None:
+        """
+        Checks whether a request to the given host may be sent.
+
+        Args:
+            host (str): The host the request is sent to.
+
+        Raises:
+            CircuitOpenError: If the circuit of the host is open, or half-open with all probes in flight.
+        """
+        with self._lock_:
+            circuit: _Circuit = self._circuit_(host)
+
+            if circuit.state == self.CLOSED:
+                return
+
+            now: float = time.monotonic()
+
+            retry_in: float = circuit.opened_at + self.recovery_timeout - now
+
+            # Check, if the circuit has been open long enough to let probes through, or its probes never reported back
+            if retry_in <= 0:
+                circuit.state = self.HALF_OPEN
+                circuit.opened_at = now
+                circuit.probes = 0
+
+                retry_in = self.recovery_timeout
+
+            if circuit.state == self.HALF_OPEN and circuit.probes < self.half_open_max_calls:
+                circuit.probes += 1
+
+                return
+
+            self.rejected += 1
+
+        raise CircuitOpenError(
+            host=host,
+            retry_in=max(0.0, retry_in),
+        )
+
+    def record_failure(self, host: str) -> None:
+        """
+        Records a failed request to the given host, opening its circuit if the threshold is reached.
+
+        Args:
+            host (str): The host the request was sent to.
+        """
+        with self._lock_:
+            circuit: _Circuit = self._circuit_(host)
+
+            circuit.failures += 1
+
+            if circuit.state == self.HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = self.OPEN
+                circuit.opened_at = time.monotonic()
+
+    def record_success(self, host: str) -> None:
+        """
+        Records a successful request to the given host, closing its circuit.
+
+        Args:
+            host (str): The host the request was sent to.
+        """
+        with self._lock_:
+            circuit: _Circuit = self._circuit_(host)
+
+            circuit.failures = 0
+            circuit.state = self.CLOSED
+
+    def state(self, host: str) -> str:
+        """
+        Returns the state of the circuit of the given host.
+
+        Args:
+            host (str): The host of the circuit.
+
+        Returns:
+            str: CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN or CircuitBreaker.OPEN.
+        """
+        with self._lock_:
+            return self._circuit_(host).state
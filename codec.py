@@ -0,0 +1,144 @@
+import json
+
+from typing import *
+
+__all__: List[str] = ["JSONCodec"]
+
+
+class JSONCodec:
+    """
+    A pluggable JSON encoder and decoder.
+
+    orjson and msgspec decode large payloads several times faster than the standard library,
+    so the default codec uses whichever of them is installed and falls back to the json module.
+
+    Attributes:
+        name (str): The name of the library backing the codec.
+    """
+
+    _default_: Optional["JSONCodec"] = None
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[Union[bytes, str]], Any],
+    ) -> None:
+        """
+        Initialises a new JSONCodec instance.
+
+        Args:
+            name (str): The name of the library backing the codec.
+            dumps (Callable[[Any], bytes]): Encodes an object as UTF-8 JSON.
+            loads (Callable[[Union[bytes, str]], Any]): Decodes JSON from bytes or a string.
+        """
+        self.name: str = name
+
+        self._dumps_: Callable[[Any], bytes] = dumps
+        self._loads_: Callable[[Union[bytes, str]], Any] = loads
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the codec.
+
+        Returns:
+            str: The string representation of the codec.
+        """
+        return f"<JSONCodec {self.name}>"
+
+    @classmethod
+    def default(cls) -> "JSONCodec":
+        """
+        Returns the fastest codec available, i.e. orjson, then msgspec, then the json module.
+
+        Returns:
+            JSONCodec: The default codec, created once on first use.
+        """
+        if cls._default_ is None:
+            for factory in (cls.orjson, cls.msgspec):
+                try:
+                    cls._default_ = factory()
+
+                    break
+                except ImportError:
+                    continue
+            else:
+                cls._default_ = cls.stdlib()
+
+        return cls._default_
+
+    def dumps(self, value: Any) -> bytes:
+        """
+        Encodes the given object as UTF-8 JSON.
+
+        Args:
+            value (Any): The object to encode.
+
+        Returns:
+            bytes: The encoded JSON.
+        """
+        return self._dumps_(value)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes JSON from bytes or a string.
+
+        Args:
+            data (Union[bytes, str]): The JSON to decode.
+
+        Returns:
+            Any: The decoded object.
+        """
+        return self._loads_(data)
+
+    @classmethod
+    def msgspec(cls) -> "JSONCodec":
+        """
+        Returns a codec backed by msgspec.
+
+        Returns:
+            JSONCodec: The msgspec codec.
+
+        Raises:
+            ImportError: If msgspec is not installed.
+        """
+        import msgspec.json
+
+        return cls(
+            dumps=msgspec.json.encode,
+            loads=msgspec.json.decode,
+            name="msgspec",
+        )
+
+    @classmethod
+    def orjson(cls) -> "JSONCodec":
+        """
+        Returns a codec backed by orjson.
+
+        Returns:
+            JSONCodec: The orjson codec.
+
+        Raises:
+            ImportError: If orjson is not installed.
+        """
+        import orjson
+
+        return cls(
+            dumps=orjson.dumps,
+            loads=orjson.loads,
+            name="orjson",
+        )
+
+    @classmethod
+    def stdlib(cls) -> "JSONCodec":
+        """
+        Returns a codec backed by the json module of the standard library.
+
+        Returns:
+            JSONCodec: The standard library codec.
+        """
+        return cls(
+            dumps=lambda value: json.dumps(value).encode(),
+            loads=json.loads,
+            name="json",
+        )
@@ -0,0 +1,264 @@
+import asyncio
+import importlib
+import importlib.util
+import zlib
+
+from functools import lru_cache
+from typing import *
+
+__all__: List[str] = [
+    "BodyCompressor",
+    "accept_encoding",
+    "aiohttp_encodings",
+    "compress",
+    "httpx_encodings",
+    "installed_encodings",
+]
+
+
+# The content codings in the order they are preferred, best compression first
+_PREFERENCE: Tuple[str, ...] = ("zstd", "br", "gzip", "deflate")
+
+# The modules providing each optional coding, in the order they are tried
+_BROTLI: Tuple[str, ...] = ("brotli", "brotlicffi")
+_ZSTD: Tuple[str, ...] = ("compression.zstd", "backports.zstd", "zstandard")
+
+
+def _find_(*names: str) -> Optional[str]:
+    """
+    Returns the first of the given modules that is installed, without importing it.
+
+    Args:
+        *names (str): The names of the modules, possibly dotted.
+
+    Returns:
+        Optional[str]: The name of the first installed module, or None if none is.
+    """
+    for name in names:
+        try:
+            if importlib.util.find_spec(name) is not None:
+                return name
+        except (ImportError, ValueError):
+            continue
+
+    return None
+
+
+def _order_(encodings: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Returns the given content codings in the order they are preferred.
+
+    Args:
+        encodings (Iterable[str]): The content codings.
+
+    Returns:
+        Tuple[str, ...]: The known codings among them, best compression first.
+    """
+    present: Set[str] = set(encodings)
+
+    return tuple(encoding for encoding in _PREFERENCE if encoding in present)
+
+
+@lru_cache(maxsize=1)
+def installed_encodings() -> Tuple[str, ...]:
+    """
+    Returns the content codings this process can compress, i.e. gzip and deflate plus brotli and zstd if installed.
+
+    Returns:
+        Tuple[str, ...]: The codings, best compression first.
+    """
+    encodings: List[str] = ["gzip", "deflate"]
+
+    if _find_(*_BROTLI):
+        encodings.append("br")
+
+    if _find_(*_ZSTD):
+        encodings.append("zstd")
+
+    return _order_(encodings)
+
+
+@lru_cache(maxsize=1)
+def aiohttp_encodings() -> Tuple[str, ...]:
+    """
+    Returns the content codings aiohttp decodes in this process.
+
+    Returns:
+        Tuple[str, ...]: The codings, best compression first.
+    """
+    from aiohttp import compression_utils
+
+    encodings: List[str] = ["gzip", "deflate"]
+
+    if getattr(compression_utils, "HAS_BROTLI", False):
+        encodings.append("br")
+
+    # Versions before 3.12 cannot decode zstd at all
+    if getattr(compression_utils, "HAS_ZSTD", False):
+        encodings.append("zstd")
+
+    return _order_(encodings)
+
+
+@lru_cache(maxsize=1)
+def httpx_encodings() -> Tuple[str, ...]:
+    """
+    Returns the content codings httpx decodes in this process.
+
+    Returns:
+        Tuple[str, ...]: The codings, best compression first.
+    """
+    encodings: List[str] = ["gzip", "deflate"]
+
+    if _find_(*_BROTLI):
+        encodings.append("br")
+
+    # httpx decodes zstd with the zstandard package only
+    if _find_("zstandard"):
+        encodings.append("zstd")
+
+    return _order_(encodings)
+
+
+def accept_encoding(encodings: Iterable[str]) -> str:
+    """
+    Returns an Accept-Encoding header value asking for the given codings, weighted by preference.
+
+    Args:
+        encodings (Iterable[str]): The codings the response may be encoded with.
+
+    Returns:
+        str: The header value, e.g. "zstd, br;q=0.9, gzip;q=0.8, deflate;q=0.7".
+    """
+    return ", ".join(
+        encoding if not index else f"{encoding};q={1.0 - index / 10:.1f}"
+        for index, encoding in enumerate(_order_(encodings))
+    )
+
+
+def compress(
+    data: Union[bytes, bytearray, memoryview],
+    encoding: str,
+    level: Optional[int] = None,
+) -> bytes:
+    """
+    Compresses data with the given content coding.
+
+    Args:
+        data (Union[bytes, bytearray, memoryview]): The data to compress.
+        encoding (str): The content coding, "gzip", "deflate", "br" or "zstd".
+        level (Optional[int]): The compression level, or None for a level suited to request bodies. Defaults to None.
+
+    Returns:
+        bytes: The compressed data.
+
+    Raises:
+        ValueError: If the coding is unknown or its library is not installed.
+    """
+    if encoding in ("gzip", "deflate"):
+        compressor: Any = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+            zlib.DEFLATED,
+            31 if encoding == "gzip" else 15,
+        )
+
+        return compressor.compress(data) + compressor.flush()
+
+    if encoding == "br" and (name := _find_(*_BROTLI)):
+        # The default quality of 11 is far too slow for request bodies
+        return importlib.import_module(name).compress(bytes(data), quality=4 if level is None else level)
+
+    if encoding == "zstd" and (name := _find_(*_ZSTD)):
+        module: Any = importlib.import_module(name)
+
+        if name == "zstandard":
+            return module.ZstdCompressor(level=3 if level is None else level).compress(data)
+
+        return module.compress(data, level=level)
+
+    raise ValueError(f"Cannot compress with '{encoding}', the codings available are: {', '.join(installed_encodings())}.")
+
+
+class BodyCompressor:
+    """
+    Compresses request bodies above a size threshold, for WebService to send them with a Content-Encoding header.
+
+    Small bodies are sent as they are, as compressing them saves less time on the wire than
+    it costs. Large bodies are compressed on the default executor, so compressing several
+    megabytes never blocks the event loop.
+
+    Attributes:
+        encoding (str): The content coding, "gzip", "deflate", "br" or "zstd".
+        min_size (int): The size in bytes from which bodies are compressed.
+        level (Optional[int]): The compression level, or None for a level suited to request bodies.
+        executor_size (int): The size in bytes from which bodies are compressed on the default executor.
+    """
+
+    def __init__(
+        self,
+        encoding: str = "gzip",
+        min_size: int = 16 * 1024,
+        level: Optional[int] = None,
+        executor_size: int = 256 * 1024,
+    ) -> None:
+        """
+        Initialises a new BodyCompressor instance.
+
+        Args:
+            encoding (str): The content coding, "gzip", "deflate", "br" or "zstd". Defaults to "gzip".
+            min_size (int): The size in bytes from which bodies are compressed. Defaults to 16 KiB.
+            level (Optional[int]): The compression level. Defaults to None, i.e. a level suited to request bodies.
+            executor_size (int): The size in bytes from which bodies are compressed on the default executor. Defaults to 256 KiB.
+
+        Raises:
+            ValueError: If the coding is unknown or its library is not installed.
+        """
+        if encoding not in installed_encodings():
+            raise ValueError(f"Cannot compress with '{encoding}', the codings available are: {', '.join(installed_encodings())}.")
+
+        self.encoding: str = encoding
+        self.min_size: int = min_size
+        self.level: Optional[int] = level
+        self.executor_size: int = executor_size
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the compressor.
+
+        Returns:
+            str: The string representation of the compressor.
+        """
+        return f"<BodyCompressor {self.encoding} from {self.min_size} bytes>"
+
+    async def compress(self, data: Union[bytes, bytearray, memoryview]) -> bytes:
+        """
+        Compresses a body, on the default executor if it is large.
+
+        Args:
+            data (Union[bytes, bytearray, memoryview]): The body to compress.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        if len(data) < self.executor_size:
+            return compress(data, self.encoding, self.level)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            compress,
+            data,
+            self.encoding,
+            self.level,
+        )
+
+    def should_compress(self, data: Any) -> bool:
+        """
+        Returns whether a request body is compressed.
+
+        Args:
+            data (Any): The body of the request.
+
+        Returns:
+            bool: True for bytes of at least min_size, False for smaller or streamed bodies.
+        """
+        return isinstance(data, (bytes, bytearray)) and len(data) >= self.min_size
@@ -0,0 +1,547 @@
+import asyncio
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+
+from typing import *
+from urllib.parse import urlsplit
+
+from batch import BatchResult, RequestSpec
+from response import Response
+from web_service import WebService
+
+__all__: List[str] = ["CrawlExecutor"]
+
+
+# A request as it is sent to a worker: (index, method, url, kwargs, log)
+_Item = Tuple[int, str, str, Dict[str, Any], bool]
+
+# A result as it is sent back to the parent: (index, result, error)
+_Outcome = Tuple[int, Any, Optional[BaseException]]
+
+
+def _portable_(error: BaseException) -> BaseException:
+    """
+    Returns the given exception if it survives pickling, or a RuntimeError describing it otherwise.
+
+    Args:
+        error (BaseException): The exception raised by a request.
+
+    Returns:
+        BaseException: An exception that can be sent to the parent process.
+    """
+    try:
+        pickle.loads(pickle.dumps(error))
+
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _take_(
+    inbox: "multiprocessing.Queue",
+    stop: "multiprocessing.synchronize.Event",
+    poll_interval: float,
+) -> Optional[List[_Item]]:
+    """
+    Blocks until the next batch of requests arrives. Runs in an executor thread of a worker.
+
+    Args:
+        inbox (multiprocessing.Queue): The queue the parent sends batches of requests to.
+        stop (multiprocessing.synchronize.Event): The event set when the crawl is cancelled.
+        poll_interval (float): Seconds between checks of the stop event.
+
+    Returns:
+        Optional[List[_Item]]: The next batch, or None once the input is exhausted or the crawl is cancelled.
+    """
+    while not stop.is_set():
+        try:
+            return inbox.get(timeout=poll_interval)
+        except queue.Empty:
+            continue
+
+    return None
+
+
+async def _crawl_(
+    inbox: "multiprocessing.Queue",
+    outbox: "multiprocessing.Queue",
+    stop: "multiprocessing.synchronize.Event",
+    concurrency: int,
+    per_host: Optional[int],
+    batch_size: int,
+    flush_interval: float,
+    transform: Optional[Callable[[Any], Any]],
+) -> None:
+    """
+    Sends the requests arriving on the inbox and sends their outcomes to the outbox in batches.
+
+    At most 'concurrency' requests are in flight or waiting to be flushed, so a parent that
+    stops reading the outbox eventually stops the worker from taking new requests.
+
+    Args:
+        inbox (multiprocessing.Queue): The queue the parent sends batches of requests to.
+        outbox (multiprocessing.Queue): The queue batches of outcomes are sent to.
+        stop (multiprocessing.synchronize.Event): The event set when the crawl is cancelled.
+        concurrency (int): The maximum number of requests in flight or waiting to be flushed.
+        per_host (Optional[int]): The maximum number of requests in flight per host, or None for no limit.
+        batch_size (int): The number of outcomes sent to the parent at once.
+        flush_interval (float): Seconds after which an incomplete batch of outcomes is sent.
+        transform (Optional[Callable[[Any], Any]]): Applied to every decoded response before it is sent.
+    """
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+    window: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+    host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    buffer: List[_Outcome] = []
+
+    full: asyncio.Event = asyncio.Event()
+
+    tasks: Set[asyncio.Task] = set()
+
+    async def __send__(
+        index: int,
+        method: str,
+        url: str,
+        kwargs: Dict[str, Any],
+        log: bool,
+    ) -> None:
+        """
+        Sends a single request and buffers its outcome.
+        """
+        try:
+            # Check, if the number of requests per host is limited
+            if per_host is None:
+                response: Response = await WebService.arequest(
+                    log=log,
+                    method=method,
+                    url=url,
+                    **kwargs,
+                )
+            else:
+                host: str = urlsplit(url).netloc
+
+                if host not in host_semaphores:
+                    host_semaphores[host] = asyncio.Semaphore(per_host)
+
+                async with host_semaphores[host]:
+                    response = await WebService.arequest(
+                        log=log,
+                        method=method,
+                        url=url,
+                        **kwargs,
+                    )
+
+            # Decode, and transform, in the worker, so the parent never spends time on it
+            result: Any = response.data
+
+            if transform is not None:
+                result = transform(result)
+
+            buffer.append((index, result, None))
+        except Exception as e:
+            buffer.append((index, None, _portable_(e)))
+
+        if len(buffer) >= batch_size:
+            full.set()
+
+    async def __flush__() -> None:
+        """
+        Sends the buffered outcomes to the parent and frees their slots in the window.
+        """
+        nonlocal buffer
+
+        if not buffer:
+            return
+
+        batch, buffer = buffer, []
+
+        full.clear()
+
+        # Blocks while the outbox is full, which is what holds the worker back
+        await loop.run_in_executor(None, outbox.put, batch)
+
+        for _ in batch:
+            window.release()
+
+    async def __flusher__() -> None:
+        """
+        Flushes the buffer whenever a batch is complete or the flush interval has passed.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(full.wait(), flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            await __flush__()
+
+    flusher: asyncio.Task = asyncio.ensure_future(__flusher__())
+
+    try:
+        while True:
+            batch: Optional[List[_Item]] = await loop.run_in_executor(None, _take_, inbox, stop, flush_interval)
+
+            if batch is None:
+                break
+
+            for index, method, url, kwargs, log in batch:
+                await window.acquire()
+
+                task: asyncio.Task = asyncio.ensure_future(__send__(index, method, url, kwargs, log))
+
+                tasks.add(task)
+
+                task.add_done_callback(tasks.discard)
+
+        # Wait for the requests in flight, unless the crawl is cancelled in the meantime
+        while tasks and not stop.is_set():
+            await asyncio.wait(tasks, timeout=flush_interval)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        flusher.cancel()
+
+        await asyncio.gather(flusher, *tasks, return_exceptions=True)
+
+    if not stop.is_set():
+        await __flush__()
+
+
+def _work_(
+    inbox: "multiprocessing.Queue",
+    outbox: "multiprocessing.Queue",
+    stop: "multiprocessing.synchronize.Event",
+    configure: Optional[Mapping[str, Any]],
+    concurrency: int,
+    per_host: Optional[int],
+    batch_size: int,
+    flush_interval: float,
+    transform: Optional[Callable[[Any], Any]],
+) -> None:
+    """
+    The entry point of a worker process, running its own event loop and pooled session.
+    """
+    # Leave KeyboardInterrupt to the parent, which cancels the crawl gracefully
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if configure is not None:
+        WebService.configure(**configure)
+
+    async def __main__() -> None:
+        """
+        Runs the crawl and closes the pooled session of the worker.
+        """
+        try:
+            await _crawl_(
+                batch_size=batch_size,
+                concurrency=concurrency,
+                flush_interval=flush_interval,
+                inbox=inbox,
+                outbox=outbox,
+                per_host=per_host,
+                stop=stop,
+                transform=transform,
+            )
+        finally:
+            await WebService.aclose()
+
+    asyncio.run(__main__())
+
+    # Tell the parent that this worker is done
+    outbox.put(None)
+
+
+class CrawlExecutor:
+    """
+    Sends a large number of requests from several worker processes, one event loop and pooled session each.
+
+    A single event loop is bound to one core, which JSON decoding and TLS saturate at a few
+    thousand requests per second. The executor spreads the requests over worker processes
+    through a shared queue, so idle workers take the next batch and the load stays balanced.
+    Responses are decoded, and optionally reduced by 'transform', in the workers and sent
+    back in batches, which keeps the pickling cost per request low.
+
+    Both queues are bounded: a consumer that stops reading holds back the workers, which
+    stop taking requests, which stops the requests iterable from being consumed. Closing
+    the iterator returned by map(), or calling cancel(), stops the workers gracefully.
+
+    Attributes:
+        processes (int): The number of worker processes.
+        concurrency (int): The maximum number of requests in flight per worker.
+        per_host (Optional[int]): The maximum number of requests in flight per host and worker, or None for no limit.
+        batch_size (int): The number of requests or results sent between processes at once.
+        flush_interval (float): Seconds after which an incomplete batch of results is sent.
+        prefetch (int): The number of batches queued per worker in each direction.
+        configure (Optional[Mapping[str, Any]]): Keyword arguments for WebService.configure() in every worker.
+        transform (Optional[Callable[[Any], Any]]): Applied to every decoded response in the worker, e.g. to extract fields.
+        start_method (Optional[str]): The multiprocessing start method, or None for the platform default.
+        shutdown_timeout (float): Seconds to wait for workers to exit before they are terminated.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        concurrency: int = 100,
+        per_host: Optional[int] = None,
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        prefetch: int = 2,
+        configure: Optional[Mapping[str, Any]] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
+        start_method: Optional[str] = None,
+        shutdown_timeout: float = 5.0,
+    ) -> None:
+        """
+        Initialises a new CrawlExecutor instance.
+
+        The configure mapping and the transform callable are sent to the workers, so with
+        the "spawn" and "forkserver" start methods they have to be picklable, i.e. transform
+        has to be a module-level function.
+
+        Args:
+            processes (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+            concurrency (int): The maximum number of requests in flight per worker. Defaults to 100.
+            per_host (Optional[int]): The maximum number of requests in flight per host and worker. Defaults to None.
+            batch_size (int): The number of requests or results sent between processes at once. Defaults to 64.
+            flush_interval (float): Seconds after which an incomplete batch of results is sent. Defaults to 0.05.
+            prefetch (int): The number of batches queued per worker in each direction. Defaults to 2.
+            configure (Optional[Mapping[str, Any]]): Keyword arguments for WebService.configure() in every worker. Defaults to None.
+            transform (Optional[Callable[[Any], Any]]): Applied to every decoded response in the worker. Defaults to None.
+            start_method (Optional[str]): The multiprocessing start method. Defaults to None.
+            shutdown_timeout (float): Seconds to wait for workers to exit before they are terminated. Defaults to 5.0.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+
+        self.processes: int = processes or os.cpu_count() or 1
+        self.concurrency: int = concurrency
+        self.per_host: Optional[int] = per_host
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.prefetch: int = max(1, prefetch)
+        self.configure: Optional[Mapping[str, Any]] = configure
+        self.transform: Optional[Callable[[Any], Any]] = transform
+        self.start_method: Optional[str] = start_method
+        self.shutdown_timeout: float = shutdown_timeout
+
+        self._stop_: Optional["multiprocessing.synchronize.Event"] = None
+
+    def cancel(self) -> None:
+        """
+        Cancels the running crawl. Requests in flight are abandoned and map() stops yielding.
+        """
+        if self._stop_ is not None:
+            self._stop_.set()
+
+    def map(self, requests: Iterable[Union[str, RequestSpec]]) -> Iterator[BatchResult]:
+        """
+        Sends the given requests from the worker processes and yields their results as they complete.
+
+        The requests iterable is consumed lazily by a background thread. Results are yielded
+        in completion order, and exceptions raised by single requests are captured in their
+        BatchResult instead of aborting the crawl.
+
+        Args:
+            requests (Iterable[Union[str, RequestSpec]]): The URLs or RequestSpecs to send. Plain URLs are sent as GET requests.
+
+        Returns:
+            Iterator[BatchResult]: An iterator of BatchResults in completion order.
+
+        Raises:
+            RuntimeError: If a worker process dies unexpectedly.
+        """
+        context: multiprocessing.context.BaseContext = multiprocessing.get_context(self.start_method)
+
+        inbox: "multiprocessing.Queue" = context.Queue(maxsize=self.processes * self.prefetch)
+        outbox: "multiprocessing.Queue" = context.Queue(maxsize=self.processes * self.prefetch)
+
+        stop: "multiprocessing.synchronize.Event" = context.Event()
+
+        self._stop_ = stop
+
+        workers: List[multiprocessing.process.BaseProcess] = [
+            context.Process(
+                args=(
+                    inbox,
+                    outbox,
+                    stop,
+                    self.configure,
+                    self.concurrency,
+                    self.per_host,
+                    self.batch_size,
+                    self.flush_interval,
+                    self.transform,
+                ),
+                daemon=True,
+                name=f"CrawlExecutor-{number}",
+                target=_work_,
+            )
+            for number in range(self.processes)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        # The requests sent but not yet yielded, which is bounded by the queues and windows
+        pending: Dict[int, RequestSpec] = {}
+
+        failures: List[BaseException] = []
+
+        lock: threading.Lock = threading.Lock()
+
+        def __put__(item: Any) -> bool:
+            """
+            Puts the given item into the inbox, giving up once the crawl is cancelled.
+
+            Returns:
+                bool: True if the item was queued, False if the crawl was cancelled.
+            """
+            while not stop.is_set():
+                try:
+                    inbox.put(item, timeout=self.flush_interval)
+
+                    return True
+                except queue.Full:
+                    continue
+
+            return False
+
+        def __feed__() -> None:
+            """
+            Consumes the requests iterable and sends it to the workers in batches.
+            """
+            batch: List[_Item] = []
+
+            try:
+                for index, request in enumerate(requests):
+                    request = RequestSpec.coerce(request)
+
+                    with lock:
+                        pending[index] = request
+
+                    batch.append((index, request.method, request.url, request.kwargs, request.log))
+
+                    if len(batch) >= self.batch_size:
+                        if not __put__(batch):
+                            return
+
+                        batch = []
+
+                if batch and not __put__(batch):
+                    return
+
+                # Tell every worker that the input is exhausted
+                for _ in workers:
+                    if not __put__(None):
+                        return
+            except BaseException as e:
+                failures.append(e)
+
+                stop.set()
+
+        feeder: threading.Thread = threading.Thread(
+            daemon=True,
+            name="CrawlExecutor-feeder",
+            target=__feed__,
+        )
+
+        feeder.start()
+
+        finished: int = 0
+
+        try:
+            while finished < len(workers) and not stop.is_set():
+                try:
+                    batch: Optional[List[_Outcome]] = outbox.get(timeout=self.flush_interval * 10)
+                except queue.Empty:
+                    # Check, if a worker died without saying it is done
+                    for worker in workers:
+                        if worker.exitcode not in (None, 0):
+                            raise RuntimeError(f"Worker process '{worker.name}' exited with code {worker.exitcode}.")
+
+                    continue
+
+                if batch is None:
+                    finished += 1
+
+                    continue
+
+                for index, result, error in batch:
+                    with lock:
+                        request: RequestSpec = pending.pop(index)
+
+                    yield BatchResult(
+                        error=error,
+                        index=index,
+                        request=request,
+                        result=result,
+                    )
+
+            if failures:
+                raise failures[0]
+        finally:
+            self._shutdown_(
+                feeder=feeder,
+                inbox=inbox,
+                outbox=outbox,
+                stop=stop,
+                workers=workers,
+            )
+
+    def _shutdown_(
+        self,
+        feeder: threading.Thread,
+        inbox: "multiprocessing.Queue",
+        outbox: "multiprocessing.Queue",
+        stop: "multiprocessing.synchronize.Event",
+        workers: List[multiprocessing.process.BaseProcess],
+    ) -> None:
+        """
+        Stops the feeder and the workers, terminating workers that do not exit within the shutdown timeout.
+
+        Args:
+            feeder (threading.Thread): The thread consuming the requests iterable.
+            inbox (multiprocessing.Queue): The queue of requests.
+            outbox (multiprocessing.Queue): The queue of results.
+            stop (multiprocessing.synchronize.Event): The event cancelling the crawl.
+            workers (List[multiprocessing.process.BaseProcess]): The worker processes.
+        """
+        stop.set()
+
+        feeder.join()
+
+        deadline: float = self.shutdown_timeout
+
+        for worker in workers:
+            while worker.is_alive() and deadline > 0:
+                # Drain the outbox, as a worker blocked on putting results never sees the stop event
+                try:
+                    while True:
+                        outbox.get_nowait()
+                except queue.Empty:
+                    pass
+
+                worker.join(self.flush_interval)
+
+                deadline -= self.flush_interval
+
+            if worker.is_alive():
+                worker.terminate()
+
+                worker.join()
+
+        for channel in (inbox, outbox):
+            channel.cancel_join_thread()
+            channel.close()
+
+        self._stop_ = None
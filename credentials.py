@@ -0,0 +1,306 @@
+import asyncio
+import base64
+import time
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import *
+
+from single_flight import SingleFlight
+
+__all__: List[str] = [
+    "BearerTokenProvider",
+    "CredentialProvider",
+    "StaticCredentials",
+    "encode_basic",
+    "oauth2_client_credentials",
+]
+
+
+# Fetches a bearer token, returning the token and its lifetime in seconds, or None if it does not expire
+TokenFetcher = Callable[[], Awaitable[Tuple[str, Optional[float]]]]
+
+
+@lru_cache(maxsize=64)
+def encode_basic(username: str, password: str) -> str:
+    """
+    Returns the value of a Basic Authorization header, encoding every pair of credentials only once.
+
+    Args:
+        username (str): The username.
+        password (str): The password.
+
+    Returns:
+        str: "Basic" followed by the base64 encoded "username:password".
+    """
+    return f"Basic {base64.b64encode(f'{username}:{password}'.encode()).decode()}"
+
+
+class CredentialProvider(ABC):
+    """
+    Supplies the Authorization header of requests, which WebService attaches to every attempt.
+    """
+
+    @abstractmethod
+    async def authorization(self) -> str:
+        """
+        Returns the current value of the Authorization header.
+
+        Returns:
+            str: The header value, e.g. "Bearer <token>".
+        """
+
+    def close(self) -> None:
+        """
+        Releases the resources of the provider, e.g. scheduled refreshes.
+        """
+
+
+class StaticCredentials(CredentialProvider):
+    """
+    Supplies an Authorization header that never changes, encoded once.
+
+    Attributes:
+        value (str): The value of the Authorization header.
+    """
+
+    def __init__(self, value: str) -> None:
+        """
+        Initialises a new StaticCredentials instance.
+
+        Args:
+            value (str): The value of the Authorization header.
+        """
+        self.value: str = value
+
+    @classmethod
+    def basic(
+        cls,
+        username: str,
+        password: str,
+    ) -> "StaticCredentials":
+        """
+        Returns credentials for Basic authentication.
+
+        Args:
+            username (str): The username.
+            password (str): The password.
+
+        Returns:
+            StaticCredentials: The credentials with the encoded username and password.
+        """
+        return cls(encode_basic(username, password))
+
+    @classmethod
+    def bearer(cls, token: str) -> "StaticCredentials":
+        """
+        Returns credentials for a bearer token that does not expire.
+
+        Args:
+            token (str): The bearer token.
+
+        Returns:
+            StaticCredentials: The credentials with the token.
+        """
+        return cls(f"Bearer {token}")
+
+    async def authorization(self) -> str:
+        """
+        Returns the value of the Authorization header.
+
+        Returns:
+            str: The header value.
+        """
+        return self.value
+
+
+class BearerTokenProvider(CredentialProvider):
+    """
+    Supplies bearer tokens from a token endpoint, refreshing them in the background before they expire.
+
+    Requests use the cached token without waiting. A refresh is started refresh_margin
+    seconds before the token expires, but no earlier than halfway through its lifetime and
+    no sooner than retry_interval seconds after the last one, so tokens living no longer
+    than the margin are not refreshed back to back. It is started on a timer and by the
+    first request in that window, and concurrent refreshes on the same event loop share a
+    single call to the token endpoint. Requests only wait for the endpoint when there is no
+    valid token at all, so the traffic to it does not grow with the request volume. A failed
+    background refresh is retried after retry_interval seconds while the current token
+    remains valid.
+
+    Attributes:
+        fetch (TokenFetcher): Fetches a new token and its lifetime in seconds.
+        refresh_margin (float): The seconds before expiry at which a token is refreshed.
+        retry_interval (float): The seconds between attempts to refresh a token after a failed refresh.
+        token (Optional[str]): The current token, or None before the first fetch.
+        expires_at (float): The time.monotonic() at which the current token expires.
+        refreshes (int): The number of calls to fetch.
+        last_error (Optional[BaseException]): The exception of the last failed refresh, or None if it succeeded.
+    """
+
+    def __init__(
+        self,
+        fetch: TokenFetcher,
+        refresh_margin: float = 60.0,
+        retry_interval: float = 5.0,
+    ) -> None:
+        """
+        Initialises a new BearerTokenProvider instance.
+
+        Args:
+            fetch (TokenFetcher): Fetches a new token and its lifetime in seconds, or None if it does not expire.
+            refresh_margin (float): The seconds before expiry at which a token is refreshed. Defaults to 60.0.
+            retry_interval (float): The seconds between attempts to refresh a token after a failed refresh. Defaults to 5.0.
+        """
+        self.fetch: TokenFetcher = fetch
+        self.refresh_margin: float = refresh_margin
+        self.retry_interval: float = retry_interval
+
+        self.token: Optional[str] = None
+        self.expires_at: float = 0.0
+        self.refreshes: int = 0
+        self.last_error: Optional[BaseException] = None
+
+        # The header value of the current token, built once per token
+        self._value_: str = ""
+
+        # The earliest time another background refresh may start
+        self._retry_at_: float = 0.0
+
+        # The time.monotonic() from which the current token is due for a refresh
+        self._refresh_at_: float = 0.0
+
+        self._flight_: SingleFlight = SingleFlight()
+        self._timer_: Optional[asyncio.TimerHandle] = None
+
+    async def _refresh_(self) -> None:
+        """
+        Fetches a new token and schedules its refresh.
+        """
+        self.refreshes += 1
+
+        try:
+            token, expires_in = await self.fetch()
+        except Exception as e:
+            self.last_error = e
+            self._retry_at_ = time.monotonic() + self.retry_interval
+
+            raise
+
+        self.token = token
+        self.expires_at = float("inf") if expires_in is None else time.monotonic() + expires_in
+        self.last_error = None
+
+        # Cap the margin at half the lifetime, as a token living no longer than it would be due right away
+        self._refresh_at_ = self.expires_at if expires_in is None else self.expires_at - min(self.refresh_margin, expires_in / 2)
+
+        self._value_ = f"Bearer {token}"
+
+        self._schedule_()
+
+    def _schedule_(self) -> None:
+        """
+        Schedules a background refresh of the current token on the running event loop.
+        """
+        if self._timer_ is not None:
+            self._timer_.cancel()
+            self._timer_ = None
+
+        if self.expires_at == float("inf"):
+            return
+
+        self._timer_ = asyncio.get_running_loop().call_later(
+            max(self.retry_interval, self._refresh_at_ - time.monotonic()),
+            self._start_,
+        )
+
+    def _start_(self) -> None:
+        """
+        Starts a background refresh unless one is in flight, without waiting for it.
+        """
+        task: asyncio.Future = asyncio.ensure_future(self._flight_.do(key=None, factory=self._refresh_))
+
+        # The failure is kept in last_error, and the next refresh is due after retry_interval
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def authorization(self) -> str:
+        """
+        Returns the Authorization header with a valid token, only waiting for the token endpoint if there is none.
+
+        Returns:
+            str: "Bearer" followed by the token.
+        """
+        now: float = time.monotonic()
+
+        if now < self.expires_at:
+            # Check, if the token is due for a refresh while it can still be used
+            if now >= self._refresh_at_ and now >= self._retry_at_:
+                self._retry_at_ = now + self.retry_interval
+
+                self._start_()
+
+            return self._value_
+
+        await self._flight_.do(key=None, factory=self._refresh_)
+
+        return self._value_
+
+    def close(self) -> None:
+        """
+        Cancels the scheduled background refresh.
+        """
+        if self._timer_ is not None:
+            self._timer_.cancel()
+            self._timer_ = None
+
+
+def oauth2_client_credentials(
+    token_url: str,
+    client_id: str,
+    client_secret: str,
+    scope: Optional[str] = None,
+) -> TokenFetcher:
+    """
+    Returns a fetcher for the OAuth 2.0 client credentials grant, sent through WebService.
+
+    Args:
+        token_url (str): The URL of the token endpoint.
+        client_id (str): The client identifier.
+        client_secret (str): The client secret.
+        scope (Optional[str]): The scope to request. Defaults to None.
+
+    Returns:
+        TokenFetcher: Fetches the access token and its lifetime from the token endpoint.
+    """
+    form: Dict[str, str] = {"grant_type": "client_credentials"}
+
+    if scope:
+        form["scope"] = scope
+
+    async def __fetch__() -> Tuple[str, Optional[float]]:
+        """
+        Requests a new access token from the token endpoint.
+
+        Returns:
+            Tuple[str, Optional[float]]: The access token and its lifetime in seconds, if the endpoint reports one.
+        """
+        # Imported here, as WebService imports this module
+        from web_service import WebService
+
+        response = await WebService.arequest(
+            credentials=StaticCredentials.basic(client_id, client_secret),
+            data=form,
+            method="POST",
+            url=token_url,
+        )
+
+        if not response.ok:
+            raise RuntimeError(f"Token endpoint '{token_url}' responded with status {response.status}.")
+
+        payload: Dict[str, Any] = response.json()
+
+        expires_in: Optional[Any] = payload.get("expires_in")
+
+        return payload["access_token"], float(expires_in) if expires_in is not None else None
+
+    return __fetch__
@@ -14,7 +14,7 @@ async def test_get() -> Dict[str, Any] | None:
     headers = Headers()
     headers.update(**{"X-Test-Header": "test-value"})
     
-    response = await WebService.get(url, headers=headers.headers, log=True)
+    response = await WebService.aget(url, headers=headers.headers, log=True)
     return response
 
 
@@ -24,7 +24,7 @@ async def test_post() -> Dict[str, Any] | None:
     headers = Headers()
     data = {"test_key": "test_value", "timestamp": "2024-12-11T13:42:47+01:00"}
     
-    response = await WebService.post(url, headers=headers.headers, json=data, log=True)
+    response = await WebService.apost(url, headers=headers.headers, json=data, log=True)
     return response
 
 
@@ -48,6 +48,9 @@ async def debug() -> None:
         logger.error(f"Error during debug: {str(e)}")
         raise
     
+    finally:
+        await WebService.aclose()
+    
     logger.info("Debug tests completed successfully!")
 
 
@@ -0,0 +1,467 @@
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from multidict import CIMultiDict, CIMultiDictProxy
+from typing import *
+
+from cache import CachedResponse, ResponseCache
+from response import Response
+
+__all__: List[str] = ["DiskCache"]
+
+
+class DiskCache(ResponseCache):
+    """
+    A persistent HTTP response cache stored in an SQLite database.
+
+    The database runs in write-ahead-log mode, so any number of processes can read it while
+    one of them writes, and warm entries survive restarts. The total size of all entries is
+    kept up to date by triggers, which lets every process enforce the same max_bytes cap.
+    Entries are removed once they are older than max_age, whether or not they were revalidated.
+    The database uses incremental auto-vacuum, so compaction returns the pages of removed
+    entries to the file system.
+    The asynchronous methods WebService uses run their database calls on a dedicated thread,
+    so a lock held by another process never blocks the event loop. The synchronous methods
+    run them on the calling thread.
+
+    Attributes:
+        path (str): The path of the SQLite database file.
+        max_age (Optional[float]): Seconds an entry is kept after it was stored, or None to keep it until evicted.
+        busy_timeout (float): Seconds to wait for a lock held by another process.
+    """
+
+    # Reads only refresh the access time of an entry after this many seconds, to keep reads cheap
+    ACCESS_RESOLUTION: float = 60.0
+
+    SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            status INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            headers TEXT NOT NULL,
+            body BLOB NOT NULL,
+            stored_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+        CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            total INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO meta (id, total) VALUES (0, 0);
+        CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+            UPDATE meta SET total = total + NEW.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+            UPDATE meta SET total = total - OLD.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN
+            UPDATE meta SET total = total - OLD.size + NEW.size WHERE id = 0;
+        END;
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: Optional[float] = 7 * 24 * 60 * 60,
+        busy_timeout: float = 5.0,
+        **kwargs,
+    ) -> None:
+        """
+        Initialises a new DiskCache instance and creates its database if needed.
+
+        Args:
+            path (Union[str, os.PathLike]): The path of the SQLite database file.
+            max_bytes (int): The maximum total size of all cached responses in bytes. Defaults to 512 MiB.
+            max_age (Optional[float]): Seconds an entry is kept after it was stored. Defaults to one week.
+            busy_timeout (float): Seconds to wait for a lock held by another process. Defaults to 5.0.
+            **kwargs: Additional keyword arguments passed to ResponseCache.
+        """
+        super().__init__(
+            max_bytes=max_bytes,
+            **kwargs,
+        )
+
+        self.path: str = os.fspath(path)
+        self.max_age: Optional[float] = max_age
+        self.busy_timeout: float = busy_timeout
+
+        self._local_: threading.local = threading.local()
+
+        self._compaction_: Optional[threading.Thread] = None
+        self._stop_compaction_: threading.Event = threading.Event()
+
+        # The thread running the database calls of the asynchronous methods, started on first use
+        self._executor_: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._executor_pid_: Optional[int] = None
+        self._executor_lock_: threading.Lock = threading.Lock()
+
+        self._connection_().executescript(self.SCHEMA)
+
+    async def _call_(
+        self,
+        function: Callable[..., Any],
+        **kwargs,
+    ) -> Any:
+        """
+        Runs a method on the database thread of the cache, starting it on first use or after a fork.
+
+        Args:
+            function (Callable[..., Any]): The method to run.
+            **kwargs: The keyword arguments of the method.
+
+        Returns:
+            Any: The result of the method.
+        """
+        if self._executor_ is None or self._executor_pid_ != os.getpid():
+            with self._executor_lock_:
+                # Check, if the thread was started by a parent process, where it no longer runs
+                if self._executor_ is None or self._executor_pid_ != os.getpid():
+                    self._executor_ = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=1,
+                        thread_name_prefix="DiskCache",
+                    )
+                    self._executor_pid_ = os.getpid()
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor_,
+            functools.partial(function, **kwargs),
+        )
+
+    def _connection_(self) -> sqlite3.Connection:
+        """
+        Returns the database connection of the calling thread, opening it on first use or after a fork.
+
+        Returns:
+            sqlite3.Connection: The connection of the calling thread.
+        """
+        connection: Optional[sqlite3.Connection] = getattr(self._local_, "connection", None)
+
+        # Check, if the connection was inherited from a parent process
+        if connection is None or self._local_.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path,
+                isolation_level=None,
+                timeout=self.busy_timeout,
+            )
+
+            # Only takes effect on a new database, before the write-ahead log writes its header
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+            self._local_.connection = connection
+            self._local_.pid = os.getpid()
+
+        return connection
+
+    def _delete_(self, key: str) -> None:
+        """
+        Removes the entry stored under the given key, if any.
+
+        Args:
+            key (str): The cache key.
+        """
+        self._connection_().execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _disconnect_(self) -> None:
+        """
+        Closes the database connection of the calling thread, if it has one.
+        """
+        connection: Optional[sqlite3.Connection] = getattr(self._local_, "connection", None)
+
+        if connection is not None:
+            connection.close()
+
+            self._local_.connection = None
+
+    def _evict_(self, connection: sqlite3.Connection) -> None:
+        """
+        Removes the least recently used entries until the total size is within max_bytes.
+
+        Args:
+            connection (sqlite3.Connection): The connection to evict with, inside a write transaction.
+        """
+        while connection.execute("SELECT total FROM meta WHERE id = 0").fetchone()[0] > self.max_bytes:
+            evicted: int = connection.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT 16)"
+            ).rowcount
+
+            if not evicted:
+                break
+
+            self.evictions += evicted
+
+    def _get_(self, key: str) -> Optional[CachedResponse]:
+        """
+        Returns the entry stored under the given key and refreshes its access time.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CachedResponse]: The stored entry, or None if it does not exist or is older than max_age.
+        """
+        connection: sqlite3.Connection = self._connection_()
+
+        row: Optional[Tuple[Any, ...]] = connection.execute(
+            "SELECT status, url, headers, body, stored_at, expires_at, accessed_at FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        status, url, headers, body, stored_at, expires_at, accessed_at = row
+
+        now: float = time.time()
+
+        # Check, if the entry has outlived max_age
+        if self.max_age is not None and stored_at + self.max_age < now:
+            return None
+
+        if accessed_at + self.ACCESS_RESOLUTION < now:
+            connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+
+        return CachedResponse(
+            expires_at=expires_at,
+            response=Response(
+                body=body,
+                headers=CIMultiDictProxy(CIMultiDict(json.loads(headers))),
+                status=status,
+                url=url,
+            ),
+            stored_at=stored_at,
+        )
+
+    def _set_(
+        self,
+        key: str,
+        entry: CachedResponse,
+    ) -> None:
+        """
+        Stores the given entry under the given key and evicts the least recently used entries beyond max_bytes.
+
+        Args:
+            key (str): The cache key.
+            entry (CachedResponse): The entry to store.
+        """
+        connection: sqlite3.Connection = self._connection_()
+
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            connection.execute(
+                # An upsert fires the update trigger, whereas INSERT OR REPLACE would skip the delete trigger
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "status = excluded.status, url = excluded.url, headers = excluded.headers, body = excluded.body, "
+                "stored_at = excluded.stored_at, expires_at = excluded.expires_at, "
+                "accessed_at = excluded.accessed_at, size = excluded.size",
+                (
+                    key,
+                    entry.response.status,
+                    entry.response.url,
+                    json.dumps(list(entry.response.headers.items())),
+                    entry.response.body,
+                    entry.stored_at,
+                    entry.expires_at,
+                    entry.stored_at,
+                    entry.size,
+                ),
+            )
+
+            self._evict_(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+
+            raise
+
+        connection.execute("COMMIT")
+
+    async def alookup(self, key: str) -> Optional[CachedResponse]:
+        """
+        Asynchronously looks up the entry stored under the given key on the database thread.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CachedResponse]: The stored entry, or None.
+        """
+        return await self._call_(self.lookup, key=key)
+
+    async def arevalidate(
+        self,
+        key: str,
+        entry: CachedResponse,
+        headers: Mapping[str, str],
+    ) -> Response:
+        """
+        Asynchronously refreshes a stale entry on the database thread after its conditional request was answered with 304.
+
+        Args:
+            key (str): The cache key.
+            entry (CachedResponse): The stale entry that was revalidated.
+            headers (Mapping[str, str]): The headers of the 304 response.
+
+        Returns:
+            Response: The cached response, with the headers of the 304 response merged in.
+        """
+        return await self._call_(self.revalidate, entry=entry, headers=headers, key=key)
+
+    async def astore(
+        self,
+        key: str,
+        response: Response,
+    ) -> bool:
+        """
+        Asynchronously stores the given response under the given key on the database thread, if it is cacheable.
+
+        Args:
+            key (str): The cache key.
+            response (Response): The response to store.
+
+        Returns:
+            bool: True if the response was stored, False otherwise.
+        """
+        return await self._call_(self.store, key=key, response=response)
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        self._connection_().execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """
+        Stops background compaction and the database thread and closes the database connection of the calling thread.
+        """
+        self.stop_compaction()
+
+        with self._executor_lock_:
+            executor: Optional[concurrent.futures.ThreadPoolExecutor] = self._executor_
+
+            self._executor_ = None
+
+        # Check, if the database thread runs in this process, where its connection must be closed on it
+        if executor is not None and self._executor_pid_ == os.getpid():
+            executor.submit(self._disconnect_)
+            executor.shutdown(wait=True)
+
+        self._disconnect_()
+
+    def compact(self) -> None:
+        """
+        Removes entries older than max_age, evicts down to max_bytes and shrinks the database files.
+
+        A database created without incremental auto-vacuum, i.e. by an earlier version, is
+        rebuilt with it once, which holds an exclusive lock while the database is copied.
+        """
+        connection: sqlite3.Connection = self._connection_()
+
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            if self.max_age is not None:
+                connection.execute(
+                    "DELETE FROM responses WHERE stored_at < ?",
+                    (time.time() - self.max_age,),
+                )
+
+            self._evict_(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+
+            raise
+
+        connection.execute("COMMIT")
+
+        # Check, if the database was created without incremental auto-vacuum, which only VACUUM can turn on
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.execute("VACUUM")
+        else:
+            # Return the pages of deleted rows to the file system, run as a script, as execute() frees only one page per call
+            connection.executescript("PRAGMA incremental_vacuum;")
+
+        # Truncate the write-ahead log, which holds the pages freed above until a checkpoint
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("PRAGMA optimize")
+
+    def start_compaction(
+        self,
+        interval: float = 300.0,
+    ) -> None:
+        """
+        Starts a daemon thread that compacts the cache periodically.
+
+        Args:
+            interval (float): Seconds between two compactions. Defaults to 300.0.
+        """
+        if self._compaction_ is not None and self._compaction_.is_alive():
+            return
+
+        self._stop_compaction_.clear()
+
+        def __compact__() -> None:
+            """
+            Compacts the cache every interval seconds until compaction is stopped.
+            """
+            while not self._stop_compaction_.wait(interval):
+                try:
+                    self.compact()
+                except sqlite3.Error:
+                    # Another process holds the lock for too long, try again next interval
+                    continue
+
+            self._disconnect_()
+
+        self._compaction_ = threading.Thread(
+            daemon=True,
+            name="DiskCacheCompaction",
+            target=__compact__,
+        )
+
+        self._compaction_.start()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counters of this process and the current size of the shared database.
+
+        Returns:
+            Dict[str, int]: The hits, misses, revalidations, evictions, entries and bytes of the cache.
+        """
+        connection: sqlite3.Connection = self._connection_()
+
+        return {
+            "bytes": connection.execute("SELECT total FROM meta WHERE id = 0").fetchone()[0],
+            "entries": connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0],
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+    def stop_compaction(self) -> None:
+        """
+        Stops the background compaction thread, if it is running.
+        """
+        self._stop_compaction_.set()
+
+        if self._compaction_ is not None and self._compaction_ is not threading.current_thread():
+            self._compaction_.join()
+
+        self._compaction_ = None
@@ -0,0 +1,525 @@
+import aiohttp
+import asyncio
+import concurrent.futures
+import json
+import mmap
+import os
+import re
+
+from typing import *
+
+from transport import StreamedResponse
+from web_service import WebService
+
+__all__: List[str] = ["DownloadError", "DownloadManager"]
+
+
+# Matches the Content-Range of a partial response, e.g. "bytes 0-1023/4096"
+_CONTENT_RANGE: re.Pattern = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+# The statuses with which a probe means the server does not answer HEAD requests
+_NO_HEAD: Tuple[int, ...] = (403, 405, 501)
+
+
+class DownloadError(Exception):
+    """
+    Raised when a segment of a download does not match the file it belongs to.
+    """
+
+
+class _Target:
+    """
+    The preallocated partial file the segments of a download are written into.
+
+    Chunks are copied into a shared memory map of the file, or written with os.pwrite where a
+    mapping is not wanted. Both write at their offset in place, so segments fetched in parallel
+    never contend for a file position. Blocking calls run on a thread of the file's own, so
+    closing the file always waits for the flushes queued before it.
+
+    Attributes:
+        size (int): The size of the file in bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        use_mmap: bool,
+    ) -> None:
+        """
+        Opens the partial file, creating it and reserving its size on disk if needed.
+
+        Args:
+            path (str): The path of the partial file.
+            size (int): The size of the file in bytes.
+            use_mmap (bool): Whether chunks are copied into a memory map of the file.
+        """
+        self.size: int = size
+
+        self._fd_: int = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+            # Check, if the file is not yet as large as the download
+            if os.fstat(self._fd_).st_size != size:
+                os.ftruncate(self._fd_, size)
+
+                # Reserve the blocks up front, so a full disk fails now and not halfway through
+                if hasattr(os, "posix_fallocate"):
+                    try:
+                        os.posix_fallocate(self._fd_, 0, size)
+                    except OSError:
+                        pass
+
+            self._map_: Optional[mmap.mmap] = mmap.mmap(self._fd_, size) if use_mmap else None
+        except BaseException:
+            os.close(self._fd_)
+
+            raise
+
+        self._executor_: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="DownloadManager",
+        )
+
+    def _close_(self) -> None:
+        """
+        Unmaps and closes the file.
+        """
+        if self._map_ is not None:
+            self._map_.close()
+
+        os.close(self._fd_)
+
+    def _flush_(
+        self,
+        offset: int,
+        length: int,
+    ) -> None:
+        """
+        Flushes a range of the file to disk, blocking until it is written.
+
+        Args:
+            offset (int): The offset of the range in bytes, a multiple of mmap.ALLOCATIONGRANULARITY.
+            length (int): The length of the range in bytes.
+        """
+        if self._map_ is not None:
+            self._map_.flush(offset, length)
+        elif hasattr(os, "fdatasync"):
+            os.fdatasync(self._fd_)
+        else:
+            os.fsync(self._fd_)
+
+    async def run(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        """
+        Runs a blocking call on the thread of the file.
+
+        Args:
+            function (Callable[..., Any]): The function to call.
+            *args (Any): The arguments of the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor_, function, *args)
+
+    async def write(
+        self,
+        offset: int,
+        chunk: bytes,
+    ) -> None:
+        """
+        Writes a chunk at the given offset of the file.
+
+        Args:
+            offset (int): The offset in bytes.
+            chunk (bytes): The data to write.
+        """
+        if self._map_ is not None:
+            self._map_[offset:offset + len(chunk)] = chunk
+        else:
+            await self.run(os.pwrite, self._fd_, chunk, offset)
+
+    async def flush(
+        self,
+        offset: int,
+        length: int,
+    ) -> None:
+        """
+        Flushes a range of the file to disk.
+
+        Args:
+            offset (int): The offset of the range in bytes, a multiple of mmap.ALLOCATIONGRANULARITY.
+            length (int): The length of the range in bytes.
+        """
+        await self.run(self._flush_, offset, length)
+
+    async def close(self) -> None:
+        """
+        Closes the file once the calls queued before have finished.
+        """
+        future: concurrent.futures.Future = self._executor_.submit(self._close_)
+
+        self._executor_.shutdown(wait=False)
+
+        await asyncio.wrap_future(future)
+
+
+class DownloadManager:
+    """
+    Downloads large files as byte ranges fetched in parallel, resuming interrupted downloads.
+
+    The file is probed with a HEAD request first. If the server accepts byte ranges and the
+    file is at least min_split_size, the file is split into segments which up to concurrency
+    workers fetch over the pooled connections of WebService, each writing its chunks straight
+    into a preallocated "<path>.part" file. Every response is checked against its segment:
+    the status must be 206, the Content-Range and Content-Length must match the range
+    requested, and the ETag must match the one of the probe. Every request carries If-Range,
+    so a file that changed on the server is answered with a full 200 response and detected
+    instead of being stitched together from two versions.
+
+    Finished segments are flushed to disk and recorded in a "<path>.part.json" sidecar, so a
+    download that is interrupted resumes with the segments still missing, as long as the file
+    on the server has the same size and validator. Once every segment is written, the partial
+    file is renamed to the path and the sidecar removed. Servers without ranges are downloaded
+    in a single stream with WebService.adownload_to.
+
+    Attributes:
+        concurrency (int): The number of segments fetched at the same time.
+        segment_size (int): The size of a segment in bytes, a multiple of mmap.ALLOCATIONGRANULARITY.
+        min_split_size (int): The size in bytes from which files are fetched as segments.
+        retries (int): The number of times a segment is resumed after a failed request.
+        backoff (float): The seconds to wait before the first resumption, doubled for every further one.
+        chunk_size (int): The maximum number of bytes read per chunk.
+        use_mmap (bool): Whether chunks are copied into a memory map of the file instead of written with os.pwrite.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        segment_size: int = 8 * 1024 * 1024,
+        min_split_size: Optional[int] = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        chunk_size: int = 256 * 1024,
+        use_mmap: bool = True,
+    ) -> None:
+        """
+        Initialises a new DownloadManager instance.
+
+        Args:
+            concurrency (int): The number of segments fetched at the same time. Defaults to 4.
+            segment_size (int): The size of a segment in bytes, rounded up to a multiple of mmap.ALLOCATIONGRANULARITY. Defaults to 8 MiB.
+            min_split_size (Optional[int]): The size in bytes from which files are fetched as segments. Defaults to None, i.e. two segments.
+            retries (int): The number of times a segment is resumed after a failed request. Defaults to 3.
+            backoff (float): The seconds to wait before the first resumption, doubled for every further one. Defaults to 0.5.
+            chunk_size (int): The maximum number of bytes read per chunk. Defaults to 256 KiB.
+            use_mmap (bool): Whether chunks are copied into a memory map of the file instead of written with os.pwrite. Defaults to True.
+
+        Raises:
+            ValueError: If concurrency or segment_size is not positive.
+        """
+        if concurrency < 1 or segment_size < 1:
+            raise ValueError("The concurrency and segment size of a download must be positive.")
+
+        granularity: int = mmap.ALLOCATIONGRANULARITY
+
+        self.concurrency: int = concurrency
+        self.segment_size: int = -(-segment_size // granularity) * granularity
+        self.min_split_size: int = 2 * self.segment_size if min_split_size is None else min_split_size
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.chunk_size: int = chunk_size
+        self.use_mmap: bool = use_mmap
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the download manager.
+
+        Returns:
+            str: The string representation of the download manager.
+        """
+        return f"<DownloadManager {self.concurrency} x {self.segment_size} bytes>"
+
+    @staticmethod
+    def _load_(
+        path: str,
+        state: Dict[str, Any],
+    ) -> Set[int]:
+        """
+        Returns the finished segments recorded in a sidecar, if it belongs to the same file.
+
+        Args:
+            path (str): The path of the sidecar.
+            state (Dict[str, Any]): The URL, size, validator and segment size of the current download.
+
+        Returns:
+            Set[int]: The indices of the finished segments, empty if the sidecar is missing, unreadable or stale.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                recorded: Dict[str, Any] = json.load(file)
+        except (OSError, ValueError):
+            return set()
+
+        # Check, if the sidecar describes another version of the file
+        if any(recorded.get(key) != value for key, value in state.items()):
+            return set()
+
+        return set(recorded.get("done", ()))
+
+    @staticmethod
+    def _save_(
+        path: str,
+        state: Dict[str, Any],
+        done: Iterable[int],
+    ) -> None:
+        """
+        Atomically replaces a sidecar with the given finished segments.
+
+        Args:
+            path (str): The path of the sidecar.
+            state (Dict[str, Any]): The URL, size, validator and segment size of the current download.
+            done (Iterable[int]): The indices of the finished segments.
+        """
+        temp: str = f"{path}.tmp"
+
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump({**state, "done": sorted(done)}, file)
+
+        os.replace(temp, path)
+
+    @staticmethod
+    def _verify_(
+        response: StreamedResponse,
+        start: int,
+        end: int,
+        size: int,
+        etag: Optional[str],
+    ) -> None:
+        """
+        Checks that a response carries exactly the requested range of the probed file.
+
+        Args:
+            response (StreamedResponse): The response to a ranged request.
+            start (int): The first byte requested.
+            end (int): The last byte requested.
+            size (int): The size of the file.
+            etag (Optional[str]): The ETag of the probe, or None if it had none.
+
+        Raises:
+            DownloadError: If the response is not the requested part of the same file.
+        """
+        # Check, if the server sent the whole file, i.e. If-Range found it changed
+        if response.status != 206:
+            raise DownloadError(f"Expected a partial response for bytes {start}-{end} of '{response.url}', got status {response.status}.")
+
+        match: Optional[re.Match] = _CONTENT_RANGE.fullmatch(response.headers.get("Content-Range", "").strip())
+
+        if match is None or (int(match[1]), int(match[2])) != (start, end) or match[3] != str(size):
+            raise DownloadError(f"Requested bytes {start}-{end}/{size} of '{response.url}', got Content-Range '{response.headers.get('Content-Range')}'.")
+
+        length: Optional[str] = response.headers.get("Content-Length")
+
+        if length is not None and int(length) != end - start + 1:
+            raise DownloadError(f"Requested {end - start + 1} bytes of '{response.url}', got a Content-Length of {length}.")
+
+        received: Optional[str] = response.headers.get("ETag")
+
+        if etag is not None and received is not None and received != etag:
+            raise DownloadError(f"The ETag of '{response.url}' changed from {etag} to {received} during the download.")
+
+    async def _fetch_(
+        self,
+        url: str,
+        target: _Target,
+        start: int,
+        end: int,
+        etag: Optional[str],
+        headers: Dict[str, str],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """
+        Fetches one segment into the file, resuming from the last byte written after a failed request.
+
+        Args:
+            url (str): The URL of the file.
+            target (_Target): The file to write into.
+            start (int): The first byte of the segment.
+            end (int): The last byte of the segment.
+            etag (Optional[str]): The ETag of the probe, or None if it had none.
+            headers (Dict[str, str]): The headers of the ranged requests, including If-Range.
+            kwargs (Dict[str, Any]): Additional keyword arguments for the requests.
+
+        Raises:
+            DownloadError: If a response does not match the segment.
+            aiohttp.ClientError: If the retries are exhausted, or at once for a client error status.
+        """
+        offset: int = start
+        attempt: int = 0
+
+        while True:
+            try:
+                async with WebService.aopen(
+                    chunk_size=self.chunk_size,
+                    headers={**headers, "Range": f"bytes={offset}-{end}"},
+                    url=url,
+                    **kwargs,
+                ) as response:
+                    self._verify_(response, offset, end, target.size, etag)
+
+                    async for chunk in response.chunks:
+                        if offset + len(chunk) > end + 1:
+                            raise DownloadError(f"Received more than the requested bytes {start}-{end} of '{url}'.")
+
+                        await target.write(offset, chunk)
+
+                        offset += len(chunk)
+
+                # Check, if the connection closed before the segment was complete
+                if offset <= end:
+                    raise aiohttp.ClientPayloadError(f"The response for bytes {start}-{end} of '{url}' ended at byte {offset}.")
+
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Client error statuses other than 429 do not change when retried
+                if isinstance(e, aiohttp.ClientResponseError) and e.status < 500 and e.status != 429:
+                    raise
+
+                attempt += 1
+
+                if attempt > self.retries:
+                    raise
+
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+    async def download(
+        self,
+        url: str,
+        path: Union[str, os.PathLike],
+        **kwargs,
+    ) -> int:
+        """
+        Downloads a file, resuming a previous download of it to the same path if possible.
+
+        Args:
+            url (str): The URL of the file.
+            path (Union[str, os.PathLike]): The path to write the file to.
+            **kwargs: Additional keyword arguments for the requests, e.g. headers, params or credentials.
+
+        Returns:
+            int: The size of the file in bytes.
+
+        Raises:
+            DownloadError: If a response does not match the file, e.g. because it changed on the server.
+            aiohttp.ClientError: If the file cannot be fetched.
+        """
+        path = os.fspath(path)
+
+        headers: Dict[str, str] = {
+            **dict(kwargs.pop("headers", None) or {}),
+            # Ranges and lengths refer to the encoded body, so the body must not be encoded
+            "Accept-Encoding": "identity",
+        }
+
+        try:
+            async with WebService.aopen(
+                headers=headers,
+                method="HEAD",
+                url=url,
+                **kwargs,
+            ) as probe:
+                probed: Mapping[str, str] = probe.headers
+        except aiohttp.ClientResponseError as e:
+            if e.status not in _NO_HEAD:
+                raise
+
+            probed = {}
+
+        size: int = int(probed.get("Content-Length") or 0)
+
+        # Weak ETags must not be used in If-Range
+        etag: Optional[str] = probed.get("ETag") if not probed.get("ETag", "W/").startswith("W/") else None
+
+        validator: Optional[str] = etag or probed.get("Last-Modified")
+
+        # Check, if the file must be downloaded in a single stream
+        if probed.get("Accept-Ranges", "").lower() != "bytes" or size < max(self.min_split_size, 1):
+            return await WebService.adownload_to(
+                chunk_size=self.chunk_size,
+                headers=headers,
+                path=path,
+                url=url,
+                **kwargs,
+            )
+
+        part: str = f"{path}.part"
+        sidecar: str = f"{part}.json"
+
+        state: Dict[str, Any] = {
+            "url": url,
+            "size": size,
+            "validator": validator,
+            "segment_size": self.segment_size,
+        }
+
+        # Without a validator, segments of an earlier download may be of another version of the file
+        done: Set[int] = self._load_(sidecar, state) if validator is not None and os.path.exists(part) else set()
+
+        if validator is not None:
+            headers["If-Range"] = validator
+
+        count: int = -(-size // self.segment_size)
+
+        pending: Iterator[int] = iter([index for index in range(count) if index not in done])
+
+        lock: asyncio.Lock = asyncio.Lock()
+
+        target: _Target = await asyncio.get_running_loop().run_in_executor(None, _Target, part, size, self.use_mmap)
+
+        async def __work__() -> None:
+            """
+            Fetches pending segments until there are none left, recording each once it is on disk.
+            """
+            for index in pending:
+                start: int = index * self.segment_size
+                end: int = min(start + self.segment_size, size) - 1
+
+                await self._fetch_(
+                    end=end,
+                    etag=etag,
+                    headers=headers,
+                    kwargs=kwargs,
+                    start=start,
+                    target=target,
+                    url=url,
+                )
+
+                await target.flush(start, end - start + 1)
+
+                async with lock:
+                    done.add(index)
+
+                    await target.run(self._save_, sidecar, state, set(done))
+
+        workers: List[asyncio.Task] = [asyncio.ensure_future(__work__()) for _ in range(min(self.concurrency, count))]
+
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            raise
+        finally:
+            await target.close()
+
+        os.replace(part, path)
+        os.remove(sidecar)
+
+        return size
@@ -0,0 +1,162 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+
+from typing import *
+
+__all__: List[str] = ["EventLoopThread"]
+
+
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    """
+    An event loop running forever in a background daemon thread.
+
+    Coroutines are submitted from any thread with asyncio.run_coroutine_threadsafe, so
+    synchronous code shares one loop, and everything bound to it, instead of paying for
+    a new event loop per call. The thread is started on first use, and again in a forked
+    child process, where the parent's thread does not exist.
+
+    Attributes:
+        name (str): The name of the background thread.
+    """
+
+    def __init__(self, name: str = "EventLoopThread") -> None:
+        """
+        Initialises a new EventLoopThread instance.
+
+        Args:
+            name (str): The name of the background thread. Defaults to "EventLoopThread".
+        """
+        self.name: str = name
+
+        self._loop_: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_: Optional[threading.Thread] = None
+        self._pid_: Optional[int] = None
+        self._lock_: threading.Lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """
+        Returns whether the background thread of this process is running.
+
+        Returns:
+            bool: True if the loop is running in this process, False otherwise.
+        """
+        return (
+            self._thread_ is not None
+            and self._thread_.is_alive()
+            and self._pid_ == os.getpid()
+        )
+
+    def in_loop_thread(self) -> bool:
+        """
+        Returns whether the caller is running in the background thread.
+
+        Returns:
+            bool: True if called from the background thread, False otherwise.
+        """
+        return self.running and threading.current_thread() is self._thread_
+
+    def run(
+        self,
+        coroutine: Coroutine[Any, Any, T],
+        timeout: Optional[float] = None,
+    ) -> T:
+        """
+        Runs the given coroutine on the background loop and blocks until it finishes.
+
+        Args:
+            coroutine (Coroutine[Any, Any, T]): The coroutine to run.
+            timeout (Optional[float]): Seconds to wait for the result. Defaults to None.
+
+        Returns:
+            T: The result of the coroutine.
+        """
+        future: concurrent.futures.Future = self.submit(coroutine)
+
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Cancel the coroutine if the caller stops waiting, e.g. on a timeout or KeyboardInterrupt
+            future.cancel()
+
+            raise
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """
+        Starts the background thread unless it is already running.
+
+        Returns:
+            asyncio.AbstractEventLoop: The loop running in the background thread.
+        """
+        with self._lock_:
+            if self.running:
+                return self._loop_
+
+            loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+
+            ready: threading.Event = threading.Event()
+
+            def __run__() -> None:
+                """
+                Runs the loop until it is stopped.
+                """
+                asyncio.set_event_loop(loop)
+
+                loop.call_soon(ready.set)
+
+                loop.run_forever()
+
+            self._loop_ = loop
+            self._pid_ = os.getpid()
+            self._thread_ = threading.Thread(
+                daemon=True,
+                name=self.name,
+                target=__run__,
+            )
+
+            self._thread_.start()
+
+            ready.wait()
+
+            return loop
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the loop, waits for the background thread to finish and closes the loop.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the thread to finish. Defaults to None.
+        """
+        with self._lock_:
+            if not self.running:
+                return
+
+            loop: asyncio.AbstractEventLoop = self._loop_
+            thread: threading.Thread = self._thread_
+
+            loop.call_soon_threadsafe(loop.stop)
+
+            thread.join(timeout)
+
+            if not thread.is_alive():
+                loop.close()
+
+            self._loop_ = None
+            self._thread_ = None
+
+    def submit(self, coroutine: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """
+        Schedules the given coroutine on the background loop without waiting for it.
+
+        Args:
+            coroutine (Coroutine[Any, Any, T]): The coroutine to schedule.
+
+        Returns:
+            concurrent.futures.Future[T]: A future resolving to the result of the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.start())
@@ -1,30 +1,56 @@
-import base64
-
-from pydantic import BaseModel
 from typing import *
 
+from credentials import CredentialProvider, encode_basic
+
+
+# The headers of a new Headers instance, copied for every instance
+_DEFAULT_HEADERS: Dict[str, str] = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+}
 
-class Headers(BaseModel):
+
+class Headers:
     """
     A utility class for constructing HTTP headers.
 
     Attributes:
-        headers (Dict[str, str]): A dictionary containing the headers. Defaults to an empty dictionary.
+        headers (Dict[str, str]): A dictionary containing the headers. Defaults to JSON Accept and Content-Type headers.
+        credentials (Optional[CredentialProvider]): Supplies the Authorization header per request, e.g. refreshed bearer tokens. Defaults to None.
     """
 
-    class Config:
-        arbitrary_types_allowed = True
+    __slots__ = ("credentials", "headers")
+
+    def __init__(
+        self,
+        headers: Optional[Mapping[str, str]] = _DEFAULT_HEADERS,
+        credentials: Optional[CredentialProvider] = None,
+    ) -> None:
+        """
+        Initialises a new Headers instance.
 
-    headers: Optional[Dict[str, str]] = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-    }
+        Args:
+            headers (Optional[Mapping[str, str]]): The headers, copied into a new dictionary. Defaults to JSON Accept and Content-Type headers.
+            credentials (Optional[CredentialProvider]): Supplies the Authorization header per request. Defaults to None.
+        """
+        self.headers: Optional[Dict[str, str]] = dict(headers) if headers is not None else None
+        self.credentials: Optional[CredentialProvider] = credentials
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the headers.
+
+        Returns:
+            str: The string representation of the headers.
+        """
+        return f"Headers(headers={self.headers!r}, credentials={self.credentials!r})"
 
     def authorization(
         self,
         bearer: str | None = None,
         password: str | None = None,
         username: str | None = None,
+        provider: CredentialProvider | None = None,
     ) -> None:
         """
 
@@ -33,6 +59,7 @@ class Headers(BaseModel):
         bearer (str): The bearer token to use for authorization.
         password (str): The password to use for authorization.
         username (str): The username to use for authorization.
+        provider (CredentialProvider): Supplies the Authorization header per request instead, e.g. a BearerTokenProvider.
 
         If both password and username are provided, the Authorization header is set to
         Basic <base64 encoded username:password>.
@@ -43,9 +70,22 @@ class Headers(BaseModel):
 
         If all three are provided, an error is raised.
 
+        If a provider is given, it is kept in credentials and no static Authorization header is
+        set. WebService attaches its header to every request sent with the Headers instance
+        itself, e.g. WebService.get(url, headers=headers), while to_dict() only holds the
+        static headers.
+
         Returns:
             None
         """
+        if provider is not None:
+            if any((bearer, password, username)):
+                raise ValueError("Username, password and bearer cannot be provided with provider.")
+
+            self.credentials = provider
+
+            return
+
         if all((bearer, password, username)):
             raise ValueError("Username and password cannot be provided with bearer.")
         elif not any(((bearer, password), username)):
@@ -57,9 +97,7 @@ class Headers(BaseModel):
         if bearer:
             self.headers["Authorization"] = f"Bearer {bearer}"
         elif username and password:
-            self.headers["Authorization"] = (
-                f"Basic {base64.b64encode(f'{username}:{password}'.encode()).decode()}"
-            )
+            self.headers["Authorization"] = encode_basic(username, password)
 
     def to_dict(self) -> Dict[str, str]:
         """
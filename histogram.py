@@ -0,0 +1,186 @@
+import threading
+
+from typing import *
+
+__all__: List[str] = ["LatencyHistogram"]
+
+
+class LatencyHistogram:
+    """
+    A streaming histogram of non-negative integers, e.g. latencies in nanoseconds, in fixed memory.
+
+    Values are counted in log-linear buckets: values below 32 exactly, larger values in 16
+    buckets per power of two. Every percentile is therefore within about 3% of the exact
+    value, no matter how many values were recorded. Only the buckets values fell into are
+    kept, which for latencies are a few dozen, and never more than 1024.
+
+    Attributes:
+        count (int): The number of values recorded.
+        total (int): The sum of the values recorded.
+        min (int): The smallest value recorded, or 0 if nothing was recorded.
+        max (int): The largest value recorded, or 0 if nothing was recorded.
+    """
+
+    # The number of buckets per power of two, as a power of two itself
+    SUB_BUCKET_BITS: int = 4
+    SUB_BUCKETS: int = 1 << SUB_BUCKET_BITS
+
+    def __init__(self) -> None:
+        """
+        Initialises a new, empty LatencyHistogram instance.
+        """
+        self._lock_: threading.Lock = threading.Lock()
+
+        self.reset()
+
+    @classmethod
+    def _index_(cls, value: int) -> int:
+        """
+        Returns the bucket of the given value.
+
+        Args:
+            value (int): The non-negative value.
+
+        Returns:
+            int: The index of the bucket counting the value.
+        """
+        if value < 2 * cls.SUB_BUCKETS:
+            return value
+
+        shift: int = value.bit_length() - cls.SUB_BUCKET_BITS - 1
+
+        return (shift + 1) * cls.SUB_BUCKETS + (value >> shift) - cls.SUB_BUCKETS
+
+    @classmethod
+    def _bounds_(cls, index: int) -> Tuple[int, int]:
+        """
+        Returns the smallest and the largest value counted by the given bucket.
+
+        Args:
+            index (int): The index of the bucket.
+
+        Returns:
+            Tuple[int, int]: The inclusive bounds of the bucket.
+        """
+        if index < 2 * cls.SUB_BUCKETS:
+            return index, index
+
+        shift: int = index // cls.SUB_BUCKETS - 1
+
+        mantissa: int = cls.SUB_BUCKETS + index % cls.SUB_BUCKETS
+
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    @property
+    def mean(self) -> float:
+        """
+        Returns the mean of the values recorded.
+
+        Returns:
+            float: The mean, or 0.0 if nothing was recorded.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Adds the values recorded by another histogram to this one.
+
+        Args:
+            other (LatencyHistogram): The histogram to add.
+        """
+        with other._lock_:
+            buckets: Dict[int, int] = dict(other._buckets_)
+            count, total, low, high = other.count, other.total, other.min, other.max
+
+        if not count:
+            return
+
+        with self._lock_:
+            for index, bucket in buckets.items():
+                self._buckets_[index] = self._buckets_.get(index, 0) + bucket
+
+            self.min = low if not self.count else min(self.min, low)
+            self.max = max(self.max, high)
+            self.count += count
+            self.total += total
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Returns an estimate of the given percentile of the values recorded.
+
+        Args:
+            percentile (float): The percentile between 0 and 100, e.g. 99 for the p99.
+
+        Returns:
+            float: The midpoint of the bucket holding the percentile, clamped to min and max, or 0.0 if nothing was recorded.
+        """
+        with self._lock_:
+            if not self.count:
+                return 0.0
+
+            # The rank of the value, counting from 1
+            rank: float = max(1.0, percentile / 100.0 * self.count)
+
+            seen: int = 0
+
+            for index in sorted(self._buckets_):
+                seen += self._buckets_[index]
+
+                if seen >= rank:
+                    low, high = self._bounds_(index)
+
+                    return float(min(self.max, max(self.min, (low + high) / 2)))
+
+            return float(self.max)
+
+    def record(self, value: int) -> None:
+        """
+        Records a value.
+
+        Args:
+            value (int): The non-negative value, e.g. a latency in nanoseconds.
+        """
+        value = max(0, int(value))
+
+        index: int = self._index_(value)
+
+        with self._lock_:
+            self._buckets_[index] = self._buckets_.get(index, 0) + 1
+
+            if not self.count or value < self.min:
+                self.min = value
+
+            if value > self.max:
+                self.max = value
+
+            self.count += 1
+            self.total += value
+
+    def reset(self) -> None:
+        """
+        Forgets every value recorded.
+        """
+        with self._lock_:
+            self._buckets_: Dict[int, int] = {}
+
+            self.count: int = 0
+            self.total: int = 0
+            self.min: int = 0
+            self.max: int = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Returns the count and the distribution of the values recorded, in the unit they were recorded in.
+
+        Returns:
+            Dict[str, float]: The count, mean, min, p50, p95, p99 and max.
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": float(self.min),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": float(self.max),
+        }
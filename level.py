@@ -1,6 +1,18 @@
 from enum import Enum
+from functools import total_ordering
 
 
+# The numeric severity of each level, matching the levels of the logging module
+_SEVERITIES = {
+    "DEBUG": 10,
+    "INFO": 20,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+
+
+@total_ordering
 class Level(Enum):
     """
     Enumeration class representing different logging levels.
@@ -14,6 +26,9 @@ class Level(Enum):
         WARNING: Indicate a potential problem that doesn't prevent normal execution
         ERROR: Serious problem that prevents normal execution of a specific operation
         CRITICAL: Critical error that may prevent the entire application from running
+
+    Levels compare by severity, e.g. Level.DEBUG < Level.INFO, and each carries its
+    numeric severity as a plain attribute, so level checks need no lookups.
     """
     
     # Used for detailed debugging information
@@ -29,4 +44,28 @@ class Level(Enum):
     ERROR = "ERROR"
     
     # Used for very severe error events that will presumably lead to application failure
-    CRITICAL = "CRITICAL"
\ No newline at end of file
+    CRITICAL = "CRITICAL"
+
+    def __init__(self, value: str) -> None:
+        """
+        Initialises a level with the severity of its value.
+
+        Args:
+            value (str): The name of the level.
+        """
+        self.severity: int = _SEVERITIES[value]
+
+    def __lt__(self, other: object) -> bool:
+        """
+        Returns whether this level is less severe than the other one.
+
+        Args:
+            other (object): The level to compare with.
+
+        Returns:
+            bool: True if this level is less severe, False otherwise.
+        """
+        if not isinstance(other, Level):
+            return NotImplemented
+
+        return self.severity < other.severity
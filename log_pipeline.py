@@ -0,0 +1,245 @@
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+
+from typing import *
+
+from log_record import LogRecord
+from log_sinks import Sink, StreamSink
+
+__all__: List[str] = ["LogPipeline"]
+
+
+# Tells the writer thread to stop, after writing everything queued before it
+_STOP: Any = object()
+
+# The pipelines still in use, closed by a single atexit hook instead of one per pipeline
+_PIPELINES: "weakref.WeakSet[LogPipeline]" = weakref.WeakSet()
+
+
+class LogPipeline:
+    """
+    Hands log records to a background writer thread, which writes them to its sinks in batches.
+
+    Logging only puts a record into a bounded queue, so slow sinks, e.g. stdout piped into a
+    slow consumer, never block the calling thread or event loop. When the queue is full the
+    record is dropped and counted, or, with the "block" policy, the caller waits for room.
+    Everything queued is written when the interpreter exits.
+
+    Attributes:
+        sinks (List[Sink]): The sinks every record is written to.
+        max_queue (int): The maximum number of records waiting to be written.
+        policy (str): What happens to a record when the queue is full, "drop" or "block".
+        batch_size (int): The maximum number of records written to the sinks at once.
+        dropped (int): The number of records dropped because the queue was full.
+    """
+
+    DROP: str = "drop"
+    BLOCK: str = "block"
+
+    _default_: Optional["LogPipeline"] = None
+    _default_lock_: threading.Lock = threading.Lock()
+
+    def __init__(
+        self,
+        sinks: Optional[Iterable[Sink]] = None,
+        max_queue: int = 10000,
+        policy: str = DROP,
+        batch_size: int = 256,
+    ) -> None:
+        """
+        Initialises a new LogPipeline instance.
+
+        Args:
+            sinks (Optional[Iterable[Sink]]): The sinks every record is written to. Defaults to a StreamSink on stdout.
+            max_queue (int): The maximum number of records waiting to be written. Defaults to 10000.
+            policy (str): What happens to a record when the queue is full, "drop" or "block". Defaults to "drop".
+            batch_size (int): The maximum number of records written to the sinks at once. Defaults to 256.
+        """
+        if policy not in (self.DROP, self.BLOCK):
+            raise ValueError(f"policy must be '{self.DROP}' or '{self.BLOCK}'.")
+
+        self.sinks: List[Sink] = list(sinks) if sinks is not None else [StreamSink()]
+        self.max_queue: int = max_queue
+        self.policy: str = policy
+        self.batch_size: int = batch_size
+
+        self.dropped: int = 0
+
+        self._queue_: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread_: Optional[threading.Thread] = None
+        self._pid_: Optional[int] = None
+        self._lock_: threading.Lock = threading.Lock()
+        self._closed_: bool = False
+
+        _PIPELINES.add(self)
+
+    @classmethod
+    def default(cls) -> "LogPipeline":
+        """
+        Returns the pipeline shared by all loggers without a pipeline of their own.
+
+        Returns:
+            LogPipeline: The default pipeline writing to stdout, created on first use.
+        """
+        if cls._default_ is None:
+            with cls._default_lock_:
+                if cls._default_ is None:
+                    cls._default_ = cls()
+
+        return cls._default_
+
+    def _start_(self) -> None:
+        """
+        Starts the writer thread unless it is running in this process.
+        """
+        with self._lock_:
+            if self._thread_ is not None and self._pid_ == os.getpid():
+                return
+
+            # Records queued by the parent before a fork are not this process's to write
+            if self._pid_ is not None:
+                self._queue_ = queue.Queue(maxsize=self.max_queue)
+
+            self._pid_ = os.getpid()
+            self._thread_ = threading.Thread(
+                daemon=True,
+                name="LogPipeline",
+                target=self._run_,
+            )
+
+            self._thread_.start()
+
+    def _run_(self) -> None:
+        """
+        Writes the queued records to the sinks in batches until told to stop.
+        """
+        while True:
+            batch: List[Any] = [self._queue_.get()]
+
+            # Take whatever else is queued already, up to a full batch
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue_.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop: bool = any(item is _STOP for item in batch)
+
+            records: List[LogRecord] = [item for item in batch if isinstance(item, LogRecord)]
+
+            if records:
+                self._write_(records)
+
+            # Wake up the callers of flush() waiting for the records queued before their marker
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+            if stop:
+                return
+
+    def _write_(self, records: List[LogRecord]) -> None:
+        """
+        Writes a batch of records to every sink, reporting sink failures on stderr.
+
+        Args:
+            records (List[LogRecord]): The records to write.
+        """
+        for sink in self.sinks:
+            try:
+                sink.write(records)
+            except Exception as e:
+                # A broken sink must neither kill the writer nor keep the other sinks from writing
+                print(f"LogPipeline: {type(sink).__name__} failed to write {len(records)} records: {e}", file=sys.stderr)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Writes everything queued, stops the writer thread and closes the sinks.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the queued records to be written. Defaults to 5.0.
+        """
+        with self._lock_:
+            if self._closed_:
+                return
+
+            self._closed_ = True
+
+            thread: Optional[threading.Thread] = self._thread_ if self._pid_ == os.getpid() else None
+
+        if thread is not None and thread.is_alive():
+            self._queue_.put(_STOP)
+
+            thread.join(timeout)
+
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception:
+                pass
+
+    def emit(self, record: LogRecord) -> None:
+        """
+        Queues a record for the writer thread.
+
+        Args:
+            record (LogRecord): The record to write.
+        """
+        if self._closed_:
+            # Late records, e.g. from atexit handlers running after close(), are written directly
+            self._write_([record])
+
+            return
+
+        if self._pid_ != os.getpid():
+            self._start_()
+
+        if self.policy == self.BLOCK:
+            self._queue_.put(record)
+
+            return
+
+        try:
+            self._queue_.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every record queued before the call has been written.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait. Defaults to None, i.e. no limit.
+
+        Returns:
+            bool: True if the records were written, False if the timeout expired first.
+        """
+        if self._closed_ or self._thread_ is None or self._pid_ != os.getpid():
+            return True
+
+        written: threading.Event = threading.Event()
+
+        deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+
+        try:
+            self._queue_.put(written, timeout=timeout)
+        except queue.Full:
+            return False
+
+        return written.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+
+def _close_pipelines_() -> None:
+    """
+    Closes every pipeline still in use when the interpreter exits, writing everything queued.
+    """
+    for pipeline in list(_PIPELINES):
+        pipeline.close()
+
+
+atexit.register(_close_pipelines_)
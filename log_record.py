@@ -0,0 +1,87 @@
+from typing import *
+
+from level import Level
+
+__all__: List[str] = ["LogRecord"]
+
+
+class LogRecord:
+    """
+    A single log message, as it is queued by a Logger and written by the sinks of a LogPipeline.
+
+    The message is formatted on first access. Logger formats it on the calling thread before
+    queueing the record, so the message shows the arguments as they were when it was logged,
+    even if the caller changes them later.
+
+    Attributes:
+        created (float): The time the message was logged, in seconds since the epoch.
+        level (Level): The severity of the message.
+        name (str): The name of the logger the message was logged with.
+        template (Union[str, Callable[[], str]]): The message, a format string for args, or a callable returning the message.
+        args (Tuple[Any, ...]): The positional arguments of the format string.
+        kwargs (Dict[str, Any]): The additional keyword arguments the message was logged with.
+    """
+
+    __slots__ = ("_message_", "args", "created", "kwargs", "level", "name", "template")
+
+    def __init__(
+        self,
+        created: float,
+        level: Level,
+        name: str,
+        message: Union[str, Callable[[], str]],
+        kwargs: Dict[str, Any],
+        args: Tuple[Any, ...] = (),
+    ) -> None:
+        """
+        Initialises a new LogRecord instance.
+
+        Args:
+            created (float): The time the message was logged, in seconds since the epoch.
+            level (Level): The severity of the message.
+            name (str): The name of the logger the message was logged with.
+            message (Union[str, Callable[[], str]]): The message, a format string for args, or a callable returning the message.
+            kwargs (Dict[str, Any]): The additional keyword arguments the message was logged with.
+            args (Tuple[Any, ...]): The positional arguments of the format string. Defaults to ().
+        """
+        self.created: float = created
+        self.level: Level = level
+        self.name: str = name
+        self.template: Union[str, Callable[[], str]] = message
+        self.args: Tuple[Any, ...] = args
+        self.kwargs: Dict[str, Any] = kwargs
+
+        self._message_: Optional[str] = None
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the record.
+
+        Returns:
+            str: The string representation of the record.
+        """
+        return f"<LogRecord [{self.level.value}] {self.name}: {self.message!r}>"
+
+    @property
+    def message(self) -> str:
+        """
+        Returns the message, formatting it on first access only.
+
+        Returns:
+            str: The formatted message.
+        """
+        if self._message_ is None:
+            template: Union[str, Callable[[], str]] = self.template
+
+            try:
+                if callable(template):
+                    self._message_ = str(template())
+                elif self.args:
+                    self._message_ = template.format(*self.args)
+                else:
+                    self._message_ = template
+            except Exception as e:
+                # A broken message must not keep the record from being written
+                self._message_ = f"{template!r} {self.args!r} (formatting failed: {e})"
+
+        return self._message_
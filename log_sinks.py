@@ -0,0 +1,308 @@
+import json
+import os
+import sys
+import time
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import *
+
+from level import Level
+from log_record import LogRecord
+
+__all__: List[str] = ["JSONLinesSink", "RotatingFileSink", "Sink", "StreamSink"]
+
+
+# The ANSI colour codes of the levels
+COLOURS: Dict[str, str] = {
+    "RESET": "\x1b[0m",
+    "DEBUG": "\x1b[90m",     # Gray
+    "INFO": "\x1b[94m",      # Blue
+    "WARNING": "\x1b[93m",   # Yellow
+    "ERROR": "\x1b[91m",     # Red
+    "CRITICAL": "\x1b[91m",  # Red
+}
+
+
+class Sink(ABC):
+    """
+    A destination log records are written to by the background writer of a LogPipeline.
+
+    Sinks receive records in batches and are only ever called from the writer thread, so
+    they need no locking of their own.
+
+    Attributes:
+        time_format (str): The strftime format of the timestamps.
+    """
+
+    time_format: str = "%Y-%m-%d %H:%M:%S"
+
+    # The last second formatted and its timestamp, as consecutive records mostly share a second
+    _second_: int = -1
+    _timestamp_: str = ""
+
+    def close(self) -> None:
+        """
+        Flushes and releases the resources of the sink.
+        """
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Flushes the records written so far to their destination.
+        """
+
+    def format(self, record: LogRecord) -> str:
+        """
+        Formats a record as a single line without the trailing newline.
+
+        Args:
+            record (LogRecord): The record to format.
+
+        Returns:
+            str: The formatted line.
+        """
+        return f"[{self.timestamp(record.created)}] [{record.name}] [{record.level.value}] {record.message} {record.kwargs}"
+
+    def timestamp(self, created: float) -> str:
+        """
+        Formats the second of the given time with time_format, reusing the previous result within the same second.
+
+        Args:
+            created (float): The time in seconds since the epoch.
+
+        Returns:
+            str: The formatted timestamp.
+        """
+        second: int = int(created)
+
+        if second != self._second_:
+            self._second_ = second
+            self._timestamp_ = datetime.fromtimestamp(second).strftime(self.time_format)
+
+        return self._timestamp_
+
+    @abstractmethod
+    def write(self, records: List[LogRecord]) -> None:
+        """
+        Writes a batch of records.
+
+        Args:
+            records (List[LogRecord]): The records to write.
+        """
+
+
+class StreamSink(Sink):
+    """
+    Writes records to a text stream, by default standard output, with one write per batch.
+
+    Attributes:
+        stream (Optional[TextIO]): The stream to write to, or None for the current sys.stdout.
+        colour (bool): Whether to colourise the messages with ANSI escape codes.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        colour: bool = True,
+    ) -> None:
+        """
+        Initialises a new StreamSink instance.
+
+        Args:
+            stream (Optional[TextIO]): The stream to write to. Defaults to None, i.e. the current sys.stdout.
+            colour (bool): Whether to colourise the messages with ANSI escape codes. Defaults to True.
+        """
+        self.stream: Optional[TextIO] = stream
+        self.colour: bool = colour
+
+        # The colour code before and after the message of each level, computed once
+        self._prefixes_: Dict[Level, str] = {level: COLOURS[level.value] if colour else "" for level in Level}
+        self._suffix_: str = COLOURS["RESET"] if colour else ""
+
+    def flush(self) -> None:
+        """
+        Flushes the stream.
+        """
+        (self.stream or sys.stdout).flush()
+
+    def format(self, record: LogRecord) -> str:
+        """
+        Formats a record the way Logger has always printed it.
+
+        Args:
+            record (LogRecord): The record to format.
+
+        Returns:
+            str: The formatted line.
+        """
+        return f"[{self.timestamp(record.created)}] [{record.name}] {self._prefixes_[record.level]}{record.message}{self._suffix_} {record.kwargs}"
+
+    def write(self, records: List[LogRecord]) -> None:
+        """
+        Writes a batch of records to the stream.
+
+        Args:
+            records (List[LogRecord]): The records to write.
+        """
+        stream: TextIO = self.stream or sys.stdout
+
+        stream.write("".join(f"{self.format(record)}\n" for record in records))
+        stream.flush()
+
+
+class RotatingFileSink(Sink):
+    """
+    Appends records to a file, rotating it once it exceeds a size or an age.
+
+    On rotation, 'path' is renamed to 'path.1', 'path.1' to 'path.2' and so on, and the
+    oldest file beyond 'backups' is deleted.
+
+    Attributes:
+        path (str): The path of the log file.
+        max_bytes (Optional[int]): The size after which the file is rotated, or None to not rotate by size.
+        interval (Optional[float]): The age in seconds after which the file is rotated, or None to not rotate by age.
+        backups (int): The number of rotated files kept.
+        encoding (str): The encoding of the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Optional[int] = 10 * 1024 * 1024,
+        interval: Optional[float] = None,
+        backups: int = 5,
+        encoding: str = "utf-8",
+    ) -> None:
+        """
+        Initialises a new RotatingFileSink instance.
+
+        Args:
+            path (str): The path of the log file.
+            max_bytes (Optional[int]): The size after which the file is rotated. Defaults to 10 MiB.
+            interval (Optional[float]): The age in seconds after which the file is rotated. Defaults to None.
+            backups (int): The number of rotated files kept. Defaults to 5.
+            encoding (str): The encoding of the file. Defaults to "utf-8".
+        """
+        self.path: str = path
+        self.max_bytes: Optional[int] = max_bytes
+        self.interval: Optional[float] = interval
+        self.backups: int = backups
+        self.encoding: str = encoding
+
+        self._file_: Optional[BinaryIO] = None
+        self._opened_at_: float = 0.0
+        self._size_: int = 0
+
+    def _open_(self) -> BinaryIO:
+        """
+        Opens the log file for appending unless it is already open.
+
+        Returns:
+            BinaryIO: The open log file.
+        """
+        if self._file_ is None:
+            directory: str = os.path.dirname(self.path)
+
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._file_ = open(self.path, "ab")
+            self._size_ = self._file_.tell()
+
+            # Continue the age of an existing file, so restarts do not postpone its rotation
+            self._opened_at_ = os.path.getctime(self.path) if self._size_ else time.time()
+
+        return self._file_
+
+    def _rotate_(self) -> None:
+        """
+        Closes the log file and shifts it and its backups by one.
+        """
+        if self._file_ is not None:
+            self._file_.close()
+            self._file_ = None
+
+        if self.backups < 1:
+            os.remove(self.path)
+
+            return
+
+        for number in range(self.backups - 1, 0, -1):
+            source: str = f"{self.path}.{number}"
+
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{number + 1}")
+
+        os.replace(self.path, f"{self.path}.1")
+
+    def close(self) -> None:
+        """
+        Flushes and closes the log file.
+        """
+        if self._file_ is not None:
+            self._file_.close()
+            self._file_ = None
+
+    def flush(self) -> None:
+        """
+        Flushes the log file.
+        """
+        if self._file_ is not None:
+            self._file_.flush()
+
+    def write(self, records: List[LogRecord]) -> None:
+        """
+        Appends a batch of records to the log file, rotating it first if it is due.
+
+        Args:
+            records (List[LogRecord]): The records to write.
+        """
+        data: bytes = "".join(f"{self.format(record)}\n" for record in records).encode(self.encoding)
+
+        file: BinaryIO = self._open_()
+
+        # Check, if the file is due for rotation by size or by age
+        if self._size_ and (
+            (self.max_bytes is not None and self._size_ + len(data) > self.max_bytes)
+            or (self.interval is not None and time.time() - self._opened_at_ >= self.interval)
+        ):
+            self._rotate_()
+
+            file = self._open_()
+
+        file.write(data)
+        file.flush()
+
+        self._size_ += len(data)
+
+
+class JSONLinesSink(RotatingFileSink):
+    """
+    Appends records to a file as JSON lines, one object per record, for log shippers and jq.
+
+    Keyword arguments that are not JSON serialisable are written as their string representation.
+    """
+
+    time_format: str = "%Y-%m-%dT%H:%M:%S"
+
+    def format(self, record: LogRecord) -> str:
+        """
+        Formats a record as a JSON object.
+
+        Args:
+            record (LogRecord): The record to format.
+
+        Returns:
+            str: The JSON object on a single line.
+        """
+        return json.dumps(
+            {
+                "time": f"{self.timestamp(record.created)}.{int(record.created * 1000) % 1000:03d}",
+                "level": record.level.value,
+                "logger": record.name,
+                "message": record.message,
+                **record.kwargs,
+            },
+            default=str,
+        )
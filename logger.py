@@ -1,150 +1,449 @@
-from datetime import datetime
-from pydantic import BaseModel
+import atexit
+import functools
+import inspect
+import random
+import time
+import weakref
+
 from typing import *
 
+from histogram import LatencyHistogram
 from level import Level
+from log_pipeline import LogPipeline
+from log_record import LogRecord
+
+# The severities of the levels, as looking up an enum member costs more than the check itself
+_DEBUG: int = Level.DEBUG.severity
+_INFO: int = Level.INFO.severity
+_WARNING: int = Level.WARNING.severity
+_ERROR: int = Level.ERROR.severity
+_CRITICAL: int = Level.CRITICAL.severity
 
-class Logger(BaseModel):
+# The loggers with functions reporting periodic summaries, whose last period is reported at exit
+_TIMED: "weakref.WeakSet[Logger]" = weakref.WeakSet()
+
+class Logger:
     """
     A configurable logging class that provides colored console output for different logging levels.
     
-    This class extends Pydantic's BaseModel to provide data validation and implements
-    standard logging functionality with colored output for different severity levels.
+    This class implements standard logging functionality with colored output for different
+    severity levels. It is a plain class with slots, so creating a logger costs no validation.
+    Messages are only queued on the calling thread, a LogPipeline writes them in the background.
     
     Attributes:
         level (Level): The minimum logging level for this logger instance
         name (str): The name identifier for this logger instance
+        pipeline (Optional[LogPipeline]): The pipeline messages are queued on, or None for the shared default pipeline
     """
 
-    class Config:
-        """Pydantic configuration to allow arbitrary types."""
-        arbitrary_types_allowed = True
+    __slots__ = ("__weakref__", "_periodic_", "_sample_rates_", "_timings_", "level", "name", "pipeline")
+
+    def __init__(self, name: str, level: Union[Level, str] = Level.INFO, pipeline: Optional[LogPipeline] = None,) -> None:
+        """
+        Initialises a new Logger instance without logging anything.
+
+        Args:
+            name (str): The name identifier for the logger
+            level (Union[Level, str], optional): The minimum logging level, or its name. Defaults to Level.INFO
+            pipeline (Optional[LogPipeline], optional): The pipeline messages are queued on. Defaults to the shared default pipeline
+        """
+        self.level: Level = Level(level)
+        self.name: str = name
+        self.pipeline: Optional[LogPipeline] = pipeline
+
+        # The latency histograms of the functions decorated with function(), by qualified name
+        self._timings_: Dict[str, LatencyHistogram] = {}
+
+        # The fractions of calls timed, for the functions that are sampled, by qualified name
+        self._sample_rates_: Dict[str, float] = {}
+
+        # The summary levels of the functions reporting every report_interval, by qualified name
+        self._periodic_: Dict[str, Level] = {}
+
+    def __repr__(self,) -> str:
+        """
+        Return a string representation of the logger.
 
-    level: Level
-    name: str
+        Returns:
+            str: The string representation of the logger
+        """
+        return f"Logger(name={self.name!r}, level={self.level!r}, pipeline={self.pipeline!r})"
 
     @classmethod
-    def get_logger(cls, name: str, level: Level = Level.INFO,) -> "Logger":
+    def get_logger(cls, name: str, level: Level = Level.INFO, pipeline: Optional[LogPipeline] = None,) -> "Logger":
         """
         Factory method to create a new Logger instance.
 
         Args:
             name (str): The name identifier for the logger
             level (Level, optional): The minimum logging level. Defaults to Level.INFO
+            pipeline (Optional[LogPipeline], optional): The pipeline messages are queued on. Defaults to the shared default pipeline
 
         Returns:
             Logger: A new Logger instance with the specified name and level
         """
-        logger: "Logger" = Logger(level=level, name=name,)
+        logger: "Logger" = Logger(level=level, name=name, pipeline=pipeline,)
 
-        logger.info(message="Initialised Logger...")
+        logger.info("Initialised Logger...")
         
         return logger
     
-    def _colourise_(self, level: Level, message: str,) -> str:
+    def _report_(self, name: str, histogram: LatencyHistogram, level: Level, reset: bool = False,) -> None:
         """
-        Internal method to add ANSI color codes to log messages based on their level.
+        Internal method to log the summary of a function's latencies.
+
+        The number of calls is labelled sampled= instead of calls= for sampled functions,
+        as it only counts the timed calls.
 
         Args:
-            level (Level): The logging level determining the color
-            message (str): The message to be colorized
+            name (str): The qualified name of the function
+            histogram (LatencyHistogram): The latencies of the function in nanoseconds
+            level (Level): The severity level of the summary
+            reset (bool, optional): Whether to start a new summary period afterwards. Defaults to False
+        """
+        summary: Dict[str, float] = histogram.snapshot()
 
-        Returns:
-            str: The colorized message with ANSI escape codes
-        """
-        colourisation: Dict[str, Any] = {
-            "RESET": "\x1b[0m",
-            "DEBUG": "\x1b[90m",     # Gray
-            "INFO": "\x1b[94m",      # Blue
-            "WARNING": "\x1b[93m",   # Yellow
-            "ERROR": "\x1b[91m",     # Red
-            "CRITICAL": "\x1b[91m",  # Red
-        }
+        if reset:
+            histogram.reset()
+
+        if not summary["count"]:
+            return
 
-        return f"{colourisation[level.value]}{message}{colourisation['RESET']}"
+        self.log(
+            "Timing: {} {}={} mean={:.3f}ms p50={:.3f}ms p95={:.3f}ms p99={:.3f}ms max={:.3f}ms",
+            name,
+            "sampled" if name in self._sample_rates_ else "calls",
+            summary["count"],
+            summary["mean"] / 1e6,
+            summary["p50"] / 1e6,
+            summary["p95"] / 1e6,
+            summary["p99"] / 1e6,
+            summary["max"] / 1e6,
+            level=level,
+        )
+
+    def _report_pending_(self,) -> None:
+        """
+        Internal method to log the last, unfinished summary period of every function reporting periodically.
+        """
+        for name, level in list(self._periodic_.items()):
+            self._report_(histogram=self._timings_[name], level=level, name=name, reset=True,)
 
-    def critical(self, message: str, **kwargs,) -> None:
+    def critical(self, message: Union[str, Callable[[], str]], *args, **kwargs,) -> None:
         """
         Log a critical message.
 
         Args:
-            message (str): The critical message to log
+            message (Union[str, Callable[[], str]]): The critical message to log, a format string for args, or a callable returning it
+            *args: Positional arguments the message is formatted with
             **kwargs: Additional keyword arguments passed to log()
         """
-        self.log(message, level=Level.CRITICAL, **kwargs,)
+        if _CRITICAL >= self.level.severity:
+            self.log(message, *args, level=Level.CRITICAL, **kwargs,)
 
-    def debug(self, message: str, **kwargs,) -> None:
+    def debug(self, message: Union[str, Callable[[], str]], *args, **kwargs,) -> None:
         """
         Log a debug message.
 
         Args:
-            message (str): The debug message to log
+            message (Union[str, Callable[[], str]]): The debug message to log, a format string for args, or a callable returning it
+            *args: Positional arguments the message is formatted with
             **kwargs: Additional keyword arguments passed to log()
         """
-        self.log(message, level=Level.DEBUG, **kwargs,)
+        if _DEBUG >= self.level.severity:
+            self.log(message, *args, level=Level.DEBUG, **kwargs,)
 
-    def error(self, message: str, **kwargs,) -> None:
+    def error(self, message: Union[str, Callable[[], str]], *args, **kwargs,) -> None:
         """
         Log an error message.
 
         Args:
-            message (str): The error message to log
+            message (Union[str, Callable[[], str]]): The error message to log, a format string for args, or a callable returning it
+            *args: Positional arguments the message is formatted with
             **kwargs: Additional keyword arguments passed to log()
         """
-        self.log(message, level=Level.ERROR, **kwargs,)
+        if _ERROR >= self.level.severity:
+            self.log(message, *args, level=Level.ERROR, **kwargs,)
     
-    def function(self, function: Callable[..., Any], *args, **kwargs,) -> Any:
+    def flush(self, timeout: Optional[float] = None,) -> bool:
         """
-        Decorator to log the execution of a function.
+        Wait until every message logged so far has been written.
 
         Args:
-            function (Callable[..., Any]): The function to be decorated
-            *args: Positional arguments passed to the function
-            **kwargs: Keyword arguments passed to the function
+            timeout (Optional[float], optional): Seconds to wait. Defaults to None, i.e. no limit
 
         Returns:
-            Any: The result of the decorated function
+            bool: True if the messages were written, False if the timeout expired first
         """
-        self.log(f"Executing: {function.__name__}", level=Level.INFO,)
+        return (self.pipeline or LogPipeline.default()).flush(timeout=timeout,)
 
-        start: datetime = datetime.now()
-        result = function(*args, **kwargs)
+    def function(
+        self,
+        function: Optional[Callable[..., Any]] = None,
+        *,
+        sample_rate: float = 1.0,
+        report_interval: Optional[float] = 60.0,
+        level: Level = Level.INFO,
+        log_calls: bool = False,
+    ) -> Any:
+        """
+        Decorator timing every call of a function or coroutine function with perf_counter_ns.
+
+        The latencies feed a fixed-memory histogram per function, and instead of a line per
+        call, a summary with the count, mean, p50, p95, p99 and max of the calls since the
+        last summary is logged every report_interval seconds. Use it bare, as @logger.function,
+        or with options, as @logger.function(sample_rate=0.01).
 
-        end: datetime = datetime.now()
-        self.log(f"Completed: {function.__name__}", level=Level.INFO,)
+        Summaries are only checked for at the end of a timed call, so a function that goes idle
+        does not report its last period until it is called again or the interpreter exits, when
+        the pending summaries are logged. Call report() to log them at other times. With a
+        sample_rate below 1.0 the summaries count the timed calls as sampled= instead of calls=.
 
-        self.log(f"Duration: {(end - start).total_seconds()}s", level=Level.INFO,)
-        return result
+        Args:
+            function (Optional[Callable[..., Any]], optional): The function to decorate. Defaults to None when options are given
+            sample_rate (float, optional): The fraction of calls that are timed. Defaults to 1.0
+            report_interval (Optional[float], optional): Seconds between summaries, or None to only report on report(). Defaults to 60.0
+            level (Level, optional): The severity level of the summaries and call lines. Defaults to Level.INFO
+            log_calls (bool, optional): Whether to also log the duration of every timed call. Defaults to False
 
-    def info(self, message: str, **kwargs,) -> None:
+        Returns:
+            Any: The decorated function, or a decorator if no function was given
+        """
+        if function is None:
+            return functools.partial(
+                self.function,
+                level=level,
+                log_calls=log_calls,
+                report_interval=report_interval,
+                sample_rate=sample_rate,
+            )
+
+        name: str = f"{function.__module__}.{function.__qualname__}"
+
+        histogram: LatencyHistogram = self._timings_.setdefault(name, LatencyHistogram())
+
+        if sample_rate < 1.0:
+            self._sample_rates_[name] = sample_rate
+        else:
+            self._sample_rates_.pop(name, None)
+
+        if report_interval is not None:
+            self._periodic_[name] = level
+
+            _TIMED.add(self)
+
+        # The time of the last summary, in a list so the wrappers can update it
+        reported_at: List[int] = [time.perf_counter_ns()]
+
+        interval: Optional[int] = None if report_interval is None else int(report_interval * 1e9)
+
+        def __record__(started: int) -> None:
+            """
+            Records the latency of a call that started at the given time and reports if a summary is due.
+
+            Args:
+                started (int): The perf_counter_ns() at the start of the call
+            """
+            now: int = time.perf_counter_ns()
+
+            histogram.record(now - started)
+
+            if log_calls:
+                self.log("Completed: {} in {:.3f}ms", name, (now - started) / 1e6, level=level,)
+
+            # Check, if a summary of the calls since the last one is due
+            if interval is not None and now - reported_at[0] >= interval:
+                reported_at[0] = now
+
+                self._report_(histogram=histogram, level=level, name=name, reset=True,)
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs,) -> Any:
+                # Check, if this call is left out by sampling
+                if sample_rate < 1.0 and random.random() >= sample_rate:
+                    return await function(*args, **kwargs,)
+
+                started: int = time.perf_counter_ns()
+
+                try:
+                    return await function(*args, **kwargs,)
+                finally:
+                    __record__(started)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs,) -> Any:
+                # Check, if this call is left out by sampling
+                if sample_rate < 1.0 and random.random() >= sample_rate:
+                    return function(*args, **kwargs,)
+
+                started: int = time.perf_counter_ns()
+
+                try:
+                    return function(*args, **kwargs,)
+                finally:
+                    __record__(started)
+
+        wrapper.histogram = histogram
+
+        return wrapper
+
+    def info(self, message: Union[str, Callable[[], str]], *args, **kwargs,) -> None:
         """
         Log an informational message.
 
         Args:
-            message (str): The info message to log
+            message (Union[str, Callable[[], str]]): The info message to log, a format string for args, or a callable returning it
+            *args: Positional arguments the message is formatted with
             **kwargs: Additional keyword arguments passed to log()
         """
-        self.log(message, level=Level.INFO, **kwargs,)
+        if _INFO >= self.level.severity:
+            self.log(message, *args, level=Level.INFO, **kwargs,)
     
-    def log(self, message: str, level: Level = Level.INFO, **kwargs,) -> None:
+    def is_enabled_for(self, level: Level,) -> bool:
         """
-        Core logging method that handles message formatting and output.
+        Check whether messages of the given level are logged, e.g. before preparing expensive arguments.
 
         Args:
-            message (str): The log message to output
+            level (Level): The severity level to check
+
+        Returns:
+            bool: True if messages of the level are logged, False otherwise
+        """
+        return level.severity >= self.level.severity
+
+    def log(self, message: Union[str, Callable[[], str]], *args, level: Level = Level.INFO, **kwargs,) -> None:
+        """
+        Core logging method that formats a message and queues it for the pipeline, which writes it in the background.
+
+        Messages below the level of the logger return right away, before the message is
+        formatted with str.format for args, e.g. log("Got {} items", count), or by calling it,
+        e.g. log(lambda: expensive_summary()), so callers never pay for formatting a message
+        that is not logged. Messages that are logged are formatted on the calling thread, so
+        they show the arguments as they were at the call, and the callable never runs on the
+        writer thread of the pipeline.
+
+        Args:
+            message (Union[str, Callable[[], str]]): The log message to output, a format string for args, or a callable returning it
+            *args: Positional arguments the message is formatted with
             level (Level, optional): The severity level of the message. Defaults to Level.INFO
             **kwargs: Additional keyword arguments for future extensibility
         """
-        print(
-            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [{self.name}] {self._colourise_(level, message)} {kwargs}",
-        )
+        if level.severity < self.level.severity:
+            return
+
+        record: LogRecord = LogRecord(args=args, created=time.time(), kwargs=kwargs, level=level, message=message, name=self.name,)
+
+        # Format the message now, as the arguments may be changed after the call returns
+        record.message
 
-    def warning(self, message: str, **kwargs,) -> None:
+        (self.pipeline or LogPipeline.default()).emit(record)
+
+    def report(self, level: Level = Level.INFO, reset: bool = False,) -> None:
+        """
+        Log a latency summary of every function decorated with function().
+
+        Args:
+            level (Level, optional): The severity level of the summaries. Defaults to Level.INFO
+            reset (bool, optional): Whether to start a new summary period afterwards. Defaults to False
+        """
+        for name, histogram in list(self._timings_.items()):
+            self._report_(histogram=histogram, level=level, name=name, reset=reset,)
+
+    def timings(self,) -> Dict[str, Dict[str, float]]:
+        """
+        Return the latency summaries of every function decorated with function(), in milliseconds.
+
+        Returns:
+            Dict[str, Dict[str, float]]: The count, mean, min, p50, p95, p99 and max per qualified function name
+        """
+        return {
+            name: {key: value if key == "count" else value / 1e6 for key, value in histogram.snapshot().items()}
+            for name, histogram in list(self._timings_.items())
+        }
+
+    def warning(self, message: Union[str, Callable[[], str]], *args, **kwargs,) -> None:
         """
         Log a warning message.
 
         Args:
-            message (str): The warning message to log
+            message (Union[str, Callable[[], str]]): The warning message to log, a format string for args, or a callable returning it
+            *args: Positional arguments the message is formatted with
             **kwargs: Additional keyword arguments passed to log()
         """
-        self.log(message, level=Level.WARNING, **kwargs,)
\ No newline at end of file
+        if _WARNING >= self.level.severity:
+            self.log(message, *args, level=Level.WARNING, **kwargs,)
+
+class LazyLogger:
+    """
+    A class attribute holding a Logger that is only created on first access, so defining the class creates and logs nothing.
+
+    Declare it as a class attribute, e.g. logger: Logger = LazyLogger(name="WebService"). The first
+    access creates the Logger with Logger.get_logger and replaces the descriptor with it on the class
+    it was declared on, so later accesses are plain attribute lookups.
+
+    Attributes:
+        name (str): The name identifier of the logger
+        level (Level): The minimum logging level of the logger
+        pipeline (Optional[LogPipeline]): The pipeline messages are queued on, or None for the shared default pipeline
+    """
+
+    __slots__ = ("attribute", "level", "name", "pipeline")
+
+    def __init__(self, name: str, level: Level = Level.INFO, pipeline: Optional[LogPipeline] = None,) -> None:
+        """
+        Initialises a new LazyLogger instance.
+
+        Args:
+            name (str): The name identifier of the logger
+            level (Level, optional): The minimum logging level. Defaults to Level.INFO
+            pipeline (Optional[LogPipeline], optional): The pipeline messages are queued on. Defaults to the shared default pipeline
+        """
+        self.attribute: str = ""
+        self.level: Level = level
+        self.name: str = name
+        self.pipeline: Optional[LogPipeline] = pipeline
+
+    def __set_name__(self, owner: type, attribute: str,) -> None:
+        """
+        Remember the name of the class attribute holding the descriptor.
+
+        Args:
+            owner (type): The class the descriptor is declared on
+            attribute (str): The name of the class attribute
+        """
+        self.attribute = attribute
+
+    def __get__(self, instance: Any, owner: type,) -> Logger:
+        """
+        Create the logger and store it on the class the descriptor is declared on.
+
+        Args:
+            instance (Any): The instance the attribute is accessed on, or None for the class
+            owner (type): The class the attribute is accessed on
+
+        Returns:
+            Logger: The logger
+        """
+        logger: Logger = Logger.get_logger(level=self.level, name=self.name, pipeline=self.pipeline,)
+
+        # Replace the descriptor where it is declared, so subclasses share the logger
+        for klass in owner.__mro__:
+            if klass.__dict__.get(self.attribute) is self:
+                setattr(klass, self.attribute, logger)
+
+                break
+
+        return logger
+
+
+def _report_at_exit_() -> None:
+    """
+    Logs the last summary period of the timed functions when the interpreter exits, before the pipelines are closed.
+    """
+    for logger in list(_TIMED):
+        logger._report_pending_()
+
+
+# Registered after the hook of log_pipeline, so it runs before the pipelines are closed
+atexit.register(_report_at_exit_)
@@ -0,0 +1,547 @@
+import re
+import threading
+import time
+
+from types import SimpleNamespace
+from typing import *
+from urllib.parse import SplitResult, urlsplit
+
+from histogram import LatencyHistogram
+
+if TYPE_CHECKING:
+    import aiohttp
+
+__all__: List[str] = ["RequestMetrics", "RequestTiming"]
+
+
+# Path segments that identify a resource rather than an endpoint: numbers, UUIDs and long hex strings
+_IDENTIFIER: Pattern[str] = re.compile(
+    r"^(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$"
+)
+
+
+class RequestTiming:
+    """
+    The timestamps of a single request, filled in by the trace hooks of the session it is sent with.
+
+    All timestamps are perf_counter_ns() values, or 0 if the event did not happen, e.g. no
+    DNS lookup or connection setup for a request sent over a reused connection.
+
+    Attributes:
+        method (str): The HTTP method of the request.
+        url (str): The URL of the request.
+        started (int): When the request was started.
+        queue_started (int): When the request started waiting for a free connection.
+        queue_ended (int): When the request got a free connection.
+        connect_started (int): When a new connection was started.
+        connect_ended (int): When the new connection, including the TLS handshake, was established.
+        dns_started (int): When the DNS lookup started.
+        dns_ended (int): When the DNS lookup ended.
+        headers_sent (int): When the request headers were sent.
+        headers_received (int): When the response headers were received.
+        bytes_out (int): The number of request body bytes sent.
+        reused (bool): Whether the request was sent over a reused connection.
+    """
+
+    __slots__ = (
+        "bytes_out",
+        "connect_ended",
+        "connect_started",
+        "dns_ended",
+        "dns_started",
+        "headers_received",
+        "headers_sent",
+        "method",
+        "queue_ended",
+        "queue_started",
+        "reused",
+        "started",
+        "url",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+    ) -> None:
+        """
+        Initialises a new RequestTiming instance, starting the clock.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+        """
+        self.method: str = method
+        self.url: str = url
+
+        self.started: int = time.perf_counter_ns()
+        self.queue_started: int = 0
+        self.queue_ended: int = 0
+        self.connect_started: int = 0
+        self.connect_ended: int = 0
+        self.dns_started: int = 0
+        self.dns_ended: int = 0
+        self.headers_sent: int = 0
+        self.headers_received: int = 0
+        self.bytes_out: int = 0
+        self.reused: bool = False
+
+    def phases(self, ended: int) -> Dict[str, int]:
+        """
+        Returns the duration of every phase the request went through, in nanoseconds.
+
+        aiohttp performs the TLS handshake as part of creating a connection and has no hook in
+        between, so "connect" covers the TCP and the TLS handshake, without the DNS lookup.
+
+        Args:
+            ended (int): When the body was read completely.
+
+        Returns:
+            Dict[str, int]: The durations of the "queue", "dns", "connect", "ttfb", "body" and "total" phases that happened.
+        """
+        phases: Dict[str, int] = {"total": ended - self.started}
+
+        if self.queue_ended:
+            phases["queue"] = self.queue_ended - self.queue_started
+
+        dns: int = self.dns_ended - self.dns_started if self.dns_ended else 0
+
+        if self.dns_ended:
+            phases["dns"] = dns
+
+        if self.connect_ended:
+            phases["connect"] = self.connect_ended - self.connect_started - dns
+
+        if self.headers_received:
+            phases["ttfb"] = self.headers_received - (self.headers_sent or self.started)
+            phases["body"] = ended - self.headers_received
+
+        return phases
+
+
+def _escape_(value: Any) -> str:
+    """
+    Escapes a Prometheus label value.
+
+    Args:
+        value (Any): The label value.
+
+    Returns:
+        str: The escaped label value.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _stamp_(attribute: str) -> Callable[["aiohttp.ClientSession", SimpleNamespace, Any], Awaitable[None]]:
+    """
+    Returns a trace hook storing the current time in the given attribute of the timing of the request.
+
+    Args:
+        attribute (str): The attribute of RequestTiming to store the time in.
+
+    Returns:
+        Callable[[aiohttp.ClientSession, SimpleNamespace, Any], Awaitable[None]]: The trace hook.
+    """
+
+    async def __hook__(session: "aiohttp.ClientSession", trace_config_ctx: SimpleNamespace, params: Any) -> None:
+        timing: Any = trace_config_ctx.trace_request_ctx
+
+        if isinstance(timing, RequestTiming):
+            setattr(timing, attribute, time.perf_counter_ns())
+
+    return __hook__
+
+
+async def _on_connection_reuseconn_(session: "aiohttp.ClientSession", trace_config_ctx: SimpleNamespace, params: Any) -> None:
+    """
+    Marks the timing of the request as sent over a reused connection.
+    """
+    timing: Any = trace_config_ctx.trace_request_ctx
+
+    if isinstance(timing, RequestTiming):
+        timing.reused = True
+
+
+async def _on_request_chunk_sent_(session: "aiohttp.ClientSession", trace_config_ctx: SimpleNamespace, params: Any) -> None:
+    """
+    Adds a chunk of the request body to the bytes sent of the timing of the request.
+    """
+    timing: Any = trace_config_ctx.trace_request_ctx
+
+    if isinstance(timing, RequestTiming):
+        timing.bytes_out += len(params.chunk)
+
+
+class _Stats:
+    """
+    The phase histograms of a single host or endpoint.
+    """
+
+    __slots__ = ("phases",)
+
+    def __init__(self) -> None:
+        """
+        Initialises a new _Stats instance without any phases.
+        """
+        self.phases: Dict[str, LatencyHistogram] = {}
+
+    def record(self, phases: Dict[str, int]) -> None:
+        """
+        Records the durations of the phases of a request.
+
+        Args:
+            phases (Dict[str, int]): The duration of each phase in nanoseconds.
+        """
+        for phase, duration in phases.items():
+            histogram: Optional[LatencyHistogram] = self.phases.get(phase)
+
+            if histogram is None:
+                histogram = self.phases.setdefault(phase, LatencyHistogram())
+
+            histogram.record(duration)
+
+
+class RequestMetrics:
+    """
+    Collects per-phase latency histograms, status counts, transfer volumes and connection reuse of requests.
+
+    Requests are timed by passing a RequestTiming as the trace_request_ctx of a session
+    created with trace_config(), and recorded with finish() or fail() once they completed.
+    Phase histograms are kept per host and per endpoint, where an endpoint is the method,
+    host and path with identifiers, i.e. numbers, UUIDs and long hex strings, replaced by
+    "{id}". Hosts beyond 'max_hosts' and endpoints beyond 'max_endpoints' are counted as
+    "other", so the memory and the number of series stay bounded, e.g. while crawling.
+
+    Attributes:
+        max_hosts (int): The maximum number of hosts tracked separately.
+        max_endpoints (int): The maximum number of endpoints tracked separately.
+        connections_created (int): The number of requests that opened a new connection.
+        connections_reused (int): The number of requests sent over a reused connection.
+    """
+
+    # The label of the hosts beyond max_hosts and of the endpoints beyond max_endpoints
+    OTHER: str = "other"
+
+    def __init__(
+        self,
+        max_endpoints: int = 500,
+        max_hosts: int = 100,
+    ) -> None:
+        """
+        Initialises a new RequestMetrics instance.
+
+        Args:
+            max_endpoints (int): The maximum number of endpoints tracked separately. Defaults to 500.
+            max_hosts (int): The maximum number of hosts tracked separately. Defaults to 100.
+        """
+        self.max_endpoints: int = max_endpoints
+        self.max_hosts: int = max_hosts
+
+        self.connections_created: int = 0
+        self.connections_reused: int = 0
+
+        self._hosts_: Dict[str, _Stats] = {}
+        self._endpoints_: Dict[str, _Stats] = {}
+        self._statuses_: Dict[Tuple[str, int], int] = {}
+        self._errors_: Dict[Tuple[str, str], int] = {}
+        self._bytes_in_: Dict[str, int] = {}
+        self._bytes_out_: Dict[str, int] = {}
+        self._lock_: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def trace_config() -> "aiohttp.TraceConfig":
+        """
+        Returns a trace config filling in the RequestTiming passed as trace_request_ctx of a request.
+
+        Requests sent without a RequestTiming are ignored, so the trace config can stay attached to
+        a session shared with code that does not collect metrics.
+
+        Returns:
+            aiohttp.TraceConfig: The trace config to create sessions with.
+        """
+        import aiohttp
+
+        trace_config: aiohttp.TraceConfig = aiohttp.TraceConfig()
+
+        trace_config.on_connection_queued_start.append(_stamp_("queue_started"))
+        trace_config.on_connection_queued_end.append(_stamp_("queue_ended"))
+        trace_config.on_connection_create_start.append(_stamp_("connect_started"))
+        trace_config.on_connection_create_end.append(_stamp_("connect_ended"))
+        trace_config.on_connection_reuseconn.append(_on_connection_reuseconn_)
+        trace_config.on_dns_resolvehost_start.append(_stamp_("dns_started"))
+        trace_config.on_dns_resolvehost_end.append(_stamp_("dns_ended"))
+        trace_config.on_request_headers_sent.append(_stamp_("headers_sent"))
+        trace_config.on_request_chunk_sent.append(_on_request_chunk_sent_)
+        trace_config.on_request_end.append(_stamp_("headers_received"))
+
+        return trace_config
+
+    def _endpoint_(
+        self,
+        method: str,
+        host: str,
+        path: str,
+    ) -> str:
+        """
+        Returns the endpoint of a request, replacing identifiers in its path with "{id}".
+
+        Args:
+            method (str): The HTTP method of the request.
+            host (str): The host of the request.
+            path (str): The path of the request.
+
+        Returns:
+            str: The endpoint, e.g. "GET api.example.com/users/{id}", or "other" once max_endpoints is reached.
+        """
+        segments: List[str] = ["{id}" if _IDENTIFIER.match(segment) else segment for segment in path.split("/")]
+
+        endpoint: str = f"{method} {host}{'/'.join(segments) or '/'}"
+
+        if endpoint not in self._endpoints_ and len(self._endpoints_) >= self.max_endpoints:
+            return self.OTHER
+
+        return endpoint
+
+    def _host_(self, url: str) -> str:
+        """
+        Returns the host of a request.
+
+        Args:
+            url (str): The URL of the request.
+
+        Returns:
+            str: The host, e.g. "api.example.com", or "other" once max_hosts is reached.
+        """
+        host: str = urlsplit(url).netloc
+
+        if host not in self._hosts_ and len(self._hosts_) >= self.max_hosts:
+            return self.OTHER
+
+        return host
+
+    def _stats_(
+        self,
+        table: Dict[str, _Stats],
+        key: str,
+    ) -> _Stats:
+        """
+        Returns the stats of the given key, creating them on first use.
+
+        Args:
+            table (Dict[str, _Stats]): The stats by host or by endpoint.
+            key (str): The host or endpoint.
+
+        Returns:
+            _Stats: The stats of the key.
+        """
+        stats: Optional[_Stats] = table.get(key)
+
+        if stats is None:
+            with self._lock_:
+                stats = table.setdefault(key, _Stats())
+
+        return stats
+
+    def fail(
+        self,
+        timing: RequestTiming,
+        error: BaseException,
+    ) -> None:
+        """
+        Records a request that failed before its response was read.
+
+        Args:
+            timing (RequestTiming): The timing of the request.
+            error (BaseException): The exception the request failed with.
+        """
+        host: str = self._host_(timing.url)
+
+        key: Tuple[str, str] = (host, type(error).__name__)
+
+        with self._lock_:
+            self._errors_[key] = self._errors_.get(key, 0) + 1
+
+        self._stats_(self._hosts_, host).record({"total": time.perf_counter_ns() - timing.started})
+
+    def finish(
+        self,
+        timing: RequestTiming,
+        status: int,
+        bytes_in: int,
+    ) -> None:
+        """
+        Records a request whose response was read completely.
+
+        Args:
+            timing (RequestTiming): The timing of the request.
+            status (int): The status of the response.
+            bytes_in (int): The number of response body bytes received.
+        """
+        phases: Dict[str, int] = timing.phases(time.perf_counter_ns())
+
+        parts: SplitResult = urlsplit(timing.url)
+
+        host: str = self._host_(timing.url)
+
+        with self._lock_:
+            self._statuses_[(host, status)] = self._statuses_.get((host, status), 0) + 1
+            self._bytes_in_[host] = self._bytes_in_.get(host, 0) + bytes_in
+            self._bytes_out_[host] = self._bytes_out_.get(host, 0) + timing.bytes_out
+
+            if timing.reused:
+                self.connections_reused += 1
+            elif timing.connect_ended:
+                self.connections_created += 1
+
+        self._stats_(self._hosts_, host).record(phases)
+        self._stats_(self._endpoints_, self._endpoint_(timing.method, parts.netloc, parts.path)).record(phases)
+
+    def prometheus(self, prefix: str = "webservice") -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Phase latencies are exported as summaries in seconds, with the p50, p95 and p99 as quantiles.
+
+        Args:
+            prefix (str): The prefix of the metric names. Defaults to "webservice".
+
+        Returns:
+            str: The metrics, ready to be served on a /metrics endpoint.
+        """
+
+        def __labels__(**labels: Any) -> str:
+            """
+            Formats the given labels, escaping their values.
+            """
+            return "{" + ",".join(f'{name}="{_escape_(value)}"' for name, value in labels.items()) + "}"
+
+        lines: List[str] = []
+
+        snapshot: Dict[str, Any] = self.snapshot()
+
+        for scope, label in (("hosts", "host"), ("endpoints", "endpoint")):
+            name: str = f"{prefix}_{'request' if scope == 'hosts' else 'endpoint'}_phase_seconds"
+
+            lines.append(f"# HELP {name} Request phase latencies by {label}.")
+            lines.append(f"# TYPE {name} summary")
+
+            for key, phases in snapshot[scope].items():
+                for phase, summary in phases.items():
+                    for quantile in ("p50", "p95", "p99"):
+                        lines.append(
+                            f"{name}{__labels__(**{label: key}, phase=phase, quantile=f'0.{quantile[1:]}')} {summary[quantile]}"
+                        )
+
+                    lines.append(f"{name}_sum{__labels__(**{label: key}, phase=phase)} {summary['sum']}")
+                    lines.append(f"{name}_count{__labels__(**{label: key}, phase=phase)} {summary['count']}")
+
+        lines.append(f"# HELP {prefix}_responses_total Responses by host and status.")
+        lines.append(f"# TYPE {prefix}_responses_total counter")
+
+        for host, statuses in snapshot["statuses"].items():
+            for status, count in statuses.items():
+                lines.append(f"{prefix}_responses_total{__labels__(host=host, status=status)} {count}")
+
+        lines.append(f"# HELP {prefix}_request_errors_total Requests that failed without a response, by host and exception.")
+        lines.append(f"# TYPE {prefix}_request_errors_total counter")
+
+        for host, errors in snapshot["errors"].items():
+            for error, count in errors.items():
+                lines.append(f"{prefix}_request_errors_total{__labels__(error=error, host=host)} {count}")
+
+        for direction, description in (("received", "Response"), ("sent", "Request")):
+            lines.append(f"# HELP {prefix}_bytes_{direction}_total {description} body bytes by host.")
+            lines.append(f"# TYPE {prefix}_bytes_{direction}_total counter")
+
+            for host, transferred in snapshot["bytes"].items():
+                lines.append(f"{prefix}_bytes_{direction}_total{__labels__(host=host)} {transferred[direction]}")
+
+        connections: Dict[str, float] = snapshot["connections"]
+
+        lines.append(f"# HELP {prefix}_connections_total Requests by whether they opened a new or reused a pooled connection.")
+        lines.append(f"# TYPE {prefix}_connections_total counter")
+        lines.append(f"{prefix}_connections_total{__labels__(kind='created')} {connections['created']}")
+        lines.append(f"{prefix}_connections_total{__labels__(kind='reused')} {connections['reused']}")
+
+        lines.append(f"# HELP {prefix}_connection_reuse_ratio The share of requests sent over a reused connection.")
+        lines.append(f"# TYPE {prefix}_connection_reuse_ratio gauge")
+        lines.append(f"{prefix}_connection_reuse_ratio {connections['reuse_ratio']}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """
+        Forgets everything recorded so far.
+        """
+        with self._lock_:
+            self.connections_created = 0
+            self.connections_reused = 0
+
+            self._hosts_ = {}
+            self._endpoints_ = {}
+            self._statuses_ = {}
+            self._errors_ = {}
+            self._bytes_in_ = {}
+            self._bytes_out_ = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns everything recorded so far, with latencies in seconds.
+
+        Returns:
+            Dict[str, Any]: The phase summaries by host and by endpoint, the status counts and errors by host,
+            the bytes received and sent by host, and the connections created, reused and the reuse ratio.
+        """
+
+        def __summaries__(table: Dict[str, _Stats]) -> Dict[str, Dict[str, Dict[str, float]]]:
+            """
+            Returns the phase summaries of every key of the given table in seconds.
+            """
+            summaries: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+            for key, stats in list(table.items()):
+                summaries[key] = {}
+
+                for phase, histogram in list(stats.phases.items()):
+                    summary: Dict[str, float] = {
+                        name: value if name == "count" else value / 1e9 for name, value in histogram.snapshot().items()
+                    }
+
+                    summary["sum"] = histogram.total / 1e9
+
+                    summaries[key][phase] = summary
+
+            return summaries
+
+        with self._lock_:
+            statuses: Dict[Tuple[str, int], int] = dict(self._statuses_)
+            errors: Dict[Tuple[str, str], int] = dict(self._errors_)
+            bytes_in: Dict[str, int] = dict(self._bytes_in_)
+            bytes_out: Dict[str, int] = dict(self._bytes_out_)
+            created, reused = self.connections_created, self.connections_reused
+
+        grouped_statuses: Dict[str, Dict[int, int]] = {}
+
+        for (host, status), count in sorted(statuses.items()):
+            grouped_statuses.setdefault(host, {})[status] = count
+
+        grouped_errors: Dict[str, Dict[str, int]] = {}
+
+        for (host, error), count in sorted(errors.items()):
+            grouped_errors.setdefault(host, {})[error] = count
+
+        return {
+            "hosts": __summaries__(self._hosts_),
+            "endpoints": __summaries__(self._endpoints_),
+            "statuses": grouped_statuses,
+            "errors": grouped_errors,
+            "bytes": {
+                host: {"received": bytes_in.get(host, 0), "sent": bytes_out.get(host, 0)}
+                for host in sorted(set(bytes_in) | set(bytes_out))
+            },
+            "connections": {
+                "created": created,
+                "reused": reused,
+                "reuse_ratio": reused / (created + reused) if created + reused else 0.0,
+            },
+        }
@@ -0,0 +1,487 @@
+import itertools
+import re
+
+from abc import ABC, abstractmethod
+from typing import *
+from urllib.parse import urljoin
+
+from response import Response
+
+__all__: List[str] = [
+    "CursorPagination",
+    "LinkHeaderPagination",
+    "OffsetPagination",
+    "PageRequest",
+    "PaginationError",
+    "PaginationStrategy",
+]
+
+
+# The URL and query parameters of a single page
+PageRequest = Tuple[str, Dict[str, Any]]
+
+# Matches a single link of a Link header, e.g. '<https://api.example.com/items?page=2>; rel="next"'
+_LINK: Pattern[str] = re.compile(r"<([^>]*)>((?:\s*;\s*[^;,]+)*)")
+
+
+def _resolve_(
+    data: Any,
+    path: Optional[str],
+) -> Any:
+    """
+    Returns the value at the given dotted path of a decoded JSON document.
+
+    Args:
+        data (Any): The decoded JSON document.
+        path (Optional[str]): The dotted path, e.g. "meta.next_cursor", or None for the document itself.
+
+    Returns:
+        Any: The value at the path, or None if any part of it is missing.
+    """
+    if path is None:
+        return data
+
+    for key in path.split("."):
+        if isinstance(data, Mapping):
+            data = data.get(key)
+        elif isinstance(data, list) and key.isdigit() and int(key) < len(data):
+            data = data[int(key)]
+        else:
+            return None
+
+    return data
+
+
+class PaginationError(RuntimeError):
+    """
+    Raised when a page is answered with an error status.
+
+    Attributes:
+        response (Response): The response of the page.
+    """
+
+    def __init__(self, response: Response) -> None:
+        """
+        Initialises a new PaginationError instance.
+
+        Args:
+            response (Response): The response of the page.
+        """
+        super().__init__(f"Page '{response.url}' was answered with status {response.status}.")
+
+        self.response: Response = response
+
+
+class PaginationStrategy(ABC):
+    """
+    Describes how the pages of a paginated API are requested and where their items are.
+
+    Strategies whose page URLs depend on the previous response only implement next().
+    Strategies that can compute the URLs of the following pages up front also implement
+    following(), which lets them be fetched ahead and in parallel.
+
+    Attributes:
+        items_path (Optional[str]): The dotted path of the items in a page, or None if the page is the list of items.
+    """
+
+    def __init__(self, items_path: Optional[str] = None) -> None:
+        """
+        Initialises a new PaginationStrategy instance.
+
+        Args:
+            items_path (Optional[str]): The dotted path of the items in a page. Defaults to None.
+        """
+        self.items_path: Optional[str] = items_path
+
+    def first(
+        self,
+        url: str,
+        params: Dict[str, Any],
+    ) -> PageRequest:
+        """
+        Returns the request of the first page.
+
+        Args:
+            url (str): The URL of the paginated resource.
+            params (Dict[str, Any]): The query parameters of every page.
+
+        Returns:
+            PageRequest: The URL and query parameters of the first page.
+        """
+        return url, dict(params)
+
+    def following(
+        self,
+        request: PageRequest,
+        response: Response,
+        items: List[Any],
+    ) -> Optional[Iterator[PageRequest]]:
+        """
+        Returns the requests of the pages after the given one, if they can be computed up front.
+
+        Args:
+            request (PageRequest): The request of the current page.
+            response (Response): The response of the current page.
+            items (List[Any]): The items of the current page.
+
+        Returns:
+            Optional[Iterator[PageRequest]]: The requests of the following pages, or None if each depends on its predecessor.
+        """
+        return None
+
+    def items(self, data: Any) -> List[Any]:
+        """
+        Returns the items of a decoded page.
+
+        Args:
+            data (Any): The decoded body of the page.
+
+        Returns:
+            List[Any]: The items of the page. A page that is not a list counts as a single item.
+        """
+        items: Any = _resolve_(data, self.items_path)
+
+        if items is None:
+            return []
+        elif isinstance(items, list):
+            return items
+
+        return [items]
+
+    @abstractmethod
+    def next(
+        self,
+        request: PageRequest,
+        response: Response,
+        items: List[Any],
+    ) -> Optional[PageRequest]:
+        """
+        Returns the request of the page after the given one.
+
+        Args:
+            request (PageRequest): The request of the current page.
+            response (Response): The response of the current page.
+            items (List[Any]): The items of the current page.
+
+        Returns:
+            Optional[PageRequest]: The request of the next page, or None if the current page is the last one.
+        """
+
+    def total(self, response: Response) -> Optional[int]:
+        """
+        Returns the total number of items the given response announces.
+
+        Args:
+            response (Response): The response of a page.
+
+        Returns:
+            Optional[int]: The total number of items, or None if it is unknown.
+        """
+        return None
+
+
+class LinkHeaderPagination(PaginationStrategy):
+    """
+    Follows the 'rel="next"' link of the Link header (RFC 8288), as used by e.g. the GitHub API.
+
+    Attributes:
+        rel (str): The relation of the link to follow.
+    """
+
+    def __init__(
+        self,
+        items_path: Optional[str] = None,
+        rel: str = "next",
+    ) -> None:
+        """
+        Initialises a new LinkHeaderPagination instance.
+
+        Args:
+            items_path (Optional[str]): The dotted path of the items in a page. Defaults to None.
+            rel (str): The relation of the link to follow. Defaults to "next".
+        """
+        super().__init__(items_path=items_path)
+
+        self.rel: str = rel
+
+    def next(
+        self,
+        request: PageRequest,
+        response: Response,
+        items: List[Any],
+    ) -> Optional[PageRequest]:
+        """
+        Returns the request of the page the Link header of the given response points to.
+
+        Args:
+            request (PageRequest): The request of the current page.
+            response (Response): The response of the current page.
+            items (List[Any]): The items of the current page.
+
+        Returns:
+            Optional[PageRequest]: The request of the next page, or None if there is no such link.
+        """
+        headers: Mapping[str, str] = response.headers
+
+        # A response may carry several Link headers, which multidicts keep apart
+        values: List[str] = headers.getall("Link", []) if hasattr(headers, "getall") else [headers.get("Link", "")]
+
+        for header in values:
+            for target, parameters in _LINK.findall(header):
+                for parameter in parameters.split(";"):
+                    key, _, value = parameter.strip().partition("=")
+
+                    # Check, if the link has the wanted relation, which may be one of several
+                    if key.lower() == "rel" and self.rel in value.strip('"').split():
+                        # The link carries the query of the next page, so no parameters are added
+                        return urljoin(response.url, target), {}
+
+        return None
+
+
+class CursorPagination(PaginationStrategy):
+    """
+    Passes the cursor found in each page as a query parameter of the next one.
+
+    Attributes:
+        cursor_param (str): The query parameter the cursor is sent as.
+        cursor_path (str): The dotted path of the next cursor in a page.
+    """
+
+    def __init__(
+        self,
+        cursor_param: str = "cursor",
+        cursor_path: str = "next_cursor",
+        items_path: Optional[str] = "data",
+    ) -> None:
+        """
+        Initialises a new CursorPagination instance.
+
+        Args:
+            cursor_param (str): The query parameter the cursor is sent as. Defaults to "cursor".
+            cursor_path (str): The dotted path of the next cursor in a page. Defaults to "next_cursor".
+            items_path (Optional[str]): The dotted path of the items in a page. Defaults to "data".
+        """
+        super().__init__(items_path=items_path)
+
+        self.cursor_param: str = cursor_param
+        self.cursor_path: str = cursor_path
+
+    def next(
+        self,
+        request: PageRequest,
+        response: Response,
+        items: List[Any],
+    ) -> Optional[PageRequest]:
+        """
+        Returns the request of the page the cursor of the given response points to.
+
+        Args:
+            request (PageRequest): The request of the current page.
+            response (Response): The response of the current page.
+            items (List[Any]): The items of the current page.
+
+        Returns:
+            Optional[PageRequest]: The request of the next page, or None if there is no cursor.
+        """
+        url, params = request
+
+        cursor: Any = _resolve_(response.data, self.cursor_path)
+
+        # Check, if the cursor ends the pagination, or would request the same page again
+        if cursor in (None, "") or cursor == params.get(self.cursor_param):
+            return None
+
+        return url, {**params, self.cursor_param: cursor}
+
+
+class OffsetPagination(PaginationStrategy):
+    """
+    Requests pages by offset and limit, or by page number and page size.
+
+    The requests of the following pages can be computed up front. If the first page tells
+    the total number of items, they are all fetched in parallel. Otherwise the pagination
+    ends with the first page holding fewer than 'limit' items.
+
+    Attributes:
+        limit (int): The number of items per page.
+        offset_param (str): The query parameter of the offset or page number.
+        limit_param (Optional[str]): The query parameter of the limit, or None to not send it.
+        start (int): The offset or page number of the first page.
+        step (int): The difference of the offsets or page numbers of consecutive pages.
+        total_path (Optional[str]): The dotted path of the total number of items in a page.
+        total_header (Optional[str]): The response header holding the total number of items.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        offset_param: str = "offset",
+        limit_param: Optional[str] = "limit",
+        start: int = 0,
+        step: Optional[int] = None,
+        items_path: Optional[str] = "data",
+        total_path: Optional[str] = None,
+        total_header: Optional[str] = None,
+    ) -> None:
+        """
+        Initialises a new OffsetPagination instance.
+
+        For page numbers, use e.g. offset_param="page", limit_param="per_page", start=1 and step=1.
+
+        Args:
+            limit (int): The number of items per page. Defaults to 100.
+            offset_param (str): The query parameter of the offset or page number. Defaults to "offset".
+            limit_param (Optional[str]): The query parameter of the limit, or None to not send it. Defaults to "limit".
+            start (int): The offset or page number of the first page. Defaults to 0.
+            step (Optional[int]): The difference of consecutive offsets or page numbers. Defaults to limit.
+            items_path (Optional[str]): The dotted path of the items in a page. Defaults to "data".
+            total_path (Optional[str]): The dotted path of the total number of items in a page. Defaults to None.
+            total_header (Optional[str]): The response header holding the total number of items, e.g. "X-Total-Count". Defaults to None.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1.")
+
+        super().__init__(items_path=items_path)
+
+        self.limit: int = limit
+        self.offset_param: str = offset_param
+        self.limit_param: Optional[str] = limit_param
+        self.start: int = start
+        self.step: int = limit if step is None else step
+        self.total_path: Optional[str] = total_path
+        self.total_header: Optional[str] = total_header
+
+    def _page_(
+        self,
+        request: PageRequest,
+        page: int,
+    ) -> PageRequest:
+        """
+        Returns the request of the page with the given zero-based index.
+
+        Args:
+            request (PageRequest): Any request of the pagination.
+            page (int): The zero-based index of the page.
+
+        Returns:
+            PageRequest: The request of the page.
+        """
+        url, params = request
+
+        return url, {**params, self.offset_param: self.start + page * self.step}
+
+    def _index_(self, request: PageRequest) -> int:
+        """
+        Returns the zero-based index of the page of the given request.
+
+        Args:
+            request (PageRequest): The request of the page.
+
+        Returns:
+            int: The zero-based index of the page.
+        """
+        return (int(request[1][self.offset_param]) - self.start) // self.step
+
+    def first(
+        self,
+        url: str,
+        params: Dict[str, Any],
+    ) -> PageRequest:
+        """
+        Returns the request of the first page.
+
+        Args:
+            url (str): The URL of the paginated resource.
+            params (Dict[str, Any]): The query parameters of every page.
+
+        Returns:
+            PageRequest: The URL and query parameters of the first page.
+        """
+        params = dict(params)
+
+        if self.limit_param is not None:
+            params[self.limit_param] = self.limit
+
+        return self._page_((url, params), 0)
+
+    def following(
+        self,
+        request: PageRequest,
+        response: Response,
+        items: List[Any],
+    ) -> Optional[Iterator[PageRequest]]:
+        """
+        Returns the requests of the pages after the given one, up to the total if it is known.
+
+        Args:
+            request (PageRequest): The request of the current page.
+            response (Response): The response of the current page.
+            items (List[Any]): The items of the current page.
+
+        Returns:
+            Optional[Iterator[PageRequest]]: The requests of the following pages, endless if the total is unknown.
+        """
+        if self.next(request, response, items) is None:
+            return iter(())
+
+        total: Optional[int] = self.total(response)
+
+        pages: Iterable[int] = itertools.count(self._index_(request) + 1)
+
+        if total is not None:
+            pages = range(self._index_(request) + 1, -(-total // self.limit))
+
+        return (self._page_(request, page) for page in pages)
+
+    def next(
+        self,
+        request: PageRequest,
+        response: Response,
+        items: List[Any],
+    ) -> Optional[PageRequest]:
+        """
+        Returns the request of the page after the given one, unless the given one is short or reaches the total.
+
+        Args:
+            request (PageRequest): The request of the current page.
+            response (Response): The response of the current page.
+            items (List[Any]): The items of the current page.
+
+        Returns:
+            Optional[PageRequest]: The request of the next page, or None if the current page is the last one.
+        """
+        if len(items) < self.limit:
+            return None
+
+        page: int = self._index_(request) + 1
+
+        total: Optional[int] = self.total(response)
+
+        if total is not None and page * self.limit >= total:
+            return None
+
+        return self._page_(request, page)
+
+    def total(self, response: Response) -> Optional[int]:
+        """
+        Returns the total number of items the given response announces.
+
+        Args:
+            response (Response): The response of a page.
+
+        Returns:
+            Optional[int]: The total number of items, or None if it is unknown.
+        """
+        total: Any = None
+
+        if self.total_header is not None:
+            total = response.headers.get(self.total_header)
+
+        if total is None and self.total_path is not None:
+            total = _resolve_(response.data, self.total_path)
+
+        try:
+            return None if total is None else int(total)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,228 @@
+import asyncio
+import threading
+import time
+
+from typing import *
+from urllib.parse import urlsplit
+
+__all__: List[str] = ["RateLimiter", "TokenBucket"]
+
+
+class TokenBucket:
+    """
+    A token bucket allowing 'rate' requests per second with bursts of up to 'burst' requests.
+
+    Callers reserve a token up front and sleep until it becomes available, so concurrent
+    callers are spaced out in the order they arrived without polling.
+
+    Attributes:
+        rate (float): The number of tokens added per second.
+        burst (float): The maximum number of tokens the bucket holds.
+        waits (int): The number of acquisitions that had to wait for a token.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+    ) -> None:
+        """
+        Initialises a new TokenBucket instance.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            burst (Optional[float]): The maximum number of tokens the bucket holds. Defaults to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+
+        self.rate: float = rate
+        self.burst: float = max(1.0, rate) if burst is None else burst
+
+        self.waits: int = 0
+
+        self._tokens_: float = self.burst
+        self._updated_at_: float = time.monotonic()
+        self._lock_: threading.Lock = threading.Lock()
+
+    def _refill_(self) -> None:
+        """
+        Adds the tokens accrued since the last update, up to burst.
+        """
+        now: float = time.monotonic()
+
+        self._tokens_ = min(self.burst, self._tokens_ + (now - self._updated_at_) * self.rate)
+        self._updated_at_ = now
+
+    async def acquire(self) -> None:
+        """
+        Waits until a token is available and takes it.
+        """
+        delay: float = self.reserve()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Withholds tokens for the given number of seconds, e.g. after the origin answered 429.
+
+        Args:
+            seconds (float): The number of seconds no token is handed out.
+        """
+        with self._lock_:
+            self._refill_()
+
+            self._tokens_ = min(self._tokens_, -seconds * self.rate)
+
+    def reserve(self) -> float:
+        """
+        Takes a token, possibly going into debt, and returns how long to wait until it is available.
+
+        Returns:
+            float: The number of seconds to wait before the token may be used.
+        """
+        with self._lock_:
+            self._refill_()
+
+            self._tokens_ -= 1.0
+
+            if self._tokens_ >= 0:
+                return 0.0
+
+            self.waits += 1
+
+            return -self._tokens_ / self.rate
+
+
+class RateLimiter:
+    """
+    Applies token buckets to requests by URL prefix or by host.
+
+    Keys containing "://" are URL prefixes, and the longest matching prefix wins. Other keys
+    are hosts, optionally with a port, matched against the host of the URL. Hosts without a
+    matching key get a bucket of their own built from 'default', if one is given.
+
+    Attributes:
+        default (Optional[Tuple[float, Optional[float]]]): The rate and burst for hosts without a matching key, or None to not limit them.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, Tuple[float, Optional[float]]]] = None,
+        default: Optional[Tuple[float, Optional[float]]] = None,
+    ) -> None:
+        """
+        Initialises a new RateLimiter instance.
+
+        Args:
+            limits (Optional[Mapping[str, Tuple[float, Optional[float]]]]): The rate and burst per URL prefix or host. Defaults to None.
+            default (Optional[Tuple[float, Optional[float]]]): The rate and burst for hosts without a matching key. Defaults to None.
+        """
+        self.default: Optional[Tuple[float, Optional[float]]] = default
+
+        self._hosts_: Dict[str, TokenBucket] = {}
+        self._prefixes_: List[Tuple[str, TokenBucket]] = []
+        self._lock_: threading.Lock = threading.Lock()
+
+        for key, (rate, burst) in (limits or {}).items():
+            self.add(
+                burst=burst,
+                key=key,
+                rate=rate,
+            )
+
+    def add(
+        self,
+        key: str,
+        rate: float,
+        burst: Optional[float] = None,
+    ) -> TokenBucket:
+        """
+        Adds or replaces the token bucket of a URL prefix or host.
+
+        Args:
+            key (str): The URL prefix or host.
+            rate (float): The number of requests per second.
+            burst (Optional[float]): The maximum burst of requests. Defaults to max(1, rate).
+
+        Returns:
+            TokenBucket: The new token bucket.
+        """
+        bucket: TokenBucket = TokenBucket(
+            burst=burst,
+            rate=rate,
+        )
+
+        with self._lock_:
+            if "://" in key:
+                self._prefixes_ = [(prefix, existing) for prefix, existing in self._prefixes_ if prefix != key]
+                self._prefixes_.append((key, bucket))
+
+                # Keep the longest prefixes first, so the most specific one matches
+                self._prefixes_.sort(key=lambda item: len(item[0]), reverse=True)
+            else:
+                self._hosts_[key.lower()] = bucket
+
+        return bucket
+
+    def bucket(self, url: str) -> Optional[TokenBucket]:
+        """
+        Returns the token bucket applying to the given URL.
+
+        Args:
+            url (str): The URL of the request.
+
+        Returns:
+            Optional[TokenBucket]: The matching token bucket, or None if the URL is not limited.
+        """
+        for prefix, bucket in self._prefixes_:
+            if url.startswith(prefix):
+                return bucket
+
+        host: str = urlsplit(url).netloc.lower()
+
+        bucket: Optional[TokenBucket] = self._hosts_.get(host) or self._hosts_.get(host.rsplit(":", 1)[0])
+
+        if bucket is None and self.default is not None:
+            with self._lock_:
+                bucket = self._hosts_.get(host)
+
+                if bucket is None:
+                    rate, burst = self.default
+
+                    bucket = self._hosts_[host] = TokenBucket(
+                        burst=burst,
+                        rate=rate,
+                    )
+
+        return bucket
+
+    async def acquire(self, url: str) -> None:
+        """
+        Waits until a request to the given URL is allowed.
+
+        Args:
+            url (str): The URL of the request.
+        """
+        bucket: Optional[TokenBucket] = self.bucket(url)
+
+        if bucket is not None:
+            await bucket.acquire()
+
+    def throttle(
+        self,
+        url: str,
+        seconds: float,
+    ) -> None:
+        """
+        Pauses the token bucket applying to the given URL, e.g. after the origin answered 429.
+
+        Args:
+            url (str): The URL of the request.
+            seconds (float): The number of seconds no request is allowed.
+        """
+        bucket: Optional[TokenBucket] = self.bucket(url)
+
+        if bucket is not None:
+            bucket.pause(seconds)
@@ -0,0 +1,190 @@
+from typing import *
+
+from codec import JSONCodec
+
+__all__: List[str] = ["Response"]
+
+
+# Marks a body that has not been decoded yet, as None is a valid decoded value
+_UNDECODED: Any = object()
+
+
+class Response:
+    """
+    A fully read HTTP response that decodes its body only when it is accessed.
+
+    The body is decoded based on the content type: JSON media types, including "+json"
+    suffixes, as JSON with the response's codec, "text/*" as text and anything else is
+    returned as bytes. An empty body decodes to None.
+
+    Attributes:
+        status (int): The HTTP status code of the response.
+        headers (Mapping[str, str]): The case-insensitive headers of the response.
+        body (bytes): The raw body of the response.
+        url (str): The URL the response was received from.
+        codec (Optional[JSONCodec]): The codec JSON is decoded with, or None for JSONCodec.default().
+    """
+
+    __slots__ = ("_data_", "body", "codec", "headers", "status", "url")
+
+    def __init__(
+        self,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+        url: str,
+        codec: Optional[JSONCodec] = None,
+    ) -> None:
+        """
+        Initialises a new Response instance.
+
+        Args:
+            status (int): The HTTP status code of the response.
+            headers (Mapping[str, str]): The case-insensitive headers of the response.
+            body (bytes): The raw body of the response.
+            url (str): The URL the response was received from.
+            codec (Optional[JSONCodec]): The codec JSON is decoded with. Defaults to None.
+        """
+        self.status: int = status
+        self.headers: Mapping[str, str] = headers
+        self.body: bytes = body
+        self.url: str = url
+        self.codec: Optional[JSONCodec] = codec
+
+        self._data_: Any = _UNDECODED
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the response.
+
+        Returns:
+            str: The string representation of the response.
+        """
+        return f"<Response [{self.status}] {self.url}>"
+
+    @property
+    def charset(self) -> Optional[str]:
+        """
+        Returns the charset declared in the Content-Type header, if any.
+
+        Returns:
+            Optional[str]: The declared charset, or None.
+        """
+        for parameter in self.headers.get("Content-Type", "").split(";")[1:]:
+            key, _, value = parameter.strip().partition("=")
+
+            if key.lower() == "charset":
+                return value.strip('"') or None
+
+        return None
+
+    @property
+    def content_type(self) -> str:
+        """
+        Returns the media type of the response without its parameters.
+
+        Returns:
+            str: The media type, e.g. "application/json", or an empty string.
+        """
+        return self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+    @property
+    def data(self) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Returns the body decoded based on the content type, decoding it on first access only.
+
+        Returns:
+            Optional[Union[Dict[str, Any], List[Any], str, bytes]]: The decoded body.
+        """
+        if self._data_ is _UNDECODED:
+            self._data_ = self.decode()
+
+        return self._data_
+
+    @property
+    def is_json(self) -> bool:
+        """
+        Returns whether the content type of the response is a JSON media type.
+
+        Returns:
+            bool: True for "application/json" and "+json" media types, False otherwise.
+        """
+        content_type: str = self.content_type
+
+        return content_type == "application/json" or content_type.endswith("+json")
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns whether the status of the response is below 400.
+
+        Returns:
+            bool: True for informational, successful and redirect statuses, False otherwise.
+        """
+        return self.status < 400
+
+    def copy(
+        self,
+        codec: Optional[JSONCodec] = None,
+    ) -> "Response":
+        """
+        Returns a new, undecoded response sharing the body and headers of this one.
+
+        Args:
+            codec (Optional[JSONCodec]): The codec of the copy. Defaults to the codec of this response.
+
+        Returns:
+            Response: The copy of the response.
+        """
+        return Response(
+            body=self.body,
+            codec=codec or self.codec,
+            headers=self.headers,
+            status=self.status,
+            url=self.url,
+        )
+
+    def decode(self) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Decodes the body based on the content type. Every call decodes again, see data for the cached variant.
+
+        Returns:
+            Optional[Union[Dict[str, Any], List[Any], str, bytes]]: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        """
+        if not self.body:
+            return None
+        elif self.is_json:
+            return self.json()
+        elif self.content_type.startswith("text/"):
+            return self.text()
+
+        return self.body
+
+    def json(self) -> Any:
+        """
+        Decodes the body as JSON with the response's codec.
+
+        Returns:
+            Any: The decoded JSON, or None if the body is empty or only whitespace.
+        """
+        if not self.body or self.body.isspace():
+            return None
+
+        codec: JSONCodec = self.codec or JSONCodec.default()
+
+        charset: Optional[str] = self.charset
+
+        # JSON codecs read UTF-8 directly, other charsets have to be decoded first
+        if charset is not None and charset.lower().replace("-", "") != "utf8":
+            return codec.loads(self.text())
+
+        return codec.loads(self.body)
+
+    def text(self) -> str:
+        """
+        Decodes the body as text using its declared charset, falling back to UTF-8.
+
+        Returns:
+            str: The decoded text.
+        """
+        return self.body.decode(self.charset or "utf-8")
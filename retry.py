@@ -0,0 +1,250 @@
+import asyncio
+import random
+import threading
+import time
+
+from typing import *
+
+__all__: List[str] = ["RetryBudget", "RetryPolicy"]
+
+
+class RetryBudget:
+    """
+    Caps retries at a percentage of the requests sent, so retries cannot multiply load during an outage.
+
+    Every request deposits 'ratio' tokens and every retry withdraws a whole token. A small
+    number of retries per second is always allowed, so low-traffic clients can still retry.
+    The budget starts with one second of that reserve rather than full, so a client that
+    starts during an outage cannot send a burst of retries before it has sent any requests.
+
+    Attributes:
+        ratio (float): The fraction of requests that may be retried, e.g. 0.2 for 20%.
+        min_per_second (float): The number of retries per second allowed regardless of traffic.
+        max_tokens (float): The maximum number of tokens that can be saved up.
+        exhausted (int): The number of retries refused because the budget was exhausted.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        max_tokens: float = 100.0,
+    ) -> None:
+        """
+        Initialises a new RetryBudget instance.
+
+        Args:
+            ratio (float): The fraction of requests that may be retried. Defaults to 0.2.
+            min_per_second (float): The number of retries per second allowed regardless of traffic. Defaults to 1.0.
+            max_tokens (float): The maximum number of tokens that can be saved up. Defaults to 100.0.
+        """
+        self.ratio: float = ratio
+        self.min_per_second: float = min_per_second
+        self.max_tokens: float = max_tokens
+
+        self.exhausted: int = 0
+
+        self._tokens_: float = min(max_tokens, min_per_second)
+        self._updated_at_: float = time.monotonic()
+        self._lock_: threading.Lock = threading.Lock()
+
+    def _refill_(self, deposit: float) -> None:
+        """
+        Adds the given deposit plus the tokens accrued from min_per_second since the last update.
+
+        Args:
+            deposit (float): The number of tokens to add.
+        """
+        now: float = time.monotonic()
+
+        self._tokens_ = min(
+            self.max_tokens,
+            self._tokens_ + deposit + (now - self._updated_at_) * self.min_per_second,
+        )
+
+        self._updated_at_ = now
+
+    def deposit(self) -> None:
+        """
+        Records a request, adding 'ratio' tokens to the budget.
+        """
+        with self._lock_:
+            self._refill_(self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """
+        Withdraws a token for a retry, if the budget allows it.
+
+        Returns:
+            bool: True if the retry may be sent, False if the budget is exhausted.
+        """
+        with self._lock_:
+            self._refill_(0.0)
+
+            if self._tokens_ < 1.0:
+                self.exhausted += 1
+
+                return False
+
+            self._tokens_ -= 1.0
+
+            return True
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests are retried and how long to wait before each retry.
+
+    Delays grow exponentially with full jitter, i.e. a random delay between zero and the
+    exponential bound, which spreads out the retries of many clients. A Retry-After header
+    sent with the response takes precedence over the computed delay.
+
+    Attributes:
+        max_attempts (int): The maximum number of attempts per request, including the first one.
+        statuses (FrozenSet[int]): The response statuses that are retried.
+        exceptions (Tuple[Type[BaseException], ...]): The exceptions that are retried.
+        methods (FrozenSet[str]): The idempotent HTTP methods that are retried.
+        retry_non_idempotent (bool): Whether requests with other methods, e.g. POST, are retried as well.
+        backoff_base (float): The exponential bound of the first retry in seconds.
+        backoff_max (float): The maximum exponential bound in seconds.
+        max_retry_after (float): The longest Retry-After in seconds that is waited for; longer ones are not retried.
+        budget (Optional[RetryBudget]): The budget capping retries across all requests, or None for no cap.
+        retries (int): The number of retries that were scheduled.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        statuses: Iterable[int] = (408, 429, 500, 502, 503, 504),
+        exceptions: Optional[Tuple[Type[BaseException], ...]] = None,
+        methods: Iterable[str] = ("DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"),
+        retry_non_idempotent: bool = False,
+        backoff_base: float = 0.1,
+        backoff_max: float = 10.0,
+        max_retry_after: float = 60.0,
+        budget: Optional[RetryBudget] = None,
+    ) -> None:
+        """
+        Initialises a new RetryPolicy instance.
+
+        Args:
+            max_attempts (int): The maximum number of attempts per request. Defaults to 3.
+            statuses (Iterable[int]): The response statuses that are retried. Defaults to 408, 429, 500, 502, 503 and 504.
+            exceptions (Optional[Tuple[Type[BaseException], ...]]): The exceptions that are retried. Defaults to None, i.e. connection errors and timeouts.
+            methods (Iterable[str]): The idempotent HTTP methods that are retried. Defaults to DELETE, GET, HEAD, OPTIONS, PUT and TRACE.
+            retry_non_idempotent (bool): Whether requests with other methods are retried as well. Defaults to False.
+            backoff_base (float): The exponential bound of the first retry in seconds. Defaults to 0.1.
+            backoff_max (float): The maximum exponential bound in seconds. Defaults to 10.0.
+            max_retry_after (float): The longest Retry-After in seconds that is waited for. Defaults to 60.0.
+            budget (Optional[RetryBudget]): The budget capping retries across all requests. Defaults to None.
+        """
+        self.max_attempts: int = max_attempts
+        self.statuses: FrozenSet[int] = frozenset(statuses)
+        if exceptions is None:
+            # Imported here, so importing the module does not import aiohttp
+            import aiohttp
+
+            exceptions = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+        self.exceptions: Tuple[Type[BaseException], ...] = exceptions
+        self.methods: FrozenSet[str] = frozenset(method.upper() for method in methods)
+        self.retry_non_idempotent: bool = retry_non_idempotent
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self.max_retry_after: float = max_retry_after
+        self.budget: Optional[RetryBudget] = budget
+
+        self.retries: int = 0
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns a fully jittered exponential delay for the retry following the given attempt.
+
+        Args:
+            attempt (int): The number of attempts made so far, starting at 1.
+
+        Returns:
+            float: A random delay between zero and the exponential bound, in seconds.
+        """
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parses a Retry-After header given either in seconds or as an HTTP date.
+
+        Args:
+            value (Optional[str]): The value of the Retry-After header.
+
+        Returns:
+            Optional[float]: The number of seconds to wait, or None if the header is missing or invalid.
+        """
+        if not value:
+            return None
+
+        value = value.strip()
+
+        if value.isdigit():
+            return float(value)
+
+        # Imported here, as the email package is slow to import and rarely needed
+        from email.utils import parsedate_to_datetime
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        status: Optional[int] = None,
+        exception: Optional[BaseException] = None,
+        retry_after: Optional[str] = None,
+    ) -> Optional[float]:
+        """
+        Returns how long to wait before retrying a failed attempt, or None if it must not be retried.
+
+        A retry is only granted if the method, the status or exception, the number of attempts
+        and the retry budget all allow it.
+
+        Args:
+            method (str): The HTTP method of the request.
+            attempt (int): The number of attempts made so far, starting at 1.
+            status (Optional[int]): The status of the response, if one was received. Defaults to None.
+            exception (Optional[BaseException]): The exception raised by the attempt, if any. Defaults to None.
+            retry_after (Optional[str]): The Retry-After header of the response, if any. Defaults to None.
+
+        Returns:
+            Optional[float]: The delay in seconds, or None.
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        if not self.retry_non_idempotent and method.upper() not in self.methods:
+            return None
+
+        if exception is not None:
+            if not isinstance(exception, self.exceptions):
+                return None
+        elif status not in self.statuses:
+            return None
+
+        delay: float = self.backoff(attempt)
+
+        requested: Optional[float] = self.parse_retry_after(retry_after)
+
+        if requested is not None:
+            # Check, if the origin asks to wait longer than we are willing to
+            if requested > self.max_retry_after:
+                return None
+
+            delay = max(delay, requested)
+
+        if self.budget is not None and not self.budget.try_withdraw():
+            return None
+
+        self.retries += 1
+
+        return delay
@@ -0,0 +1,149 @@
+import asyncio
+import weakref
+
+from typing import *
+
+from content_coding import accept_encoding, aiohttp_encodings
+
+if TYPE_CHECKING:
+    import aiohttp
+
+__all__: List[str] = ["SessionPool"]
+
+
+class SessionPool:
+    """
+    A long-lived pool of aiohttp sessions sharing one connector configuration.
+
+    aiohttp sessions and connectors are bound to the event loop they were created in,
+    so the pool keeps one session per event loop. Every request issued on the same loop
+    reuses the same connector, and with it warm keep-alive connections and the DNS cache.
+    Sessions ask for every content coding aiohttp can decode, preferring the strongest, and
+    decode compressed responses incrementally while they are read. aiohttp is only imported
+    once the first session is created, so a pool costs nothing until it is used.
+
+    Attributes:
+        limit (int): The total number of simultaneous connections per connector.
+        limit_per_host (int): The number of simultaneous connections to a single host.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        ttl_dns_cache (Optional[int]): Seconds resolved DNS entries are cached for.
+        timeout (Optional[float]): The total timeout of a request in seconds.
+        trace_configs (List[aiohttp.TraceConfig]): The trace configs every session is created with, built on first access if given as a function.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        ttl_dns_cache: Optional[int] = 300,
+        timeout: Optional[float] = None,
+        trace_configs: Optional[Union[Sequence["aiohttp.TraceConfig"], Callable[[], Sequence["aiohttp.TraceConfig"]]]] = None,
+    ) -> None:
+        """
+        Initialises a new SessionPool instance.
+
+        Args:
+            limit (int): The total number of simultaneous connections. Defaults to 100.
+            limit_per_host (int): The number of simultaneous connections to a single host. Defaults to 10.
+            keepalive_timeout (float): Seconds an idle connection is kept open. Defaults to 30.0.
+            ttl_dns_cache (Optional[int]): Seconds DNS entries are cached for. Defaults to 300.
+            timeout (Optional[float]): The total timeout of a request in seconds. Defaults to None.
+            trace_configs (Optional[Union[Sequence[aiohttp.TraceConfig], Callable[[], Sequence[aiohttp.TraceConfig]]]]): The trace configs every session is created with, or a function returning them once they are first needed. Defaults to None.
+        """
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.keepalive_timeout: float = keepalive_timeout
+        self.ttl_dns_cache: Optional[int] = ttl_dns_cache
+        self.timeout: Optional[float] = timeout
+
+        # The trace configs, or the function building them until they are first needed
+        self._trace_configs_: Union[List["aiohttp.TraceConfig"], Callable[[], Sequence["aiohttp.TraceConfig"]]] = (
+            trace_configs if callable(trace_configs) else list(trace_configs or ())
+        )
+
+        self._sessions_: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def __aenter__(self) -> "SessionPool":
+        """
+        Enters the asynchronous context of the pool.
+
+        Returns:
+            SessionPool: The pool itself.
+        """
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """
+        Exits the asynchronous context of the pool and closes the session of the running loop.
+        """
+        await self.close()
+
+    @property
+    def trace_configs(self) -> List["aiohttp.TraceConfig"]:
+        """
+        Returns the trace configs every session is created with, building them on first access.
+
+        Returns:
+            List[aiohttp.TraceConfig]: The trace configs.
+        """
+        if callable(self._trace_configs_):
+            self._trace_configs_ = list(self._trace_configs_())
+
+        return self._trace_configs_
+
+    def _create_session_(self) -> "aiohttp.ClientSession":
+        """
+        Creates a new session and connector from the pool's configuration.
+
+        Returns:
+            aiohttp.ClientSession: The newly created session.
+        """
+        import aiohttp
+
+        connector: aiohttp.TCPConnector = aiohttp.TCPConnector(
+            keepalive_timeout=self.keepalive_timeout,
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+
+        return aiohttp.ClientSession(
+            auto_decompress=True,
+            connector=connector,
+            headers={"Accept-Encoding": accept_encoding(aiohttp_encodings())},
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=self.trace_configs or None,
+        )
+
+    async def close(self) -> None:
+        """
+        Closes the session bound to the running event loop, if there is one.
+        """
+        session: Optional[aiohttp.ClientSession] = self._sessions_.pop(
+            asyncio.get_running_loop(),
+            None,
+        )
+
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def get_session(self) -> "aiohttp.ClientSession":
+        """
+        Returns the session bound to the running event loop, creating it on first use.
+
+        Returns:
+            aiohttp.ClientSession: The pooled session of the running event loop.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        session: Optional[aiohttp.ClientSession] = self._sessions_.get(loop)
+
+        if session is None or session.closed:
+            session = self._create_session_()
+
+            self._sessions_[loop] = session
+
+        return session
@@ -0,0 +1,108 @@
+import asyncio
+
+from typing import *
+
+__all__: List[str] = ["SingleFlight"]
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls, so only the first one does the work.
+
+    While a call for a key is in flight, later calls for the same key wait for the same
+    task and share its result, or its exception. The work runs in a task of its own, so a
+    cancelled caller never cancels it for the callers still waiting. Calls are coalesced per
+    event loop, as tasks cannot be awaited across loops.
+
+    Attributes:
+        methods (FrozenSet[str]): The HTTP methods whose requests may be coalesced.
+        executed (int): The number of calls that did the work.
+        coalesced (int): The number of calls that shared the result of a call in flight.
+    """
+
+    def __init__(
+        self,
+        methods: Iterable[str] = ("GET", "HEAD", "OPTIONS"),
+    ) -> None:
+        """
+        Initialises a new SingleFlight instance.
+
+        Args:
+            methods (Iterable[str]): The HTTP methods whose requests may be coalesced. Defaults to GET, HEAD and OPTIONS.
+        """
+        self.methods: FrozenSet[str] = frozenset(method.upper() for method in methods)
+
+        self.executed: int = 0
+        self.coalesced: int = 0
+
+        self._flights_: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Returns the number of calls currently in flight.
+
+        Returns:
+            int: The number of distinct keys being worked on.
+        """
+        return len(self._flights_)
+
+    async def do(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Returns the result of the call in flight for the given key, or starts it using the factory.
+
+        Args:
+            key (Hashable): The key identifying identical calls.
+            factory (Callable[[], Awaitable[T]]): Creates the awaitable doing the work.
+
+        Returns:
+            T: The shared result of the call.
+        """
+        flight_key: Tuple[asyncio.AbstractEventLoop, Hashable] = (asyncio.get_running_loop(), key)
+
+        task: Optional[asyncio.Task] = self._flights_.get(flight_key)
+
+        if task is None:
+            self.executed += 1
+
+            task = asyncio.ensure_future(factory())
+
+            self._flights_[flight_key] = task
+
+            def __done__(task: asyncio.Task) -> None:
+                """
+                Removes the finished task and marks its exception as retrieved.
+
+                Args:
+                    task (asyncio.Task): The finished task.
+                """
+                self._flights_.pop(flight_key, None)
+
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(__done__)
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counters of the coalesced calls.
+
+        Returns:
+            Dict[str, int]: The executed, coalesced and in-flight calls.
+        """
+        return {
+            "coalesced": self.coalesced,
+            "executed": self.executed,
+            "in_flight": self.in_flight,
+        }
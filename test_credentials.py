@@ -0,0 +1,47 @@
+import asyncio
+
+from typing import *
+
+from credentials import BearerTokenProvider
+
+
+def _run_(expires_in: Optional[float], seconds: float, **kwargs) -> BearerTokenProvider:
+    """
+    Requests a token and lets the background refreshes run for the given time.
+
+    Args:
+        expires_in (Optional[float]): The lifetime of every fetched token in seconds.
+        seconds (float): The seconds to let the refreshes run.
+        **kwargs: Additional keyword arguments for the BearerTokenProvider.
+
+    Returns:
+        BearerTokenProvider: The provider, closed.
+    """
+    async def __fetch__() -> Tuple[str, Optional[float]]:
+        return f"token-{provider.refreshes}", expires_in
+
+    provider: BearerTokenProvider = BearerTokenProvider(fetch=__fetch__, **kwargs)
+
+    async def __main__() -> None:
+        assert await provider.authorization() == "Bearer token-1"
+
+        await asyncio.sleep(seconds)
+
+        provider.close()
+
+    asyncio.run(__main__())
+
+    return provider
+
+
+def test_token_shorter_than_the_margin_is_not_refreshed_back_to_back() -> None:
+    # A lifetime below refresh_margin used to schedule every next refresh right away
+    assert _run_(expires_in=30.0, seconds=0.5).refreshes == 1
+
+
+def test_expired_token_is_refreshed_at_most_every_retry_interval() -> None:
+    assert _run_(expires_in=0.0, seconds=0.5, retry_interval=0.2).refreshes <= 4
+
+
+def test_token_is_refreshed_halfway_through_a_short_lifetime() -> None:
+    assert _run_(expires_in=0.4, seconds=0.3, retry_interval=0.0).refreshes == 2
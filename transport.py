@@ -0,0 +1,876 @@
+import asyncio
+import inspect
+import json
+import time
+import weakref
+
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from multidict import CIMultiDict, CIMultiDictProxy
+from typing import *
+from urllib.parse import urlencode, urlsplit
+
+from content_coding import accept_encoding, aiohttp_encodings, httpx_encodings
+from metrics import RequestTiming
+from response import Response
+from session_pool import SessionPool
+
+if TYPE_CHECKING:
+    import aiohttp
+
+__all__: List[str] = [
+    "AiohttpTransport",
+    "HTTP2Transport",
+    "MemoryRequest",
+    "MemoryTransport",
+    "StreamedResponse",
+    "Transport",
+]
+
+
+class StreamedResponse:
+    """
+    A response whose body is read in chunks while it is received.
+
+    Attributes:
+        status (int): The HTTP status code of the response.
+        headers (Mapping[str, str]): The case-insensitive headers of the response.
+        url (str): The URL the response was received from.
+        chunks (AsyncIterator[bytes]): The chunks of the body.
+    """
+
+    __slots__ = ("chunks", "headers", "status", "url")
+
+    def __init__(
+        self,
+        status: int,
+        headers: Mapping[str, str],
+        url: str,
+        chunks: AsyncIterator[bytes],
+    ) -> None:
+        """
+        Initialises a new StreamedResponse instance.
+
+        Args:
+            status (int): The HTTP status code of the response.
+            headers (Mapping[str, str]): The case-insensitive headers of the response.
+            url (str): The URL the response was received from.
+            chunks (AsyncIterator[bytes]): The chunks of the body.
+        """
+        self.status: int = status
+        self.headers: Mapping[str, str] = headers
+        self.url: str = url
+        self.chunks: AsyncIterator[bytes] = chunks
+
+
+def _status_error_(
+    method: str,
+    url: str,
+    status: int,
+    headers: Mapping[str, str],
+    reason: str = "",
+) -> "aiohttp.ClientResponseError":
+    """
+    Returns the error raised for an error status by transports other than aiohttp, so callers handle every transport alike.
+
+    Args:
+        method (str): The HTTP method of the request.
+        url (str): The URL of the request.
+        status (int): The HTTP status code of the response.
+        headers (Mapping[str, str]): The headers of the response.
+        reason (str): The reason phrase of the response. Defaults to "".
+
+    Returns:
+        aiohttp.ClientResponseError: The error describing the response.
+    """
+    import aiohttp
+
+    from yarl import URL
+
+    return aiohttp.ClientResponseError(
+        aiohttp.RequestInfo(URL(url), method, CIMultiDictProxy(CIMultiDict()), URL(url)),
+        (),
+        headers=CIMultiDictProxy(CIMultiDict(headers)),
+        message=reason,
+        status=status,
+    )
+
+
+class Transport(ABC):
+    """
+    Sends single HTTP requests for WebService, which adds caching, retries and limits on top.
+
+    Requests take the keyword arguments of aiohttp.ClientSession.request. Transports built
+    on other clients translate the common ones, i.e. headers, params, data, allow_redirects
+    and timeout, and raise aiohttp exceptions, so the retry policy and the circuit breaker
+    treat every transport alike.
+    """
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """
+        Returns the content codings of responses the transport decodes, and asks for in Accept-Encoding.
+
+        Returns:
+            Tuple[str, ...]: The codings, best compression first, or () if responses are passed on as they are.
+        """
+        return ()
+
+    async def close(self) -> None:
+        """
+        Releases the connections of the transport bound to the running event loop.
+        """
+
+    @abstractmethod
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> Response:
+        """
+        Sends a request and reads its body.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            timing (Optional[RequestTiming]): The timing to fill in, if metrics are collected. Defaults to None.
+            **kwargs: Additional keyword arguments for the request.
+
+        Returns:
+            Response: The fully read response, without a codec.
+        """
+
+    @abstractmethod
+    def stream(
+        self,
+        method: str,
+        url: str,
+        chunk_size: int = 65536,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> AsyncContextManager[StreamedResponse]:
+        """
+        Sends a request and returns a context in which its body is read in chunks.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            chunk_size (int): The maximum number of bytes per chunk. Defaults to 65536.
+            timing (Optional[RequestTiming]): The timing to fill in, if metrics are collected. Defaults to None.
+            **kwargs: Additional keyword arguments for the request.
+
+        Returns:
+            AsyncContextManager[StreamedResponse]: The context yielding the response.
+
+        Raises:
+            aiohttp.ClientResponseError: If the response has an error status.
+        """
+
+
+class AiohttpTransport(Transport):
+    """
+    Sends requests over HTTP/1.1 with the pooled aiohttp sessions of a SessionPool.
+
+    Attributes:
+        pool (SessionPool): The pool providing the session of the running event loop.
+    """
+
+    def __init__(self, pool: SessionPool) -> None:
+        """
+        Initialises a new AiohttpTransport instance.
+
+        Args:
+            pool (SessionPool): The pool providing the session of the running event loop.
+        """
+        self.pool: SessionPool = pool
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """
+        Returns the content codings aiohttp decodes, i.e. gzip and deflate, plus brotli and zstd if installed.
+
+        Returns:
+            Tuple[str, ...]: The codings, best compression first.
+        """
+        return aiohttp_encodings()
+
+    async def close(self) -> None:
+        """
+        Closes the pooled session bound to the running event loop.
+        """
+        await self.pool.close()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> Response:
+        """
+        Sends a request through the pooled session of the running event loop and reads its body.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            timing (Optional[RequestTiming]): The timing the trace hooks of the session fill in. Defaults to None.
+            **kwargs: Additional keyword arguments for aiohttp.ClientSession.request.
+
+        Returns:
+            Response: The fully read response, without a codec.
+        """
+        session: aiohttp.ClientSession = await self.pool.get_session()
+
+        async with session.request(
+            method=method,
+            trace_request_ctx=timing,
+            url=url,
+            **kwargs,
+        ) as response:
+            body: bytes = await response.read()
+
+        return Response(
+            body=body,
+            headers=response.headers,
+            status=response.status,
+            url=str(response.url),
+        )
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        chunk_size: int = 65536,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> AsyncIterator[StreamedResponse]:
+        """
+        Sends a request through the pooled session of the running event loop and yields its body in chunks.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            chunk_size (int): The maximum number of bytes per chunk. Defaults to 65536.
+            timing (Optional[RequestTiming]): The timing the trace hooks of the session fill in. Defaults to None.
+            **kwargs: Additional keyword arguments for aiohttp.ClientSession.request.
+
+        Returns:
+            AsyncIterator[StreamedResponse]: The context yielding the response.
+        """
+        session: aiohttp.ClientSession = await self.pool.get_session()
+
+        async with session.request(
+            method=method,
+            trace_request_ctx=timing,
+            url=url,
+            **kwargs,
+        ) as response:
+            response.raise_for_status()
+
+            yield StreamedResponse(
+                chunks=response.content.iter_chunked(chunk_size),
+                headers=response.headers,
+                status=response.status,
+                url=str(response.url),
+            )
+
+
+async def _read_file_(
+    file: IO[bytes],
+    chunk_size: int = 65536,
+) -> AsyncIterator[bytes]:
+    """
+    Reads an open binary file in chunks on the default executor.
+
+    Args:
+        file (IO[bytes]): The file to read.
+        chunk_size (int): The number of bytes per chunk. Defaults to 65536.
+
+    Returns:
+        AsyncIterator[bytes]: The chunks of the file.
+    """
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+    while True:
+        chunk: bytes = await loop.run_in_executor(None, file.read, chunk_size)
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+class HTTP2Transport(Transport):
+    """
+    Sends requests over HTTP/2 with httpx, multiplexing concurrent requests as streams over a few connections.
+
+    Hosts that do not negotiate HTTP/2 during the TLS handshake are spoken to over HTTP/1.1,
+    and plain-text URLs always use HTTP/1.1 unless http2_prior_knowledge is set. httpx and
+    h2 are optional dependencies, imported when the first request is sent; install them with
+    'pip install httpx[http2]'. Like aiohttp sessions, httpx clients are bound to the event
+    loop they are used in, so the transport keeps one client per loop.
+
+    Attributes:
+        max_connections (int): The total number of simultaneous connections per client.
+        keepalive_expiry (float): Seconds an idle connection is kept open for reuse.
+        timeout (Optional[float]): The total timeout of a request in seconds.
+        verify (bool): Whether to verify the TLS certificates of the hosts.
+        http2_prior_knowledge (bool): Whether to speak HTTP/2 to plain-text URLs without negotiating it first.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: Optional[float] = None,
+        verify: bool = True,
+        http2_prior_knowledge: bool = False,
+    ) -> None:
+        """
+        Initialises a new HTTP2Transport instance.
+
+        Args:
+            max_connections (int): The total number of simultaneous connections per client. Defaults to 10.
+            keepalive_expiry (float): Seconds an idle connection is kept open. Defaults to 30.0.
+            timeout (Optional[float]): The total timeout of a request in seconds. Defaults to None.
+            verify (bool): Whether to verify the TLS certificates of the hosts. Defaults to True.
+            http2_prior_knowledge (bool): Whether to speak HTTP/2 to plain-text URLs without negotiating it. Defaults to False.
+        """
+        self.max_connections: int = max_connections
+        self.keepalive_expiry: float = keepalive_expiry
+        self.timeout: Optional[float] = timeout
+        self.verify: bool = verify
+        self.http2_prior_knowledge: bool = http2_prior_knowledge
+
+        self._clients_: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """
+        Returns the content codings httpx decodes, i.e. gzip and deflate, plus brotli and zstd if installed.
+
+        Returns:
+            Tuple[str, ...]: The codings, best compression first.
+        """
+        return httpx_encodings()
+
+    @staticmethod
+    def _import_() -> Any:
+        """
+        Imports httpx, which is only needed once the transport is used.
+
+        Returns:
+            Any: The httpx module.
+
+        Raises:
+            ImportError: If httpx or h2 is not installed.
+        """
+        try:
+            import h2  # noqa: F401
+            import httpx
+        except ImportError as e:
+            raise ImportError("HTTP2Transport requires httpx and h2, install them with 'pip install httpx[http2]'.") from e
+
+        return httpx
+
+    def _client_(self) -> Any:
+        """
+        Returns the client bound to the running event loop, creating it on first use.
+
+        Returns:
+            httpx.AsyncClient: The client of the running event loop.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        client: Any = self._clients_.get(loop)
+
+        if client is None or client.is_closed:
+            httpx: Any = self._import_()
+
+            client = httpx.AsyncClient(
+                headers={"Accept-Encoding": accept_encoding(self.encodings)},
+                http1=not self.http2_prior_knowledge,
+                http2=True,
+                limits=httpx.Limits(
+                    keepalive_expiry=self.keepalive_expiry,
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.timeout,
+                verify=self.verify,
+            )
+
+            self._clients_[loop] = client
+
+        return client
+
+    def _build_(
+        self,
+        method: str,
+        url: str,
+        timing: Optional[RequestTiming],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[Any, Any, bool]:
+        """
+        Translates the aiohttp keyword arguments of a request into an httpx request.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+            timing (Optional[RequestTiming]): The timing of the request, whose bytes_out is filled in.
+            kwargs (Dict[str, Any]): The aiohttp keyword arguments of the request.
+
+        Returns:
+            Tuple[httpx.AsyncClient, httpx.Request, bool]: The client, the request and whether to follow redirects.
+
+        Raises:
+            TypeError: If an argument has no httpx equivalent.
+        """
+        from upload import MemoryViewPayload
+
+        client: Any = self._client_()
+
+        options: Dict[str, Any] = {}
+
+        headers: Any = kwargs.pop("headers", None)
+
+        if headers:
+            # Pass pairs, as headers may be the items of a mapping layered with credentials
+            options["headers"] = list(headers.items() if isinstance(headers, Mapping) else headers)
+
+        params: Any = kwargs.pop("params", None)
+
+        if params:
+            options["params"] = params
+
+        data: Any = kwargs.pop("data", None)
+
+        if isinstance(data, (bytes, bytearray, str)):
+            options["content"] = data
+
+            if timing is not None:
+                timing.bytes_out = len(data)
+        elif isinstance(data, dict):
+            options["data"] = data
+        elif isinstance(data, MemoryViewPayload):
+            # Stream the buffer in slices with its known length, instead of copying it into one bytes object
+            options["content"] = data.chunks()
+            options.setdefault("headers", []).append(("Content-Length", str(data.view.nbytes)))
+
+            if timing is not None:
+                timing.bytes_out = data.view.nbytes
+        elif hasattr(data, "read"):
+            options["content"] = _read_file_(data)
+        elif data is not None:
+            options["content"] = data
+
+        follow: bool = kwargs.pop("allow_redirects", True)
+
+        timeout: Any = kwargs.pop("timeout", None)
+
+        if timeout is not None:
+            options["timeout"] = getattr(timeout, "total", timeout)
+
+        if kwargs:
+            raise TypeError(f"HTTP2Transport does not support the arguments: {', '.join(sorted(kwargs))}")
+
+        return client, client.build_request(method, url, **options), follow
+
+    @contextmanager
+    def _translate_(self) -> Iterator[None]:
+        """
+        Returns a context raising the aiohttp exceptions of the httpx exceptions raised in it, while sending or reading a body.
+
+        Returns:
+            Iterator[None]: The context.
+        """
+        import aiohttp
+
+        httpx: Any = self._import_()
+
+        try:
+            yield
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError(str(e)) from e
+        except (httpx.ConnectError, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            raise aiohttp.ClientConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise aiohttp.ClientError(str(e)) from e
+
+    async def _send_(
+        self,
+        method: str,
+        url: str,
+        timing: Optional[RequestTiming],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """
+        Sends a request and returns its response with the body still unread.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+            timing (Optional[RequestTiming]): The timing of the request, whose headers_received is filled in.
+            kwargs (Dict[str, Any]): The aiohttp keyword arguments of the request.
+
+        Returns:
+            httpx.Response: The response with the body unread.
+        """
+        client, request, follow = self._build_(method, url, timing, kwargs)
+
+        with self._translate_():
+            response: Any = await client.send(request, follow_redirects=follow, stream=True)
+
+        if timing is not None:
+            timing.headers_received = time.perf_counter_ns()
+
+        return response
+
+    async def close(self) -> None:
+        """
+        Closes the client bound to the running event loop.
+        """
+        client: Any = self._clients_.pop(asyncio.get_running_loop(), None)
+
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> Response:
+        """
+        Sends a request through the client of the running event loop and reads its body.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            timing (Optional[RequestTiming]): The timing to fill in, if metrics are collected. Defaults to None.
+            **kwargs: The aiohttp keyword arguments of the request.
+
+        Returns:
+            Response: The fully read response, without a codec.
+        """
+        response: Any = await self._send_(method, url, timing, kwargs)
+
+        try:
+            with self._translate_():
+                body: bytes = await response.aread()
+        finally:
+            await response.aclose()
+
+        return Response(
+            body=body,
+            headers=CIMultiDictProxy(CIMultiDict(response.headers.multi_items())),
+            status=response.status_code,
+            url=str(response.url),
+        )
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        chunk_size: int = 65536,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> AsyncIterator[StreamedResponse]:
+        """
+        Sends a request through the client of the running event loop and yields its body in chunks.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            chunk_size (int): The maximum number of bytes per chunk. Defaults to 65536.
+            timing (Optional[RequestTiming]): The timing to fill in, if metrics are collected. Defaults to None.
+            **kwargs: The aiohttp keyword arguments of the request.
+
+        Returns:
+            AsyncIterator[StreamedResponse]: The context yielding the response.
+        """
+        response: Any = await self._send_(method, url, timing, kwargs)
+
+        async def __chunks__() -> AsyncIterator[bytes]:
+            """
+            Yields the chunks of the body, raising aiohttp exceptions for failed reads like the request does.
+            """
+            with self._translate_():
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+
+        try:
+            headers: CIMultiDictProxy = CIMultiDictProxy(CIMultiDict(response.headers.multi_items()))
+
+            if response.status_code >= 400:
+                raise _status_error_(method, url, response.status_code, headers, response.reason_phrase)
+
+            yield StreamedResponse(
+                chunks=__chunks__(),
+                headers=headers,
+                status=response.status_code,
+                url=str(response.url),
+            )
+        finally:
+            await response.aclose()
+
+
+class MemoryRequest:
+    """
+    A request received by a MemoryTransport.
+
+    Attributes:
+        method (str): The HTTP method of the request.
+        url (str): The URL of the request, including the query string built from params.
+        headers (CIMultiDictProxy): The case-insensitive headers of the request.
+        body (bytes): The body of the request.
+    """
+
+    __slots__ = ("body", "headers", "method", "url")
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        headers: CIMultiDictProxy,
+        body: bytes,
+    ) -> None:
+        """
+        Initialises a new MemoryRequest instance.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+            headers (CIMultiDictProxy): The case-insensitive headers of the request.
+            body (bytes): The body of the request.
+        """
+        self.method: str = method
+        self.url: str = url
+        self.headers: CIMultiDictProxy = headers
+        self.body: bytes = body
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the request.
+
+        Returns:
+            str: The string representation of the request.
+        """
+        return f"<MemoryRequest {self.method} {self.url}>"
+
+
+# Answers a request received by a MemoryTransport, synchronously or as a coroutine
+MemoryHandler = Callable[[MemoryRequest], Union[Response, Awaitable[Response]]]
+
+
+class MemoryTransport(Transport):
+    """
+    Answers requests in memory, without sockets, for fast and deterministic offline tests.
+
+    Responses are looked up by method and URL without the query string, then by method and
+    path, and otherwise produced by the handler, or a 404 if there is none. Every request is
+    kept in 'requests' for assertions.
+
+    Attributes:
+        handler (Optional[MemoryHandler]): Answers the requests no route matches.
+        requests (List[MemoryRequest]): The requests received, in order.
+    """
+
+    def __init__(self, handler: Optional[MemoryHandler] = None) -> None:
+        """
+        Initialises a new MemoryTransport instance.
+
+        Args:
+            handler (Optional[MemoryHandler]): Answers the requests no route matches. Defaults to None.
+        """
+        self.handler: Optional[MemoryHandler] = handler
+        self.requests: List[MemoryRequest] = []
+
+        self._routes_: Dict[Tuple[str, str], Tuple[int, Dict[str, str], bytes]] = {}
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        status: int = 200,
+        body: Union[bytes, str, None] = None,
+        json_body: Any = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        Registers the response to requests with the given method to the given URL or path.
+
+        Args:
+            method (str): The HTTP method to answer.
+            url (str): The URL without a query string, or the path, e.g. "/users/1".
+            status (int): The status of the response. Defaults to 200.
+            body (Union[bytes, str, None]): The body of the response. Defaults to None, i.e. empty.
+            json_body (Any): An object to send as a JSON body instead. Defaults to None.
+            headers (Optional[Mapping[str, str]]): The headers of the response. Defaults to None.
+        """
+        response_headers: Dict[str, str] = dict(headers or {})
+
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+
+            response_headers.setdefault("Content-Type", "application/json")
+        elif isinstance(body, str):
+            body = body.encode()
+
+            response_headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+
+        self._routes_[(method.upper(), url)] = (status, response_headers, body or b"")
+
+    async def _answer_(
+        self,
+        method: str,
+        url: str,
+        timing: Optional[RequestTiming],
+        kwargs: Dict[str, Any],
+    ) -> Response:
+        """
+        Records a request and produces its response.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+            timing (Optional[RequestTiming]): The timing of the request.
+            kwargs (Dict[str, Any]): The aiohttp keyword arguments of the request.
+
+        Returns:
+            Response: The response, without a codec.
+        """
+        from upload import MemoryViewPayload
+
+        headers: Any = kwargs.get("headers") or ()
+
+        params: Any = kwargs.get("params")
+
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params, doseq=True)}"
+
+        data: Any = kwargs.get("data")
+
+        if isinstance(data, str):
+            body: bytes = data.encode()
+        elif isinstance(data, dict):
+            body = urlencode(data, doseq=True).encode()
+        elif isinstance(data, MemoryViewPayload):
+            # Handlers are given the recorded body as bytes
+            body = data.view.tobytes()
+        elif hasattr(data, "read"):
+            body = data.read()
+        elif hasattr(data, "__aiter__"):
+            body = b"".join([chunk async for chunk in data])
+        else:
+            body = bytes(data or b"")
+
+        request: MemoryRequest = MemoryRequest(
+            body=body,
+            headers=CIMultiDictProxy(CIMultiDict(headers.items() if isinstance(headers, Mapping) else headers)),
+            method=method,
+            url=url,
+        )
+
+        self.requests.append(request)
+
+        if timing is not None:
+            timing.bytes_out = len(body)
+            timing.headers_received = time.perf_counter_ns()
+
+        parts: Any = urlsplit(url)
+
+        route: Optional[Tuple[int, Dict[str, str], bytes]] = self._routes_.get(
+            (method, f"{parts.scheme}://{parts.netloc}{parts.path}")
+        ) or self._routes_.get((method, parts.path or "/"))
+
+        if route is not None:
+            status, response_headers, response_body = route
+
+            return Response(
+                body=response_body,
+                headers=CIMultiDictProxy(CIMultiDict(response_headers)),
+                status=status,
+                url=url,
+            )
+
+        if self.handler is not None:
+            result: Union[Response, Awaitable[Response]] = self.handler(request)
+
+            return await result if inspect.isawaitable(result) else result
+
+        return Response(
+            body=b"",
+            headers=CIMultiDictProxy(CIMultiDict()),
+            status=404,
+            url=url,
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> Response:
+        """
+        Answers a request in memory.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+            timing (Optional[RequestTiming]): The timing to fill in, if metrics are collected. Defaults to None.
+            **kwargs: The aiohttp keyword arguments of the request.
+
+        Returns:
+            Response: The response, without a codec.
+        """
+        return await self._answer_(method, url, timing, kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        chunk_size: int = 65536,
+        timing: Optional[RequestTiming] = None,
+        **kwargs,
+    ) -> AsyncIterator[StreamedResponse]:
+        """
+        Answers a request in memory and yields its body in chunks.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL of the request.
+            chunk_size (int): The maximum number of bytes per chunk. Defaults to 65536.
+            timing (Optional[RequestTiming]): The timing to fill in, if metrics are collected. Defaults to None.
+            **kwargs: The aiohttp keyword arguments of the request.
+
+        Returns:
+            AsyncIterator[StreamedResponse]: The context yielding the response.
+        """
+        response: Response = await self._answer_(method, url, timing, kwargs)
+
+        if response.status >= 400:
+            raise _status_error_(method, url, response.status, response.headers)
+
+        body: bytes = response.body
+
+        async def __chunks__() -> AsyncIterator[bytes]:
+            """
+            Yields the body in chunks of at most chunk_size bytes.
+            """
+            for offset in range(0, len(body), chunk_size):
+                yield body[offset : offset + chunk_size]
+
+        yield StreamedResponse(
+            chunks=__chunks__(),
+            headers=response.headers,
+            status=response.status,
+            url=response.url,
+        )
@@ -0,0 +1,177 @@
+import asyncio
+import contextlib
+import functools
+import mmap
+import os
+
+from typing import *
+
+__all__: List[str] = ["MemoryViewPayload", "UploadSource", "open_upload"]
+
+
+UploadSource = Union[
+    str,
+    os.PathLike,
+    IO[bytes],
+    mmap.mmap,
+    bytes,
+    bytearray,
+    memoryview,
+    AsyncIterable[bytes],
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _payload_type_() -> type:
+    """
+    Creates the MemoryViewPayload class on first use, as subclassing the payload of aiohttp imports aiohttp.
+
+    Returns:
+        type: The MemoryViewPayload class.
+    """
+    import aiohttp
+
+    class MemoryViewPayload(aiohttp.payload.Payload):
+        """
+        A request payload that writes a buffer in slices without copying it.
+
+        Writing a large buffer in one call makes the transport copy everything it cannot send
+        immediately into its own buffer. This payload instead writes zero-copy memoryview slices
+        and lets the writer drain between them, so memory-mapped files of any size can be uploaded
+        with a known Content-Length and constant memory.
+
+        Attributes:
+            view (memoryview): The buffer, as a flat memoryview of bytes.
+            chunk_size (int): The number of bytes written per slice.
+        """
+
+        def __init__(
+            self,
+            value: Union[mmap.mmap, bytes, bytearray, memoryview],
+            chunk_size: int = 65536,
+            content_type: str = "application/octet-stream",
+            **kwargs,
+        ) -> None:
+            """
+            Initialises a new MemoryViewPayload instance.
+
+            Args:
+                value (Union[mmap.mmap, bytes, bytearray, memoryview]): The buffer to upload.
+                chunk_size (int): The number of bytes written per slice. Defaults to 65536.
+                content_type (str): The content type of the payload. Defaults to "application/octet-stream".
+                **kwargs: Additional keyword arguments passed to aiohttp.payload.Payload.
+            """
+            view: memoryview = memoryview(value).cast("B")
+
+            super().__init__(
+                view,
+                content_type=content_type,
+                **kwargs,
+            )
+
+            self.view: memoryview = view
+            self.chunk_size: int = chunk_size
+
+            self._size = view.nbytes
+
+        async def chunks(self) -> AsyncIterator[memoryview]:
+            """
+            Yields the buffer in zero-copy slices, for transports that stream a body from an iterator.
+
+            Yields:
+                memoryview: The slices of at most chunk_size bytes.
+            """
+            for offset in range(0, self.view.nbytes, self.chunk_size):
+                yield self.view[offset : offset + self.chunk_size]
+
+        def decode(
+            self,
+            encoding: str = "utf-8",
+            errors: str = "strict",
+        ) -> str:
+            """
+            Returns the payload decoded as a string.
+
+            Args:
+                encoding (str): The encoding to decode with. Defaults to "utf-8".
+                errors (str): The error handling scheme. Defaults to "strict".
+
+            Returns:
+                str: The decoded payload.
+            """
+            return self.view.tobytes().decode(encoding, errors)
+
+        async def write(self, writer: Any) -> None:
+            """
+            Writes the buffer to the given writer in zero-copy slices.
+
+            Args:
+                writer (Any): The aiohttp stream writer of the request.
+            """
+            async for chunk in self.chunks():
+                await writer.write(chunk)
+
+    # Name the class as if it were defined at module level, for its representation and pickling
+    MemoryViewPayload.__qualname__ = "MemoryViewPayload"
+
+    return MemoryViewPayload
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Returns the attributes of the module that are created on first access.
+
+    Args:
+        name (str): The name of the attribute.
+
+    Returns:
+        Any: The attribute.
+
+    Raises:
+        AttributeError: If the module has no such attribute.
+    """
+    if name == "MemoryViewPayload":
+        return _payload_type_()
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+@contextlib.asynccontextmanager
+async def open_upload(
+    source: UploadSource,
+    chunk_size: int = 65536,
+) -> AsyncIterator[Any]:
+    """
+    Prepares an upload source to be streamed as a request body.
+
+    File paths are opened for the duration of the context and streamed by aiohttp from the
+    default executor with a known Content-Length. Buffers and memory-mapped files are wrapped
+    in a MemoryViewPayload. Open binary file objects are streamed as they are, and asynchronous
+    iterables are sent with chunked transfer encoding because their length is unknown.
+
+    Args:
+        source (UploadSource): The file path, file object, buffer, memory-mapped file or asynchronous iterable to upload.
+        chunk_size (int): The number of bytes written per slice of a buffer. Defaults to 65536.
+
+    Returns:
+        AsyncIterator[Any]: An asynchronous context yielding the value to pass as the request's data.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        file: IO[bytes] = await asyncio.get_running_loop().run_in_executor(
+            None,
+            open,
+            source,
+            "rb",
+        )
+
+        try:
+            yield file
+        finally:
+            file.close()
+    elif isinstance(source, (mmap.mmap, bytes, bytearray, memoryview)):
+        yield _payload_type_()(
+            source,
+            chunk_size=chunk_size,
+        )
+    else:
+        yield source
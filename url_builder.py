@@ -1,24 +1,64 @@
+from collections import deque
 from typing import *
-from pydantic import BaseModel
 
+from url_template import URLTemplate, compile_template, encode_component, encode_query
 
-class URLBuilder(BaseModel):
+
+class URLBuilder:
     """
     A utility class for constructing URLs by appending endpoints to a base URL.
 
     Attributes:
         base_url (str): The base URL used as the starting point for building other URLs.
-        temp_base_url (Optional[str]): A temporary URL used for building URLs with query parameters.
-        temp_urls (Optional[List[str]]): A list of temporary URLs used for building URLs with query parameters.
+        temp_base_url (Optional[str]): The URL most recently built by build_url, without its query parameters.
+        history (int): The number of URLs built by build_url that are kept in temp_urls. Defaults to 0, i.e. none.
+        temp_urls (Optional[Deque[str]]): The most recent URLs built by build_url, or None if history is 0.
     """
 
-    class Config:
-        arbitrary_types_allowed = True
+    __slots__ = ("base_url", "history", "temp_base_url", "temp_urls")
+
+    def __init__(
+        self,
+        base_url: str,
+        temp_base_url: Optional[str] = None,
+        history: int = 0,
+        temp_urls: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Initialises a new URLBuilder instance.
+
+        Args:
+            base_url (str): The base URL used as the starting point for building other URLs.
+            temp_base_url (Optional[str]): The URL most recently built, without its query parameters. Defaults to None.
+            history (int): The number of URLs built by build_url that are kept in temp_urls. Defaults to 0, i.e. none.
+            temp_urls (Optional[Iterable[str]]): The URLs built so far, of which the most recent history are kept, or none if history is 0. Defaults to None.
+        """
+        self.base_url: str = base_url
+        self.temp_base_url: Optional[str] = temp_base_url
+
+        self.history: int = history
+        self.temp_urls: Optional[Deque[str]] = deque(temp_urls, maxlen=history) if temp_urls is not None and history > 0 else None
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the builder.
+
+        Returns:
+            str: The string representation of the builder.
+        """
+        return f"URLBuilder(base_url={self.base_url!r}, temp_base_url={self.temp_base_url!r}, history={self.history!r})"
+
+    def _join_(self, endpoint: str) -> str:
+        """
+        Appends an endpoint to the base URL.
 
-    base_url: str
-    temp_base_url: Optional[str] = None
+        Args:
+            endpoint (str): The endpoint to append.
 
-    temp_urls: Optional[List[str]] = []
+        Returns:
+            str: The base URL and the endpoint, joined by a single slash.
+        """
+        return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
 
     def add_query_params(
         self,
@@ -26,19 +66,19 @@ class URLBuilder(BaseModel):
         **kwargs,
     ) -> str:
         """
-        Adds query parameters to a given URL.
+        Adds percent-encoded query parameters to a given URL.
 
         Args:
             url (str): The URL to which query parameters will be added.
-            **kwargs: Arbitrary keyword arguments to be included as query parameters.
+            **kwargs: Arbitrary keyword arguments to be included as query parameters. A list value repeats the key.
 
         Returns:
             str: The URL with added query parameters.
         """
-        query_params: str = "&".join(f"{key}={value}" for key, value, in kwargs.items())
+        query_params: str = encode_query(kwargs)
 
         if query_params:
-            return f"{url}?{query_params}"
+            return f"{url}{'&' if '?' in url else '?'}{query_params}"
         return url
 
     def build_url(
@@ -50,8 +90,8 @@ class URLBuilder(BaseModel):
         Constructs a generic API URL by appending the given endpoint to the base URL.
 
         This method creates a temporary URL by appending the endpoint to the base URL,
-        and then adds query parameters if provided. It also appends the constructed URL
-        to a list of temporary URLs.
+        and then adds query parameters if provided. If history is set, it also keeps the
+        constructed URL in temp_urls, dropping the oldest URL once history are kept.
 
         Args:
             endpoint (str): The endpoint to append.
@@ -60,14 +100,132 @@ class URLBuilder(BaseModel):
         Returns:
             str: The constructed URL.
         """
-        self._temp_base_url = f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        self.temp_base_url = self._join_(endpoint)
 
-        if not self.temp_urls:
-            self.temp_urls = [self._temp_base_url]
+        # Check, if the built URLs should be kept
+        if self.history > 0:
+            if self.temp_urls is None or self.temp_urls.maxlen != self.history:
+                self.temp_urls = deque(self.temp_urls or (), maxlen=self.history)
 
-        self.temp_urls.append(self._temp_base_url)
+            self.temp_urls.append(self.temp_base_url)
 
         return self.add_query_params(
-            url=self._temp_base_url,
+            url=self.temp_base_url,
             **kwargs,
         )
+
+    def build_urls(
+        self,
+        endpoint: str,
+        rows: Optional[Iterable[Mapping[str, Any]]] = None,
+        columns: Optional[Mapping[str, Sequence[Any]]] = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        """
+        Lazily constructs one URL per row of values from an endpoint template, e.g. "/users/{id}/orders".
+
+        The template is parsed once. Values named like a placeholder fill it in, every other
+        value becomes a query parameter, and the keyword arguments are added to every URL.
+        The URLs are neither validated nor kept in temp_urls, so millions of them can be
+        built in constant memory.
+
+        Args:
+            endpoint (str): The endpoint to append, with placeholders in braces.
+            rows (Optional[Iterable[Mapping[str, Any]]]): The values of each URL by name. Defaults to None.
+            columns (Optional[Mapping[str, Sequence[Any]]]): The values of all URLs as one array per name, e.g. the columns of a data frame. Defaults to None.
+            **kwargs: Query parameters added to every URL. A list value repeats the key, in rows and columns alike.
+
+        Yields:
+            str: The constructed URLs, in the order of the rows.
+
+        Raises:
+            ValueError: If neither or both of rows and columns are given, or columns is empty.
+            KeyError: If the value of a placeholder is missing.
+        """
+        if (rows is None) == (columns is None):
+            raise ValueError("Exactly one of rows and columns must be provided.")
+
+        template: URLTemplate = self.template(endpoint)
+
+        names: Tuple[str, ...] = template.names
+        render: Callable[[Sequence[Any]], str] = template.render
+
+        # The query parameters shared by every URL, encoded once
+        shared: str = encode_query(kwargs)
+
+        if rows is not None:
+            placeholders: FrozenSet[str] = frozenset(names)
+
+            for row in rows:
+                url: str = render([row[name] for name in names])
+
+                query: str = encode_query([(key, value) for key, value in row.items() if key not in placeholders])
+
+                if query and shared:
+                    yield f"{url}?{query}&{shared}"
+                elif query or shared:
+                    yield f"{url}?{query or shared}"
+                else:
+                    yield url
+
+            return
+
+        missing: List[str] = [name for name in names if name not in columns]
+
+        if missing:
+            raise KeyError(f"Missing columns for the placeholders: {', '.join(missing)}")
+
+        # Check, if there are no columns to take the number of URLs from
+        if not columns:
+            raise ValueError("At least one column must be provided.")
+
+        keys: List[str] = [name for name in columns if name not in names]
+
+        # The encoded query keys, each followed by its equals sign
+        prefixes: List[str] = [f"{encode_component(key)}=" for key in keys]
+
+        suffix: str = f"&{shared}" if shared else ""
+
+        count: int = len(names)
+
+        values: Tuple[Any, ...]
+
+        # Check, if the URLs differ in their path only
+        if not keys:
+            suffix = f"?{shared}" if shared else ""
+
+            for values in zip(*(columns[name] for name in names)):
+                yield render(values) + suffix
+
+            return
+
+        parts: List[str]
+
+        for values in zip(*(columns[name] for name in names), *(columns[key] for key in keys)):
+            parts = []
+
+            for prefix, value in zip(prefixes, values[count:]):
+                # Check, if the value holds several values for the same key, as in encode_query
+                if isinstance(value, (list, tuple)):
+                    parts.extend([prefix + encode_component(item) for item in value])
+                else:
+                    parts.append(prefix + encode_component(value))
+
+            if parts:
+                yield f"{render(values)}?{'&'.join(parts)}{suffix}"
+            elif shared:
+                yield f"{render(values)}?{shared}"
+            else:
+                yield render(values)
+
+    def template(self, endpoint: str) -> URLTemplate:
+        """
+        Returns the parsed template of an endpoint with placeholders, appended to the base URL.
+
+        Args:
+            endpoint (str): The endpoint to append, with placeholders in braces, e.g. "/users/{id}/orders".
+
+        Returns:
+            URLTemplate: The template, parsed once per distinct URL.
+        """
+        return compile_template(self._join_(endpoint))
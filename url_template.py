@@ -0,0 +1,176 @@
+import re
+
+from functools import lru_cache
+from typing import *
+from urllib.parse import quote
+
+__all__: List[str] = ["URLTemplate", "compile_template", "encode_component", "encode_query"]
+
+
+# A placeholder in a URL template, e.g. "{id}"
+_PLACEHOLDER: "re.Pattern[str]" = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+@lru_cache(maxsize=4096)
+def _quote_(value: str) -> str:
+    """
+    Percent-encodes a string, remembering the most recently used results.
+
+    Args:
+        value (str): The string to encode.
+
+    Returns:
+        str: The encoded string, with every reserved character escaped.
+    """
+    return quote(value, safe="")
+
+
+def encode_component(value: Any) -> str:
+    """
+    Percent-encodes a value for use as a path segment, query key or query value.
+
+    Integers need no escaping and skip the encoder, everything else is converted to a string
+    and encoded, with the results of recurring values cached.
+
+    Args:
+        value (Any): The value to encode.
+
+    Returns:
+        str: The encoded value.
+    """
+    if type(value) is int:
+        return str(value)
+
+    return _quote_(value if type(value) is str else str(value))
+
+
+def encode_query(params: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]]) -> str:
+    """
+    Encodes query parameters as a query string without the leading "?".
+
+    A list or tuple value repeats its key once per item.
+
+    Args:
+        params (Union[Mapping[str, Any], Iterable[Tuple[str, Any]]]): The parameters, as a mapping or as key-value pairs.
+
+    Returns:
+        str: The query string, or an empty string if there are no parameters.
+    """
+    pairs: Iterable[Tuple[str, Any]] = params.items() if isinstance(params, Mapping) else params
+
+    parts: List[str] = []
+
+    for key, value in pairs:
+        key = encode_component(key)
+
+        # Check, if the value holds several values for the same key
+        if isinstance(value, (list, tuple)):
+            parts.extend(f"{key}={encode_component(item)}" for item in value)
+        else:
+            parts.append(f"{key}={encode_component(value)}")
+
+    return "&".join(parts)
+
+
+class URLTemplate:
+    """
+    A URL with placeholders, e.g. "https://api.example.com/users/{id}/orders", parsed once and expanded many times.
+
+    The placeholder values are percent-encoded as path segments, so a value can never change
+    the structure of the URL. The text around the placeholders is used as it is.
+
+    Attributes:
+        template (str): The URL with placeholders.
+        names (Tuple[str, ...]): The names of the placeholders, in the order they appear.
+    """
+
+    __slots__ = ("_literals_", "names", "template")
+
+    def __init__(self, template: str) -> None:
+        """
+        Initialises a new URLTemplate instance.
+
+        Args:
+            template (str): The URL with placeholders in braces.
+
+        Raises:
+            ValueError: If a placeholder is used more than once.
+        """
+        self.template: str = template
+
+        # The text before each placeholder, followed by the text after the last one
+        pieces: List[str] = _PLACEHOLDER.split(template)
+
+        self._literals_: Tuple[str, ...] = tuple(pieces[0::2])
+        self.names: Tuple[str, ...] = tuple(pieces[1::2])
+
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"URL template '{template}' uses a placeholder more than once.")
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the template.
+
+        Returns:
+            str: The string representation of the template.
+        """
+        return f"<URLTemplate {self.template!r}>"
+
+    def expand(
+        self,
+        values: Optional[Mapping[str, Any]] = None,
+        **kwargs,
+    ) -> str:
+        """
+        Fills in the placeholders.
+
+        Args:
+            values (Optional[Mapping[str, Any]]): The placeholder values by name. Defaults to None.
+            **kwargs: Further placeholder values by name.
+
+        Returns:
+            str: The URL with the encoded placeholder values.
+
+        Raises:
+            KeyError: If the value of a placeholder is missing.
+        """
+        if values is None:
+            values = kwargs
+        elif kwargs:
+            values = {**values, **kwargs}
+
+        return self.render([values[name] for name in self.names])
+
+    def render(self, values: Sequence[Any]) -> str:
+        """
+        Fills in the placeholders from values in the order of names, without looking them up by name.
+
+        Args:
+            values (Sequence[Any]): One value per placeholder, in the order of names.
+
+        Returns:
+            str: The URL with the encoded placeholder values.
+        """
+        literals: Tuple[str, ...] = self._literals_
+
+        parts: List[str] = [literals[0]]
+
+        for literal, value in zip(literals[1:], values):
+            parts.append(encode_component(value))
+            parts.append(literal)
+
+        return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str) -> URLTemplate:
+    """
+    Returns the parsed template of a URL, parsing every distinct URL only once.
+
+    Args:
+        template (str): The URL with placeholders in braces.
+
+    Returns:
+        URLTemplate: The parsed template.
+    """
+    return URLTemplate(template)
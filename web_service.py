@@ -3,12 +3,36 @@ Author: lodego
 Date: 2024-03-13
 """
 
-import aiohttp
 import asyncio
+import atexit
+import concurrent.futures
+import os
+import time
 
+from collections import ChainMap, deque
+from contextlib import asynccontextmanager
 from typing import *
+from urllib.parse import SplitResult, urlsplit
 
-from utils.logger import Logger
+from adaptive_limiter import AdaptiveConcurrencyLimiter
+from batch import BatchResult, RequestSpec
+from cache import CachedResponse, ResponseCache
+from circuit_breaker import CircuitBreaker
+from codec import JSONCodec
+from content_coding import BodyCompressor
+from credentials import CredentialProvider
+from headers import Headers
+from event_loop_thread import EventLoopThread
+from metrics import RequestMetrics, RequestTiming
+from pagination import PageRequest, PaginationError, PaginationStrategy
+from response import Response
+from rate_limit import RateLimiter
+from retry import RetryPolicy
+from session_pool import SessionPool
+from single_flight import SingleFlight
+from transport import AiohttpTransport, StreamedResponse, Transport
+from upload import UploadSource, open_upload
+from logger import LazyLogger, Logger
 
 __all__: List[str] = ["web_service"]
 
@@ -17,319 +41,2062 @@ class WebService:
     """
     A class that provides methods for sending HTTP requests.
 
+    Every verb is available as a coroutine (aget, apost, aput, adelete) for use inside a
+    running event loop, and as a blocking method (get, post, put, delete) for synchronous
+    callers. All requests are sent through a long-lived, pooled session, so repeated calls to the
+    same host reuse warm keep-alive connections and cached DNS entries. The synchronous
+    methods are thread-safe: every thread submits its requests to one background event loop
+    thread, which owns the session they share until close() is called.
+
     Attributes:
         logger: Logger
             The logger instance for the WebService class.
+        pool: SessionPool
+            The pool providing the shared session and connector.
+        transport: Transport
+            Sends the requests to hosts without a transport of their own, by default over the pooled aiohttp sessions.
+        transports: Dict[str, Transport]
+            The transports of individual hosts, keyed by "host:port" or host name, e.g. an HTTP2Transport for one API.
+        cache: Optional[ResponseCache]
+            The cache GET and HEAD responses are served from, or None to disable caching.
+        single_flight: Optional[SingleFlight]
+            Coalesces identical idempotent requests in flight, or None to send every request.
+        retry_policy: Optional[RetryPolicy]
+            Decides which failed requests are retried, or None to never retry.
+        circuit_breaker: Optional[CircuitBreaker]
+            Fails fast on requests to unhealthy hosts, or None to always send requests.
+        rate_limiter: Optional[RateLimiter]
+            Limits the request rate per host or URL prefix, or None to not limit it.
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter]
+            Adapts the requests in flight per host to the observed latency and overload, or None to not limit them.
+        codec: Optional[JSONCodec]
+            Encodes JSON request bodies and decodes JSON responses, or None for JSONCodec.default().
+        compressor: Optional[BodyCompressor]
+            Compresses large request bodies with a Content-Encoding, or None to send them as they are.
+        credentials: Optional[CredentialProvider]
+            Supplies the Authorization header attached to every request without credentials of its own, or None to attach none.
+        metrics: Optional[RequestMetrics]
+            Collects phase latencies, status counts, bytes and connection reuse of every request, or None to not collect them.
+        loop_thread: EventLoopThread
+            The background event loop thread the synchronous methods run on.
     """
-    logger: Logger = Logger.get_logger(name="WebService")
+    logger: Logger = LazyLogger(name="WebService")
+
+    metrics: Optional[RequestMetrics] = RequestMetrics()
+
+    pool: SessionPool = SessionPool(trace_configs=lambda: [RequestMetrics.trace_config()])
+
+    transport: Transport = AiohttpTransport(pool)
+
+    transports: Dict[str, Transport] = {}
+
+    cache: Optional[ResponseCache] = None
+
+    single_flight: Optional[SingleFlight] = SingleFlight()
+
+    retry_policy: Optional[RetryPolicy] = None
+
+    circuit_breaker: Optional[CircuitBreaker] = None
+
+    rate_limiter: Optional[RateLimiter] = None
+
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+
+    codec: Optional[JSONCodec] = None
+
+    compressor: Optional[BodyCompressor] = None
+
+    credentials: Optional[CredentialProvider] = None
+
+    loop_thread: EventLoopThread = EventLoopThread(name="WebService")
+
+    async def __aenter__(self) -> "WebService":
+        """
+        Enters the asynchronous context of the WebService.
+
+        :return: The WebService instance.
+        :rtype: WebService
+        """
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """
+        Exits the asynchronous context of the WebService and closes the pooled session of the running loop.
+        """
+        await self.aclose()
+
+    def __enter__(self) -> "WebService":
+        """
+        Enters the context of the WebService.
+
+        :return: The WebService instance.
+        :rtype: WebService
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """
+        Exits the context of the WebService, closing the pooled session of the background event loop thread.
+        """
+        self.close()
 
     @classmethod
-    def delete(
+    def _run_(
+        cls,
+        coroutine: Coroutine[Any, Any, Any],
+    ) -> Any:
+        """
+        Runs the given coroutine on the background event loop thread and blocks until it finishes.
+
+        :param coroutine: The coroutine to run.
+        :type coroutine: Coroutine[Any, Any, Any]
+
+        :return: The result of the coroutine.
+        :rtype: Any
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return cls.loop_thread.run(coroutine)
+
+        # Close the coroutine, as it can never be awaited from here
+        coroutine.close()
+
+        raise RuntimeError(
+            "WebService's synchronous methods cannot be called from a running event loop, use aget, apost, aput or adelete instead."
+        )
+
+    @classmethod
+    async def _authorize_(
+        cls,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """
+        Attaches the Authorization header of the request's credentials, or of the default credentials, to its keyword arguments.
+
+        The header is layered over the request headers with a ChainMap instead of copying them,
+        and looked up per attempt, so retries pick up refreshed tokens. The request headers are
+        only copied to drop an Authorization header of theirs, in any casing, which would be
+        sent next to the one of the credentials otherwise.
+
+        :param kwargs: The keyword arguments of the request, whose 'credentials' are replaced by the header.
+        :type kwargs: Dict[str, Any]
+        """
+        credentials: Optional[CredentialProvider] = kwargs.pop("credentials", cls.credentials)
+
+        if credentials is None:
+            return
+
+        headers: Mapping[str, str] = kwargs.get("headers") or {}
+
+        # Check, if the request headers hold an Authorization header of their own
+        if any(name.lower() == "authorization" for name in headers):
+            headers = {name: value for name, value in headers.items() if name.lower() != "authorization"}
+
+        # aiohttp iterates a non-dict mapping by its keys, so the view of its pairs is passed instead
+        kwargs["headers"] = ChainMap(
+            {"Authorization": await credentials.authorization()},
+            headers,
+        ).items()
+
+    @classmethod
+    def _unwrap_(
+        cls,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """
+        Replaces a Headers instance passed as the request headers by its dictionary, keeping its credentials.
+
+        The credentials of the Headers are used unless the request has credentials of its own.
+
+        :param kwargs: The keyword arguments of the request, updated in place.
+        :type kwargs: Dict[str, Any]
+        """
+        headers: Any = kwargs.get("headers")
+
+        if not isinstance(headers, Headers):
+            return
+
+        kwargs["headers"] = headers.headers
+
+        if headers.credentials is not None:
+            kwargs.setdefault("credentials", headers.credentials)
+
+    @classmethod
+    async def _attempt_(
         cls,
+        method: str,
         url: str,
+        host: str,
         log: bool = False,
         **kwargs,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Response:
         """
-        Sends a DELETE request to the specified URL and returns the response as a JSON.
+        Sends a single attempt of a request once the rate limiter and the concurrency limiter allow it.
 
-        :param url: The URL to send the DELETE request to.
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :param url: The URL to send the request to.
         :type url: str
 
+        :param host: The host of the URL.
+        :type host: str
+
         :param log: A flag indicating whether to log the response status (Defaults to False).
         :type log: bool
 
-        :param kwargs: Additional keyword arguments for the DELETE request.
+        :param kwargs: Additional keyword arguments for the request.
         :type kwargs: dict
 
-        :return: The JSON response from the URL, or None if an error occurs.
-        :rtype: Optional[Dict[str, Any]]
+        :return: The fully read response.
+        :rtype: Response
         """
-        try:
+        rate_limiter: Optional[RateLimiter] = cls.rate_limiter
+
+        limiter: Optional[AdaptiveConcurrencyLimiter] = cls.concurrency_limiter
+
+        # Wait for a token of the URL's rate limit
+        if rate_limiter is not None:
+            await rate_limiter.acquire(url)
+
+        # Wait for a slot within the host's concurrency limit
+        if limiter is not None:
+            await limiter.acquire(host)
+
+        latency: Optional[float] = None
+
+        overloaded: bool = False
+
+        started: float = time.monotonic()
 
-            async def __delete__(
-                url: str,
-                log: bool = False,
+        try:
+            result: Response = await cls._transmit_(
+                log=log,
+                method=method,
+                url=url,
                 **kwargs,
-            ) -> Optional[Dict[str, Any]]:
-                """
-                Sends a DELETE request to the specified URL and returns the response as a JSON.
-
-                :param url: The URL to send the DELETE request to.
-                :type url: str
-
-                :param log: A flag indicating whether to log the response status (Defaults to False).
-                :type log: bool
-
-                :param kwargs: Additional keyword arguments for the DELETE request.
-                :type kwargs: dict
-
-                :return: The JSON response from the URL, or None if an error occurs.
-                :rtype: Optional[Dict[str, Any]]
-                """
-                async with aiohttp.ClientSession() as session:
-                    async with session.delete(
-                        url=url,
-                        **kwargs,
-                    ) as response:
-                        # Check, if the log boolean value is true
-                        if log:
-                            # Log an info message indicating the response status
-                            cls.logger.info(
-                                message=f"Received response from {url}: {response.status}"
-                            )
-                        
-
-                        # Return the JSON response
-                        return await response.json()
-
-            # Run the asynchronous __delete__ function
-            return asyncio.run(
-                __delete__(
-                    log=log,
+            )
+        except asyncio.TimeoutError:
+            latency = time.monotonic() - started
+
+            overloaded = True
+
+            raise
+        else:
+            latency = time.monotonic() - started
+
+            # Check, if the origin asks to slow down
+            if result.status == 429 and rate_limiter is not None:
+                # Parse the header like the retry policy does, so both wait for the same time
+                retry_after: Optional[float] = RetryPolicy.parse_retry_after(result.headers.get("Retry-After"))
+
+                rate_limiter.throttle(
+                    seconds=retry_after if retry_after is not None else 1.0,
                     url=url,
-                    **kwargs,
                 )
-            )
-        except Exception as e:
-            # Log an error message indicating that an exception has occurred
-            cls.logger.error(message=f"Caught an exception while attempting to send 'DELETE' request to URL: '{url}': {e}")
 
-            # Re-raise the exception to the caller
-            raise e
+            if limiter is not None:
+                overloaded = result.status in limiter.overload_statuses
+
+            return result
+        finally:
+            if limiter is not None:
+                limiter.release(
+                    host=host,
+                    latency=latency,
+                    overloaded=overloaded,
+                )
 
     @classmethod
-    def get(
+    def _iterate_(
+        cls,
+        iterator: AsyncIterator[Any],
+    ) -> Iterator[Any]:
+        """
+        Drives the given asynchronous iterator on the background event loop thread.
+
+        :param iterator: The asynchronous iterator to drive.
+        :type iterator: AsyncIterator[Any]
+
+        :return: A synchronous iterator yielding the items of the asynchronous iterator.
+        :rtype: Iterator[Any]
+        """
+        async def __next__() -> Any:
+            """
+            Returns the next item of the asynchronous iterator.
+
+            :return: The next item.
+            :rtype: Any
+            """
+            return await iterator.__anext__()
+
+        try:
+            while True:
+                try:
+                    yield cls._run_(__next__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Check, if the iterator is an asynchronous generator that must be finalised
+            if hasattr(iterator, "aclose"):
+                cls._run_(iterator.aclose())
+
+    @classmethod
+    async def _fetch_(
         cls,
+        method: str,
         url: str,
         log: bool = False,
         **kwargs,
-    ) -> Optional[Union[Dict[str, Any], str, bytes]]:
+    ) -> Response:
         """
-        Sends a GET request to the specified URL and returns the response as a JSON.
+        Sends a request through the pooled session of the running event loop and reads its body.
 
-        :param url: The URL to send the GET request to.
+        GET and HEAD requests without a body are served from the response cache while fresh.
+        Identical idempotent requests without a body that are already in flight are coalesced,
+        so only one of them reaches the origin and every caller shares its response. The
+        Authorization header of the request's credentials is part of both keys, so a response
+        is never shared between requests sent with different credentials.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :param url: The URL to send the request to.
         :type url: str
 
         :param log: A flag indicating whether to log the response status (Defaults to False).
         :type log: bool
 
-        :param kwargs: Additional keyword arguments for the GET request.
+        :param kwargs: Additional keyword arguments for the request.
         :type kwargs: dict
 
-        :return: The response from the URL, or None if an error occurs.
-        :rtype: Optional[Union[Dict[str, Any], str, bytes]]
+        :return: The fully read response.
+        :rtype: Response
         """
-        try:
+        cls._unwrap_(kwargs)
 
-            async def __get__(
-                url: str,
-                log: bool = False,
-                **kwargs,
-            ) -> Optional[Union[Dict[str, Any], str, bytes]]:
-                """
-                Asynchronously sends a GET request and returns the response JSON.
-
-                :param url: The URL to send the GET request to.
-                :type url: str
-
-                :param log: A flag indicating whether to log the response status.
-                :type log: bool
-
-                :param kwargs: Additional keyword arguments for the GET request.
-                :type kwargs: dict
-
-                :return: The response from the URL, or None if an error occurs.
-                :rtype: Optional[Union[Dict[str, Any], str, bytes]]
-                """
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        url=url,
-                        **kwargs,
-                    ) as response:
-                    # Check, if the log boolean value is true
-                        if log:
-                            # Log an info message indicating the response status
-                            cls.logger.info(
-                                message=f"Received response from {url}: {response.status}"
-                            )
-                        
-                        # Get the content type of the response
-                        content_type: str = response.headers.get("Content-Type", "")
-
-                        if content_type.startswith("application/json"):
-                            
-                            # Return the JSON response
-                            return await response.json()
-                        elif content_type.startswith("text/"):
-
-                            # Return the text response
-                            return await response.text()
-                        else:
-
-                            # Return the binary response
-                            return await response.read()
-
-
-            # Run the asynchronous __get__ function
-            return asyncio.run(
-                __get__(
+        # Encode a JSON body up front, so it is sent with the configured codec and can be replayed by retries
+        if "json" in kwargs:
+            headers: Mapping[str, str] = kwargs.get("headers") or {}
+
+            kwargs["data"] = (cls.codec or JSONCodec.default()).dumps(kwargs.pop("json"))
+
+            if not any(name.lower() == "content-type" for name in headers):
+                kwargs["headers"] = {
+                    **headers,
+                    "Content-Type": "application/json",
+                }
+
+        compressor: Optional[BodyCompressor] = cls.compressor
+
+        # Compress a large body once up front, so retries replay the compressed bytes
+        if compressor is not None and compressor.should_compress(kwargs.get("data")):
+            headers = kwargs.get("headers") or {}
+
+            if not any(name.lower() == "content-encoding" for name in headers):
+                kwargs["data"] = await compressor.compress(kwargs["data"])
+                kwargs["headers"] = {
+                    **headers,
+                    "Content-Encoding": compressor.encoding,
+                }
+
+        cache: Optional[ResponseCache] = cls.cache
+
+        single_flight: Optional[SingleFlight] = cls.single_flight
+
+        has_body: bool = "data" in kwargs
+
+        entry: Optional[CachedResponse] = None
+
+        key: Optional[str] = None
+
+        credentials: Optional[CredentialProvider] = kwargs.get("credentials", cls.credentials)
+
+        authorization: Optional[str] = None
+
+        # Resolve the header of the credentials up front, as responses must only be shared between requests sent with it
+        if credentials is not None and not has_body and (cache is not None or single_flight is not None):
+            authorization = await credentials.authorization()
+
+        # Check, if the request can be answered from the cache
+        if cache is not None and method in ("GET", "HEAD") and not has_body:
+            key = cache.key(
+                authorization=authorization,
+                headers=kwargs.get("headers"),
+                method=method,
+                params=kwargs.get("params"),
+                url=url,
+            )
+
+            entry = await cache.alookup(key)
+
+            if entry is not None and entry.is_fresh():
+                return entry.response
+
+        # Check, if the request may share the response of an identical request in flight
+        if single_flight is not None and method in single_flight.methods and not has_body:
+            return await single_flight.do(
+                factory=lambda: cls._send_(
+                    cache_key=key,
+                    entry=entry,
                     log=log,
+                    method=method,
                     url=url,
                     **kwargs,
-                )
+                ),
+                key=(method, url, authorization, repr(sorted(kwargs.items()))),
             )
-        except Exception as e:
-            # Log an error message indicating that an exception has occurred
-            cls.logger.error(message=f"Caught an exception while attempting to send 'GET' request to URL: '{url}': {e}")
 
-            # Re-raise the exception to the caller
-            raise e
+        return await cls._send_(
+            cache_key=key,
+            entry=entry,
+            log=log,
+            method=method,
+            url=url,
+            **kwargs,
+        )
 
     @classmethod
-    def post(
+    async def _send_(
         cls,
+        method: str,
         url: str,
         log: bool = False,
+        cache_key: Optional[str] = None,
+        entry: Optional[CachedResponse] = None,
         **kwargs,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Response:
         """
-        Sends a POST request to the specified URL and returns the response as a JSON.
+        Sends a request to the origin, revalidating a stale cache entry and storing the response if it is cacheable.
 
-        :param url: The URL to send the POST request to.
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :param url: The URL to send the request to.
         :type url: str
 
         :param log: A flag indicating whether to log the response status (Defaults to False).
         :type log: bool
 
-        :param kwargs: Additional keyword arguments for the POST request.
+        :param cache_key: The key to store the response under, or None if it must not be cached (Defaults to None).
+        :type cache_key: Optional[str]
+
+        :param entry: The stale cache entry to revalidate, if any (Defaults to None).
+        :type entry: Optional[CachedResponse]
+
+        :param kwargs: Additional keyword arguments for the request.
         :type kwargs: dict
 
-        :return: The JSON response from the URL, or None if an error occurs.
-        :rtype: Optional[Dict[str, Any]]
+        :return: The fully read response.
+        :rtype: Response
         """
-        try:
+        cache: Optional[ResponseCache] = cls.cache
 
-            async def __post__(
-                url: str,
-                log: bool = False,
-                **kwargs,
-            ) -> Optional[Dict[str, Any]]:
-                """
-                Asynchronously sends a POST request to the specified URL and returns the response as a JSON.
-
-                :param url: The URL to send the POST request to.
-                :type url: str
-
-                :param log: A flag indicating whether to log the response status (Defaults to False).
-                :type log: bool
-
-                :param kwargs: Additional keyword arguments for the POST request.
-                :type kwargs: dict
-
-                :return: The JSON response from the URL, or None if an error occurs.
-                :rtype: Optional[Dict[str, Any]]
-                """
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        url=url,
-                        **kwargs,
-                    ) as response:
-                        # Check, if the log boolean value is true
-                        if log:
-                            # Log an info message indicating the response status
-                            cls.logger.info(
-                                message=f"Received response from {url}: {response.status}"
-                            )
-                        
-                        # Return the JSON response
-                        return await response.json()
-
-            # Run the asynchronous __post__ function
-            return asyncio.run(
-                __post__(
+        # Check, if a stale entry should be revalidated with its validators
+        if cache is not None and entry is not None:
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}),
+                **cache.conditional_headers(entry),
+            }
+
+        policy: Optional[RetryPolicy] = cls.retry_policy
+
+        breaker: Optional[CircuitBreaker] = cls.circuit_breaker
+
+        host: str = urlsplit(url).netloc
+
+        # Streamed bodies are consumed by the first attempt and cannot be sent again
+        replayable: bool = isinstance(kwargs.get("data"), (type(None), bytes, bytearray, str, dict))
+
+        if policy is not None and policy.budget is not None:
+            policy.budget.deposit()
+
+        attempt: int = 0
+
+        while True:
+            attempt += 1
+
+            delay: Optional[float] = None
+
+            # Check, if the circuit of the host lets the request through
+            if breaker is not None:
+                breaker.before_request(host)
+
+            try:
+                result: Response = await cls._attempt_(
+                    host=host,
                     log=log,
+                    method=method,
                     url=url,
                     **kwargs,
                 )
+            except Exception as e:
+                # Imported here, so importing the module does not import aiohttp
+                import aiohttp
+
+                if breaker is not None and isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                    breaker.record_failure(host)
+
+                if policy is not None and replayable:
+                    delay = policy.retry_delay(
+                        attempt=attempt,
+                        exception=e,
+                        method=method,
+                    )
+
+                # Check, if the exception must be raised to the caller
+                if delay is None:
+                    raise e
+            else:
+                if breaker is not None:
+                    if result.status in breaker.failure_statuses:
+                        breaker.record_failure(host)
+                    else:
+                        breaker.record_success(host)
+
+                if policy is not None and replayable:
+                    delay = policy.retry_delay(
+                        attempt=attempt,
+                        method=method,
+                        retry_after=result.headers.get("Retry-After"),
+                        status=result.status,
+                    )
+
+                # Check, if the response is final
+                if delay is None:
+                    break
+
+            # Log a warning message indicating that the request will be retried
+            cls.logger.warning(
+                "Retrying '{}' request to URL: '{}' in {:.2f}s (attempt {})",
+                method,
+                url,
+                delay,
+                attempt + 1,
             )
-        except Exception as e:
-            # Log an error message indicating that an exception has occurred
-            cls.logger.error(message=f"Caught an exception while attempting to send 'POST' request to URL: '{url}': {e}")
 
-            # Re-raise the exception to the caller
-            raise e
+            await asyncio.sleep(delay)
+
+        if cache is not None and cache_key is not None:
+            # Check, if the origin confirmed the stale entry is still valid
+            if result.status == 304 and entry is not None:
+                return await cache.arevalidate(
+                    entry=entry,
+                    headers=result.headers,
+                    key=cache_key,
+                )
+
+            await cache.astore(
+                key=cache_key,
+                response=result,
+            )
+
+        return result
 
     @classmethod
-    def put(
+    async def _transmit_(
         cls,
+        method: str,
         url: str,
         log: bool = False,
         **kwargs,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Response:
         """
-        Sends a PUT request to the specified URL and returns the response as a JSON.
+        Sends a single attempt of a request through the pooled session of the running event loop.
 
-        :param url: The URL to send the PUT request to.
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :param url: The URL to send the request to.
         :type url: str
 
         :param log: A flag indicating whether to log the response status (Defaults to False).
         :type log: bool
 
-        :param kwargs: Additional keyword arguments for the PUT request.
+        :param kwargs: Additional keyword arguments for the request.
         :type kwargs: dict
 
-        :return: The JSON response from the URL, or None if an error occurs.
-        :rtype: Optional[Dict[str, Any]]
+        :return: The fully read response.
+        :rtype: Response
         """
+        metrics: Optional[RequestMetrics] = cls.metrics
+
+        timing: Optional[RequestTiming] = RequestTiming(method, url) if metrics is not None else None
+
+        await cls._authorize_(kwargs)
+
         try:
+            response: Response = await cls.transport_for(url).request(
+                method=method,
+                timing=timing,
+                url=url,
+                **kwargs,
+            )
+        except Exception as e:
+            if timing is not None:
+                metrics.fail(timing, e)
+
+            raise
+
+        # Check, if the log boolean value is true
+        if log:
+            # Log an info message indicating the response status
+            cls.logger.info(
+                "Received response from {}: {}",
+                url,
+                response.status,
+            )
+
+        if timing is not None:
+            metrics.finish(
+                bytes_in=len(response.body),
+                status=response.status,
+                timing=timing,
+            )
+
+        response.codec = cls.codec
+
+        return response
+
+    @classmethod
+    async def _request_(
+        cls,
+        method: str,
+        url: str,
+        log: bool = False,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Sends a request through the pooled session of the running event loop and decodes its body based on its content type.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :param url: The URL to send the request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        response: Response = await cls._fetch_(
+            log=log,
+            method=method,
+            url=url,
+            **kwargs,
+        )
+
+        # Decode a copy, as the response may be shared with the cache and coalesced callers
+        return response.copy(codec=cls.codec).decode()
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """
+        Closes the pooled session and the connections of every transport bound to the running event loop.
+        """
+        await cls.pool.close()
+
+        for transport in {cls.transport, *cls.transports.values()}:
+            await transport.close()
+
+    @classmethod
+    async def adelete(
+        cls,
+        url: str,
+        log: bool = False,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Asynchronously sends a DELETE request to the specified URL and returns the response decoded based on its content type.
+
+        This coroutine runs on the caller's event loop, so any number of requests can overlap.
+
+        :param url: The URL to send the DELETE request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the DELETE request.
+        :type kwargs: dict
 
-            async def __put__(
-                url: str,
-                log: bool = False,
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        try:
+            return await cls._request_(
+                log=log,
+                method="DELETE",
+                url=url,
                 **kwargs,
-            ) -> Optional[Dict[str, Any]]:
-                """
-                Asynchronously sends a PUT request to the specified URL and returns the response as a JSON.
-
-                :param url: The URL to send the PUT request to.
-                :type url: str
-
-                :param log: A flag indicating whether to log the response status (Defaults to False).
-                :type log: bool
-
-                :param kwargs: Additional keyword arguments for the PUT request.
-                :type kwargs: dict
-
-                :return: The JSON response from the URL, or None if an error occurs.
-                :rtype: Optional[Dict[str, Any]]
-                """
-                async with aiohttp.ClientSession() as session:
-                    async with session.put(
-                        url=url,
-                        **kwargs,
-                    ) as response:
-                        # Check, if the log boolean value is true
-                        if log:
-                            # Log an info message indicating the response status
-                            cls.logger.info(
-                                message=f"Received response from {url}: {response.status}"
-                            )
-                        
-                        # Return the JSON response
-                        return await response.json()
-
-            # Run the asynchronous __put__ function
-            return asyncio.run(
-                __put__(
-                    log=log,
-                    url=url,
-                    **kwargs,
-                )
             )
         except Exception as e:
             # Log an error message indicating that an exception has occurred
-            cls.logger.error(message=f"Caught an exception while attempting to send 'PUT' request to URL: '{url}': {e}")
+            cls.logger.error(message=f"Caught an exception while attempting to send 'DELETE' request to URL: '{url}': {e}")
 
             # Re-raise the exception to the caller
             raise e
+
+    @classmethod
+    async def adownload(
+        cls,
+        url: str,
+        path: Union[str, os.PathLike],
+        concurrency: int = 4,
+        segment_size: int = 8 * 1024 * 1024,
+        retries: int = 3,
+        **kwargs,
+    ) -> int:
+        """
+        Asynchronously downloads a file in byte ranges fetched in parallel, resuming an interrupted download to the same path.
+
+        Servers that do not accept byte ranges are downloaded in a single stream, as with adownload_to.
+        See DownloadManager for how segments are verified and recorded.
+
+        :param url: The URL of the file.
+        :type url: str
+
+        :param path: The path to write the file to.
+        :type path: Union[str, os.PathLike]
+
+        :param concurrency: The number of byte ranges fetched at the same time (Defaults to 4).
+        :type concurrency: int
+
+        :param segment_size: The size of a byte range in bytes (Defaults to 8 MiB).
+        :type segment_size: int
+
+        :param retries: The number of times a byte range is resumed after a failed request (Defaults to 3).
+        :type retries: int
+
+        :param kwargs: Additional keyword arguments for the requests.
+        :type kwargs: dict
+
+        :return: The size of the file in bytes.
+        :rtype: int
+        """
+        # Imported here, as the download manager sends its requests through WebService
+        from download import DownloadManager
+
+        return await DownloadManager(
+            concurrency=concurrency,
+            retries=retries,
+            segment_size=segment_size,
+        ).download(
+            path=path,
+            url=url,
+            **kwargs,
+        )
+
+    @classmethod
+    async def adownload_to(
+        cls,
+        url: str,
+        path: Union[str, os.PathLike],
+        chunk_size: int = 65536,
+        log: bool = False,
+        **kwargs,
+    ) -> int:
+        """
+        Asynchronously streams the body of a GET request to the specified URL into a file.
+
+        Only one chunk is held in memory at a time, and file writes run in the default executor
+        so they do not block the event loop. The body is written to "<path>.tmp", which is only
+        created once the response status is known to be successful and replaces the file at path
+        once the body is complete, so a failed download leaves an existing file untouched.
+
+        :param url: The URL to send the GET request to.
+        :type url: str
+
+        :param path: The path of the file to write the response body to.
+        :type path: Union[str, os.PathLike]
+
+        :param chunk_size: The maximum number of bytes read per chunk (Defaults to 65536).
+        :type chunk_size: int
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the GET request.
+        :type kwargs: dict
+
+        :return: The number of bytes written to the file.
+        :rtype: int
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        temp: str = f"{os.fspath(path)}.tmp"
+
+        written: int = 0
+
+        # Entering the response raises for an error status before the file is created
+        async with cls.aopen(
+            chunk_size=chunk_size,
+            log=log,
+            url=url,
+            **kwargs,
+        ) as response:
+            try:
+                with open(temp, "wb") as file:
+                    async for chunk in response.chunks:
+                        await loop.run_in_executor(None, file.write, chunk)
+
+                        written += len(chunk)
+            except BaseException:
+                os.remove(temp)
+
+                raise
+
+        os.replace(temp, path)
+
+        return written
+
+    @classmethod
+    async def agather(
+        cls,
+        requests: Iterable[Union[str, RequestSpec]],
+        concurrency: int = 100,
+        per_host: Optional[int] = None,
+        ordered: bool = True,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Asynchronously sends a batch of requests over the pooled session with bounded concurrency.
+
+        The requests iterable is consumed lazily, so at most 'concurrency' requests are in flight
+        or waiting to be yielded at any time, no matter how long the iterable is. Exceptions
+        raised by single requests are captured in their BatchResult instead of aborting the batch.
+
+        :param requests: The URLs or RequestSpecs to send. Plain URLs are sent as GET requests.
+        :type requests: Iterable[Union[str, RequestSpec]]
+
+        :param concurrency: The maximum number of requests in flight (Defaults to 100).
+        :type concurrency: int
+
+        :param per_host: The maximum number of requests in flight per host, or None for no limit (Defaults to None).
+        :type per_host: Optional[int]
+
+        :param ordered: A flag indicating whether to yield results in input order rather than as they complete (Defaults to True).
+        :type ordered: bool
+
+        :return: An asynchronous iterator of BatchResults.
+        :rtype: AsyncIterator[BatchResult]
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        completed: "asyncio.Queue[BatchResult]" = asyncio.Queue()
+
+        async def __send__(
+            index: int,
+            request: RequestSpec,
+        ) -> None:
+            """
+            Sends a single request of the batch and queues its BatchResult.
+
+            :param index: The position of the request in the input iterable.
+            :type index: int
+
+            :param request: The request to send.
+            :type request: RequestSpec
+            """
+            result: BatchResult = BatchResult(
+                index=index,
+                request=request,
+            )
+
+            try:
+                # Check, if the number of requests per host is limited
+                if per_host is None:
+                    result.result = await cls._request_(
+                        log=request.log,
+                        method=request.method,
+                        url=request.url,
+                        **request.kwargs,
+                    )
+                else:
+                    host: str = urlsplit(request.url).netloc
+
+                    if host not in host_semaphores:
+                        host_semaphores[host] = asyncio.Semaphore(per_host)
+
+                    async with host_semaphores[host]:
+                        result.result = await cls._request_(
+                            log=request.log,
+                            method=request.method,
+                            url=request.url,
+                            **request.kwargs,
+                        )
+            except Exception as e:
+                result.error = e
+
+            completed.put_nowait(result)
+
+        iterator: Iterator[Tuple[int, Union[str, RequestSpec]]] = enumerate(requests)
+
+        tasks: Set[asyncio.Task] = set()
+
+        buffered: Dict[int, BatchResult] = {}
+
+        exhausted: bool = False
+
+        next_index: int = 0
+
+        # The number of requests started whose results have not been yielded yet
+        pending: int = 0
+
+        try:
+            while True:
+                # Start new requests while there is room in the window
+                while not exhausted and pending < concurrency:
+                    try:
+                        index, request = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+
+                        break
+
+                    task: asyncio.Task = asyncio.ensure_future(
+                        __send__(
+                            index=index,
+                            request=RequestSpec.coerce(request),
+                        )
+                    )
+
+                    tasks.add(task)
+
+                    task.add_done_callback(tasks.discard)
+
+                    pending += 1
+
+                # Check, if every request has been sent and yielded
+                if not pending:
+                    break
+
+                result: BatchResult = await completed.get()
+
+                if not ordered:
+                    pending -= 1
+
+                    yield result
+
+                    continue
+
+                buffered[result.index] = result
+
+                # Yield every result that is next in input order
+                while next_index in buffered:
+                    pending -= 1
+
+                    yield buffered.pop(next_index)
+
+                    next_index += 1
+        finally:
+            # Cancel the requests still in flight if the consumer stops early
+            for task in tasks:
+                task.cancel()
+
+    @classmethod
+    async def aget(
+        cls,
+        url: str,
+        log: bool = False,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Asynchronously sends a GET request to the specified URL and returns the response decoded based on its content type.
+
+        This coroutine runs on the caller's event loop, so any number of requests can overlap.
+
+        :param url: The URL to send the GET request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the GET request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        try:
+            return await cls._request_(
+                log=log,
+                method="GET",
+                url=url,
+                **kwargs,
+            )
+        except Exception as e:
+            # Log an error message indicating that an exception has occurred
+            cls.logger.error(message=f"Caught an exception while attempting to send 'GET' request to URL: '{url}': {e}")
+
+            # Re-raise the exception to the caller
+            raise e
+
+    @classmethod
+    @asynccontextmanager
+    async def aopen(
+        cls,
+        url: str,
+        method: str = "GET",
+        chunk_size: int = 65536,
+        log: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[StreamedResponse]:
+        """
+        Asynchronously sends a request to the specified URL and yields its response with the body still unread.
+
+        Unlike astream, the status and headers are available before the body is read, e.g. to
+        verify the Content-Range of a ranged request. The body is read from the chunks of the
+        response inside the context, and the connection is released when the context exits.
+        A response with an error status raises an aiohttp.ClientResponseError on entering.
+
+        :param url: The URL to send the request to.
+        :type url: str
+
+        :param method: The HTTP method of the request (Defaults to "GET").
+        :type method: str
+
+        :param chunk_size: The maximum number of bytes read per chunk (Defaults to 65536).
+        :type chunk_size: int
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the request.
+        :type kwargs: dict
+
+        :return: An asynchronous context yielding the streamed response.
+        :rtype: AsyncIterator[StreamedResponse]
+        """
+        metrics: Optional[RequestMetrics] = cls.metrics
+
+        timing: Optional[RequestTiming] = RequestTiming(method, url) if metrics is not None else None
+
+        received: int = 0
+
+        cls._unwrap_(kwargs)
+
+        try:
+            await cls._authorize_(kwargs)
+
+            async with cls.transport_for(url).stream(
+                chunk_size=chunk_size,
+                method=method,
+                timing=timing,
+                url=url,
+                **kwargs,
+            ) as response:
+                # Check, if the log boolean value is true
+                if log:
+                    # Log an info message indicating the response status
+                    cls.logger.info(
+                        "Received response from {}: {}",
+                        url,
+                        response.status,
+                    )
+
+                # Check, if the bytes received must be counted for the metrics
+                if timing is not None:
+                    chunks: AsyncIterator[bytes] = response.chunks
+
+                    async def __count__() -> AsyncIterator[bytes]:
+                        """
+                        Yields the chunks of the body, counting their bytes.
+                        """
+                        nonlocal received
+
+                        async for chunk in chunks:
+                            received += len(chunk)
+
+                            yield chunk
+
+                    response.chunks = __count__()
+
+                yield response
+
+            if timing is not None:
+                metrics.finish(
+                    bytes_in=received,
+                    status=response.status,
+                    timing=timing,
+                )
+        except Exception as e:
+            if timing is not None:
+                metrics.fail(timing, e)
+
+            # Log an error message indicating that an exception has occurred
+            cls.logger.error(message=f"Caught an exception while attempting to stream '{method}' request to URL: '{url}': {e}")
+
+            # Re-raise the exception to the caller
+            raise e
+
+    @classmethod
+    async def apaginate(
+        cls,
+        url: str,
+        strategy: PaginationStrategy,
+        params: Optional[Dict[str, Any]] = None,
+        pages: bool = False,
+        prefetch: int = 1,
+        concurrency: int = 4,
+        max_pages: Optional[int] = None,
+        log: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[Any]:
+        """
+        Asynchronously requests the pages of a paginated resource and yields their items in order.
+
+        The next page is requested before the items of the current one are yielded, so it
+        downloads while the caller processes them. If the strategy can compute the following
+        pages up front, 'prefetch' pages are fetched ahead, or all of them in parallel with at
+        most 'concurrency' in flight once the first page tells the total.
+
+        :param url: The URL of the paginated resource.
+        :type url: str
+
+        :param strategy: How the pages are requested, e.g. LinkHeaderPagination, CursorPagination or OffsetPagination.
+        :type strategy: PaginationStrategy
+
+        :param params: The query parameters of every page (Defaults to None).
+        :type params: Optional[Dict[str, Any]]
+
+        :param pages: A flag indicating whether to yield the response of each page instead of its items (Defaults to False).
+        :type pages: bool
+
+        :param prefetch: The number of pages fetched ahead when their requests can be computed up front (Defaults to 1).
+        :type prefetch: int
+
+        :param concurrency: The maximum number of pages in flight once the total is known (Defaults to 4).
+        :type concurrency: int
+
+        :param max_pages: The maximum number of pages to request, or None for no limit (Defaults to None).
+        :type max_pages: Optional[int]
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for every request, e.g. headers.
+        :type kwargs: dict
+
+        :return: An asynchronous iterator of items, or of page responses.
+        :rtype: AsyncIterator[Any]
+        """
+        if prefetch < 1 or concurrency < 1:
+            raise ValueError("prefetch and concurrency must be at least 1.")
+
+        def __fetch__(request: PageRequest) -> asyncio.Task:
+            """
+            Starts requesting the given page.
+
+            :param request: The URL and query parameters of the page.
+            :type request: PageRequest
+
+            :return: The task resolving to the response of the page.
+            :rtype: asyncio.Task
+            """
+            page_url, page_params = request
+
+            return asyncio.ensure_future(
+                cls.arequest(
+                    log=log,
+                    method="GET",
+                    url=page_url,
+                    **({"params": page_params} if page_params else {}),
+                    **kwargs,
+                )
+            )
+
+        request: PageRequest = strategy.first(url, dict(params or {}))
+
+        pending: Deque[Tuple[PageRequest, asyncio.Task]] = deque([(request, __fetch__(request))])
+
+        planned: Optional[Iterator[PageRequest]] = None
+
+        window: int = prefetch
+
+        requested: int = 1
+
+        try:
+            while pending:
+                request, task = pending.popleft()
+
+                response: Response = await task
+
+                if not response.ok:
+                    raise PaginationError(response)
+
+                items: List[Any] = strategy.items(response.data)
+
+                following: Optional[PageRequest] = strategy.next(request, response, items)
+
+                # Check, if the following pages can be computed up front, which is decided by the first page
+                if requested == 1 and following is not None:
+                    planned = strategy.following(request, response, items)
+
+                    # Check, if the first page told the total, so every page can be fetched in parallel
+                    if planned is not None and strategy.total(response) is not None:
+                        window = concurrency
+
+                if following is None:
+                    # This is the last page, so the pages fetched ahead are not needed
+                    for _, task in pending:
+                        task.cancel()
+
+                    pending.clear()
+                elif planned is None:
+                    if max_pages is None or requested < max_pages:
+                        pending.append((following, __fetch__(following)))
+
+                        requested += 1
+                else:
+                    # Keep the window of pages fetched ahead full
+                    while len(pending) < window and (max_pages is None or requested < max_pages):
+                        request = next(planned, None)
+
+                        if request is None:
+                            break
+
+                        pending.append((request, __fetch__(request)))
+
+                        requested += 1
+
+                if pages:
+                    yield response
+
+                    continue
+
+                for item in items:
+                    yield item
+        finally:
+            # Cancel the pages still in flight if the consumer stops early
+            for _, task in pending:
+                task.cancel()
+
+    @classmethod
+    async def apost(
+        cls,
+        url: str,
+        log: bool = False,
+        body: Optional[UploadSource] = None,
+        chunk_size: int = 65536,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Asynchronously sends a POST request to the specified URL and returns the response decoded based on its content type.
+
+        This coroutine runs on the caller's event loop, so any number of requests can overlap.
+
+        :param url: The URL to send the POST request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param body: A file path, file object, buffer, memory-mapped file or asynchronous iterable streamed as the request body (Defaults to None).
+        :type body: Optional[UploadSource]
+
+        :param chunk_size: The number of bytes written per slice of a buffer body (Defaults to 65536).
+        :type chunk_size: int
+
+        :param kwargs: Additional keyword arguments for the POST request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        try:
+            # Check, if the request has no body to stream
+            if body is None:
+                return await cls._request_(
+                    log=log,
+                    method="POST",
+                    url=url,
+                    **kwargs,
+                )
+
+            async with open_upload(
+                chunk_size=chunk_size,
+                source=body,
+            ) as data:
+                return await cls._request_(
+                    data=data,
+                    log=log,
+                    method="POST",
+                    url=url,
+                    **kwargs,
+                )
+        except Exception as e:
+            # Log an error message indicating that an exception has occurred
+            cls.logger.error(message=f"Caught an exception while attempting to send 'POST' request to URL: '{url}': {e}")
+
+            # Re-raise the exception to the caller
+            raise e
+
+    @classmethod
+    async def aput(
+        cls,
+        url: str,
+        log: bool = False,
+        body: Optional[UploadSource] = None,
+        chunk_size: int = 65536,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Asynchronously sends a PUT request to the specified URL and returns the response decoded based on its content type.
+
+        This coroutine runs on the caller's event loop, so any number of requests can overlap.
+
+        :param url: The URL to send the PUT request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param body: A file path, file object, buffer, memory-mapped file or asynchronous iterable streamed as the request body (Defaults to None).
+        :type body: Optional[UploadSource]
+
+        :param chunk_size: The number of bytes written per slice of a buffer body (Defaults to 65536).
+        :type chunk_size: int
+
+        :param kwargs: Additional keyword arguments for the PUT request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        try:
+            # Check, if the request has no body to stream
+            if body is None:
+                return await cls._request_(
+                    log=log,
+                    method="PUT",
+                    url=url,
+                    **kwargs,
+                )
+
+            async with open_upload(
+                chunk_size=chunk_size,
+                source=body,
+            ) as data:
+                return await cls._request_(
+                    data=data,
+                    log=log,
+                    method="PUT",
+                    url=url,
+                    **kwargs,
+                )
+        except Exception as e:
+            # Log an error message indicating that an exception has occurred
+            cls.logger.error(message=f"Caught an exception while attempting to send 'PUT' request to URL: '{url}': {e}")
+
+            # Re-raise the exception to the caller
+            raise e
+
+    @classmethod
+    async def arequest(
+        cls,
+        method: str,
+        url: str,
+        log: bool = False,
+        **kwargs,
+    ) -> Response:
+        """
+        Asynchronously sends a request to the specified URL and returns the response without decoding it.
+
+        The body is decoded on first access of Response.data, Response.json() or Response.text(),
+        so callers that only need the status or headers never pay for decoding.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :param url: The URL to send the request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the request.
+        :type kwargs: dict
+
+        :return: The lazily decoded response.
+        :rtype: Response
+        """
+        try:
+            response: Response = await cls._fetch_(
+                log=log,
+                method=method.upper(),
+                url=url,
+                **kwargs,
+            )
+
+            # Return a copy, as the response may be shared with the cache and coalesced callers
+            return response.copy(codec=cls.codec)
+        except Exception as e:
+            # Log an error message indicating that an exception has occurred
+            cls.logger.error(message=f"Caught an exception while attempting to send '{method}' request to URL: '{url}': {e}")
+
+            # Re-raise the exception to the caller
+            raise e
+
+    @classmethod
+    async def astream(
+        cls,
+        url: str,
+        method: str = "GET",
+        chunk_size: int = 65536,
+        lines: bool = False,
+        log: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[bytes]:
+        """
+        Asynchronously sends a request to the specified URL and yields the response body as it arrives.
+
+        The body is never buffered as a whole, so memory use stays flat regardless of its size.
+        A response with an error status raises an aiohttp.ClientResponseError before anything is yielded.
+
+        :param url: The URL to send the request to.
+        :type url: str
+
+        :param method: The HTTP method of the request (Defaults to "GET").
+        :type method: str
+
+        :param chunk_size: The maximum number of bytes read per chunk (Defaults to 65536).
+        :type chunk_size: int
+
+        :param lines: A flag indicating whether to yield lines, including their line ending, instead of chunks (Defaults to False).
+        :type lines: bool
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the request.
+        :type kwargs: dict
+
+        :return: An asynchronous iterator of byte chunks or lines.
+        :rtype: AsyncIterator[bytes]
+        """
+        async with cls.aopen(
+            chunk_size=chunk_size,
+            log=log,
+            method=method,
+            url=url,
+            **kwargs,
+        ) as response:
+            # Check, if the body should be yielded as chunks
+            if not lines:
+                async for chunk in response.chunks:
+                    yield chunk
+
+                return
+
+            # The pieces of a line spanning several chunks
+            pending: List[bytes] = []
+
+            async for chunk in response.chunks:
+                first, *rest = chunk.split(b"\n")
+
+                # Check, if the chunk does not complete the pending line
+                if not rest:
+                    pending.append(first)
+
+                    continue
+
+                yield b"".join(pending) + first + b"\n"
+
+                # Yield every complete line and keep the incomplete tail pending
+                for line in rest[:-1]:
+                    yield line + b"\n"
+
+                pending = [rest[-1]] if rest[-1] else []
+
+            # Yield the last line if the body does not end with a line break
+            if pending:
+                yield b"".join(pending)
+
+    @classmethod
+    def close(cls) -> None:
+        """
+        Closes the pooled session of the background event loop thread and stops the thread.
+        """
+        # Check, if there is nothing to close
+        if not cls.loop_thread.running:
+            return
+
+        try:
+            cls.loop_thread.run(cls.aclose())
+        finally:
+            cls.loop_thread.stop()
+
+    @classmethod
+    def configure(
+        cls,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        ttl_dns_cache: Optional[int] = 300,
+        timeout: Optional[float] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        codec: Optional[JSONCodec] = None,
+        metrics: Union[RequestMetrics, bool] = True,
+        credentials: Optional[CredentialProvider] = None,
+        transport: Optional[Transport] = None,
+        transports: Optional[Mapping[str, Transport]] = None,
+        compressor: Optional[BodyCompressor] = None,
+    ) -> None:
+        """
+        Replaces the session pool with one using the given connector configuration, and sets the response cache,
+        request coalescing, retry policy, circuit breaker, rate limiter, concurrency limiter, JSON codec, request metrics, default credentials, transports and request body compression.
+
+        The pooled session of the background event loop thread is closed first. This is meant to
+        be called once at start-up, before any requests have been sent.
+
+        :param limit: The total number of simultaneous connections (Defaults to 100).
+        :type limit: int
+
+        :param limit_per_host: The number of simultaneous connections to a single host (Defaults to 10).
+        :type limit_per_host: int
+
+        :param keepalive_timeout: Seconds an idle connection is kept open for reuse (Defaults to 30.0).
+        :type keepalive_timeout: float
+
+        :param ttl_dns_cache: Seconds resolved DNS entries are cached for (Defaults to 300).
+        :type ttl_dns_cache: Optional[int]
+
+        :param timeout: The total timeout of a request in seconds (Defaults to None).
+        :type timeout: Optional[float]
+
+        :param cache: The cache GET and HEAD responses are served from, or None to disable caching (Defaults to None).
+        :type cache: Optional[ResponseCache]
+
+        :param coalesce: A flag indicating whether to coalesce identical idempotent requests in flight (Defaults to True).
+        :type coalesce: bool
+
+        :param retry_policy: Decides which failed requests are retried, or None to never retry (Defaults to None).
+        :type retry_policy: Optional[RetryPolicy]
+
+        :param circuit_breaker: Fails fast on requests to unhealthy hosts, or None to always send requests (Defaults to None).
+        :type circuit_breaker: Optional[CircuitBreaker]
+
+        :param rate_limiter: Limits the request rate per host or URL prefix, or None to not limit it (Defaults to None).
+        :type rate_limiter: Optional[RateLimiter]
+
+        :param concurrency_limiter: Adapts the requests in flight per host, or None to not limit them (Defaults to None).
+        :type concurrency_limiter: Optional[AdaptiveConcurrencyLimiter]
+
+        :param codec: Encodes JSON request bodies and decodes JSON responses, or None for JSONCodec.default() (Defaults to None).
+        :type codec: Optional[JSONCodec]
+
+        :param metrics: The request metrics to collect into, True for new ones, or False to not collect any (Defaults to True).
+        :type metrics: Union[RequestMetrics, bool]
+
+        :param credentials: Supplies the Authorization header of requests without credentials of their own, or None to attach none (Defaults to None).
+        :type credentials: Optional[CredentialProvider]
+
+        :param transport: Sends the requests to hosts without a transport of their own, or None for the pooled aiohttp sessions (Defaults to None).
+        :type transport: Optional[Transport]
+
+        :param transports: The transports of individual hosts, keyed by "host:port" or host name (Defaults to None).
+        :type transports: Optional[Mapping[str, Transport]]
+
+        :param compressor: Compresses large request bodies with a Content-Encoding, or None to send them as they are (Defaults to None).
+        :type compressor: Optional[BodyCompressor]
+        """
+        cls.close()
+
+        cls.cache = cache
+
+        cls.single_flight = SingleFlight() if coalesce else None
+
+        cls.retry_policy = retry_policy
+
+        cls.circuit_breaker = circuit_breaker
+
+        cls.rate_limiter = rate_limiter
+
+        cls.concurrency_limiter = concurrency_limiter
+
+        cls.codec = codec
+
+        # Check, if the metrics are given as a flag rather than an instance
+        if isinstance(metrics, bool):
+            metrics = RequestMetrics() if metrics else None
+
+        cls.metrics = metrics
+
+        cls.credentials = credentials
+
+        cls.compressor = compressor
+
+        cls.pool = SessionPool(
+            keepalive_timeout=keepalive_timeout,
+            limit=limit,
+            limit_per_host=limit_per_host,
+            timeout=timeout,
+            trace_configs=(lambda: [RequestMetrics.trace_config()]) if metrics is not None else None,
+            ttl_dns_cache=ttl_dns_cache,
+        )
+
+        cls.transport = transport or AiohttpTransport(cls.pool)
+
+        cls.transports = dict(transports or {})
+
+    @classmethod
+    def delete(
+        cls,
+        url: str,
+        log: bool = False,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Sends a DELETE request to the specified URL and returns the response decoded based on its content type.
+
+        :param url: The URL to send the DELETE request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the DELETE request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        # Run the asynchronous adelete method on the background event loop thread
+        return cls._run_(
+            cls.adelete(
+                log=log,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def download(
+        cls,
+        url: str,
+        path: Union[str, os.PathLike],
+        concurrency: int = 4,
+        segment_size: int = 8 * 1024 * 1024,
+        retries: int = 3,
+        **kwargs,
+    ) -> int:
+        """
+        Downloads a file in byte ranges fetched in parallel, resuming an interrupted download to the same path.
+
+        :param url: The URL of the file.
+        :type url: str
+
+        :param path: The path to write the file to.
+        :type path: Union[str, os.PathLike]
+
+        :param concurrency: The number of byte ranges fetched at the same time (Defaults to 4).
+        :type concurrency: int
+
+        :param segment_size: The size of a byte range in bytes (Defaults to 8 MiB).
+        :type segment_size: int
+
+        :param retries: The number of times a byte range is resumed after a failed request (Defaults to 3).
+        :type retries: int
+
+        :param kwargs: Additional keyword arguments for the requests.
+        :type kwargs: dict
+
+        :return: The size of the file in bytes.
+        :rtype: int
+        """
+        return cls._run_(
+            cls.adownload(
+                concurrency=concurrency,
+                path=path,
+                retries=retries,
+                segment_size=segment_size,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def download_to(
+        cls,
+        url: str,
+        path: Union[str, os.PathLike],
+        chunk_size: int = 65536,
+        log: bool = False,
+        **kwargs,
+    ) -> int:
+        """
+        Streams the body of a GET request to the specified URL into a file.
+
+        :param url: The URL to send the GET request to.
+        :type url: str
+
+        :param path: The path of the file to write the response body to.
+        :type path: Union[str, os.PathLike]
+
+        :param chunk_size: The maximum number of bytes read per chunk (Defaults to 65536).
+        :type chunk_size: int
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the GET request.
+        :type kwargs: dict
+
+        :return: The number of bytes written to the file.
+        :rtype: int
+        """
+        return cls._run_(
+            cls.adownload_to(
+                chunk_size=chunk_size,
+                log=log,
+                path=path,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def gather(
+        cls,
+        requests: Iterable[Union[str, RequestSpec]],
+        concurrency: int = 100,
+        per_host: Optional[int] = None,
+        ordered: bool = True,
+    ) -> Iterator[BatchResult]:
+        """
+        Sends a batch of requests over the pooled session with bounded concurrency.
+
+        :param requests: The URLs or RequestSpecs to send. Plain URLs are sent as GET requests.
+        :type requests: Iterable[Union[str, RequestSpec]]
+
+        :param concurrency: The maximum number of requests in flight (Defaults to 100).
+        :type concurrency: int
+
+        :param per_host: The maximum number of requests in flight per host, or None for no limit (Defaults to None).
+        :type per_host: Optional[int]
+
+        :param ordered: A flag indicating whether to yield results in input order rather than as they complete (Defaults to True).
+        :type ordered: bool
+
+        :return: An iterator of BatchResults, driven lazily on the background event loop thread.
+        :rtype: Iterator[BatchResult]
+        """
+        return cls._iterate_(
+            cls.agather(
+                concurrency=concurrency,
+                ordered=ordered,
+                per_host=per_host,
+                requests=requests,
+            )
+        )
+
+    @classmethod
+    def get(
+        cls,
+        url: str,
+        log: bool = False,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Sends a GET request to the specified URL and returns the response decoded based on its content type.
+
+        :param url: The URL to send the GET request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the GET request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        # Run the asynchronous aget method on the background event loop thread
+        return cls._run_(
+            cls.aget(
+                log=log,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def paginate(
+        cls,
+        url: str,
+        strategy: PaginationStrategy,
+        params: Optional[Dict[str, Any]] = None,
+        pages: bool = False,
+        prefetch: int = 1,
+        concurrency: int = 4,
+        max_pages: Optional[int] = None,
+        log: bool = False,
+        **kwargs,
+    ) -> Iterator[Any]:
+        """
+        Requests the pages of a paginated resource and yields their items in order.
+
+        :param url: The URL of the paginated resource.
+        :type url: str
+
+        :param strategy: How the pages are requested, e.g. LinkHeaderPagination, CursorPagination or OffsetPagination.
+        :type strategy: PaginationStrategy
+
+        :param params: The query parameters of every page (Defaults to None).
+        :type params: Optional[Dict[str, Any]]
+
+        :param pages: A flag indicating whether to yield the response of each page instead of its items (Defaults to False).
+        :type pages: bool
+
+        :param prefetch: The number of pages fetched ahead when their requests can be computed up front (Defaults to 1).
+        :type prefetch: int
+
+        :param concurrency: The maximum number of pages in flight once the total is known (Defaults to 4).
+        :type concurrency: int
+
+        :param max_pages: The maximum number of pages to request, or None for no limit (Defaults to None).
+        :type max_pages: Optional[int]
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for every request, e.g. headers.
+        :type kwargs: dict
+
+        :return: An iterator of items, or of page responses, driven lazily on the background event loop thread.
+        :rtype: Iterator[Any]
+        """
+        return cls._iterate_(
+            cls.apaginate(
+                concurrency=concurrency,
+                log=log,
+                max_pages=max_pages,
+                pages=pages,
+                params=params,
+                prefetch=prefetch,
+                strategy=strategy,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def post(
+        cls,
+        url: str,
+        log: bool = False,
+        body: Optional[UploadSource] = None,
+        chunk_size: int = 65536,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Sends a POST request to the specified URL and returns the response decoded based on its content type.
+
+        :param url: The URL to send the POST request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param body: A file path, file object, buffer, memory-mapped file or asynchronous iterable streamed as the request body (Defaults to None).
+        :type body: Optional[UploadSource]
+
+        :param chunk_size: The number of bytes written per slice of a buffer body (Defaults to 65536).
+        :type chunk_size: int
+
+        :param kwargs: Additional keyword arguments for the POST request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        # Run the asynchronous apost method on the background event loop thread
+        return cls._run_(
+            cls.apost(
+                body=body,
+                chunk_size=chunk_size,
+                log=log,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def put(
+        cls,
+        url: str,
+        log: bool = False,
+        body: Optional[UploadSource] = None,
+        chunk_size: int = 65536,
+        **kwargs,
+    ) -> Optional[Union[Dict[str, Any], List[Any], str, bytes]]:
+        """
+        Sends a PUT request to the specified URL and returns the response decoded based on its content type.
+
+        :param url: The URL to send the PUT request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param body: A file path, file object, buffer, memory-mapped file or asynchronous iterable streamed as the request body (Defaults to None).
+        :type body: Optional[UploadSource]
+
+        :param chunk_size: The number of bytes written per slice of a buffer body (Defaults to 65536).
+        :type chunk_size: int
+
+        :param kwargs: Additional keyword arguments for the PUT request.
+        :type kwargs: dict
+
+        :return: JSON for JSON responses, text for text responses, None for an empty body and bytes otherwise.
+        :rtype: Optional[Union[Dict[str, Any], List[Any], str, bytes]]
+        """
+        # Run the asynchronous aput method on the background event loop thread
+        return cls._run_(
+            cls.aput(
+                body=body,
+                chunk_size=chunk_size,
+                log=log,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def request(
+        cls,
+        method: str,
+        url: str,
+        log: bool = False,
+        **kwargs,
+    ) -> Response:
+        """
+        Sends a request to the specified URL and returns the response without decoding it.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+
+        :param url: The URL to send the request to.
+        :type url: str
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the request.
+        :type kwargs: dict
+
+        :return: The lazily decoded response.
+        :rtype: Response
+        """
+        return cls._run_(
+            cls.arequest(
+                log=log,
+                method=method,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def stream(
+        cls,
+        url: str,
+        method: str = "GET",
+        chunk_size: int = 65536,
+        lines: bool = False,
+        log: bool = False,
+        **kwargs,
+    ) -> Iterator[bytes]:
+        """
+        Sends a request to the specified URL and yields the response body as it arrives.
+
+        :param url: The URL to send the request to.
+        :type url: str
+
+        :param method: The HTTP method of the request (Defaults to "GET").
+        :type method: str
+
+        :param chunk_size: The maximum number of bytes read per chunk (Defaults to 65536).
+        :type chunk_size: int
+
+        :param lines: A flag indicating whether to yield lines, including their line ending, instead of chunks (Defaults to False).
+        :type lines: bool
+
+        :param log: A flag indicating whether to log the response status (Defaults to False).
+        :type log: bool
+
+        :param kwargs: Additional keyword arguments for the request.
+        :type kwargs: dict
+
+        :return: An iterator of byte chunks or lines, driven lazily on the background event loop thread.
+        :rtype: Iterator[bytes]
+        """
+        return cls._iterate_(
+            cls.astream(
+                chunk_size=chunk_size,
+                lines=lines,
+                log=log,
+                method=method,
+                url=url,
+                **kwargs,
+            )
+        )
+
+    @classmethod
+    def submit(
+        cls,
+        coroutine: Coroutine[Any, Any, Any],
+    ) -> concurrent.futures.Future:
+        """
+        Schedules the given coroutine, e.g. WebService.aget(url), on the background event loop thread without waiting for it.
+
+        :param coroutine: The coroutine to schedule.
+        :type coroutine: Coroutine[Any, Any, Any]
+
+        :return: A thread-safe future resolving to the result of the coroutine.
+        :rtype: concurrent.futures.Future
+        """
+        return cls.loop_thread.submit(coroutine)
+
+
+    @classmethod
+    def transport_for(cls, url: str) -> Transport:
+        """
+        Returns the transport requests to the given URL are sent with.
+
+        :param url: The URL of the request.
+        :type url: str
+
+        :return: The transport of the URL's "host:port" or host name, or the default transport.
+        :rtype: Transport
+        """
+        transports: Dict[str, Transport] = cls.transports
+
+        # Check, if any host has a transport of its own
+        if transports:
+            parts: SplitResult = urlsplit(url)
+
+            transport: Optional[Transport] = transports.get(parts.netloc) or transports.get(parts.hostname or "")
+
+            if transport is not None:
+                return transport
+
+        return cls.transport
+
+# Close the pooled session of the background event loop thread when the interpreter exits
+atexit.register(WebService.close)